@@ -0,0 +1,42 @@
+import argparse
+import sys
+from fhrcc_mechanismkg.bench import BENCHMARKS, compare_results, load_results, run_benchmarks, save_results
+
+
+def main():
+    p = argparse.ArgumentParser(description = "Benchmark the toolkit on a synthetic graph")
+    p.add_argument("--edges", type = int, default = 10_000, help = "Synthetic graph size (edges)")
+    p.add_argument("--repeat", type = int, default = 5)
+    p.add_argument("--seed", type = int, default = 0)
+    p.add_argument("--only", nargs = "+", default = None, choices = sorted(BENCHMARKS), help = "Run only these benchmarks")
+    p.add_argument("--save", default = None, help = "Write the results (e.g. a new baseline) to this JSON file")
+    p.add_argument("--compare", default = None, help = "Baseline JSON file to compare against")
+    p.add_argument("--tolerance", type = float, default = 1.5, help = "Slowdown ratio reported as a regression")
+    args = p.parse_args()
+
+    def progress(name, timing):
+        print(f"{name:<22} min = {timing['min'] * 1000:10.2f} ms   median = {timing['median'] * 1000:10.2f} ms", flush = True)
+
+    print(f"Synthetic graph: {args.edges} edges (seed = {args.seed}), repeat = {args.repeat}")
+    results = run_benchmarks(args.edges, repeat = args.repeat, names = args.only, seed = args.seed, progress = progress)
+
+    if args.save:
+        save_results(results, args.save)
+        print(f"\nOK: results written to {args.save}")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline["meta"]["n_edges"] != results["meta"]["n_edges"]:
+            print(f"\nWarning: baseline was measured on {baseline['meta']['n_edges']} edges")
+        print(f"\nAgainst {args.compare} (tolerance {args.tolerance:.2f}x):")
+        regressions = 0
+        for c in compare_results(results, baseline, tolerance = args.tolerance):
+            flag = "REGRESSION" if c.regressed else ""
+            regressions += c.regressed
+            print(f"{c.name:<22} {c.baseline * 1000:10.2f} ms -> {c.current * 1000:10.2f} ms  ({c.ratio:5.2f}x) {flag}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
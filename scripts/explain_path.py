@@ -15,14 +15,16 @@ def fmt_node(g, node_id):
     return f"{n.name} [{node_id}]"
 
 
-def fmt_edge(g, edge):
+def fmt_edge(g, edge, cost = None, pred_pen = None):
     subj = fmt_node(g, edge.subject)
     obj = fmt_node(g, edge.object)
     w = f"{edge.weight:.2f}"
 
     # cost decomposition (weight component + predicate penalty)
-    total = edge_cost(edge, predicate_penalty = DEFAULT_PREDICATE_PENALTY)
-    pred_pen = DEFAULT_PREDICATE_PENALTY.get(edge.predicate, 1.0)
+    # (taken from the search result when available)
+    total = cost if cost is not None else edge_cost(edge, predicate_penalty = DEFAULT_PREDICATE_PENALTY)
+    if pred_pen is None:
+        pred_pen = DEFAULT_PREDICATE_PENALTY.get(edge.predicate, 1.0)
 
     return (
         f"{subj} --{edge.predicate}--> {obj} "
@@ -49,7 +51,7 @@ def main():
     best = shortest_path_explainable(g, source=source, target = target, max_hops = max_hops)
     print(f"Best path cost: {best.total_cost:.3f}")
     for step in best.steps:
-        print(fmt_edge(g, step.edge))
+        print(fmt_edge(g, step.edge, step.cost, step.penalty))
     print()
 
     paths = k_shortest_paths_explainable(g, source = source, target = target, k = k, max_hops = max_hops)
@@ -1,5 +1,6 @@
 import sys
 from fhrcc_mechanismkg.io import graph_from_json
+from fhrcc_mechanismkg.search import NodeIndex, find_nodes
 
 
 def main():
@@ -16,19 +17,7 @@ def main():
 
     g = graph_from_json(graph_path)
 
-    hits = []
-    for n in g.nodes.values():
-        if node_type is not None and n.type != node_type:
-            continue
-
-        hay = " ".join(
-            [n.id, n.name] + (n.synonyms or []) + ([n.description] if n.description else [])
-        ).lower()
-
-        if keyword is None or keyword in hay:
-            hits.append(n)
-
-    hits.sort(key = lambda x: (x.type, x.id))
+    hits = find_nodes(g, keyword = keyword, node_type = node_type, index = NodeIndex.for_graph_file(g, graph_path))
 
     print(f"Matches: {len(hits)}")
     for n in hits:
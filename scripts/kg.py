@@ -1,16 +1,49 @@
 import argparse
+import shlex
+import sys
 from pathlib import Path
-from fhrcc_mechanismkg.io import graph_from_json
+from fhrcc_mechanismkg.io import JSONL_SUFFIX, graph_from_json, graph_from_jsonl, load_graph, save_graph
 from fhrcc_mechanismkg.reasoning.path_search import (
     shortest_path_explainable,
     k_shortest_paths_explainable,
+    shortest_paths_from,
 )
-from fhrcc_mechanismkg.reporting import path_to_text, paths_to_markdown
+from fhrcc_mechanismkg.reasoning.batch import batch_explain
+from fhrcc_mechanismkg.reasoning.cache import PathQueryCache
+from fhrcc_mechanismkg.reasoning.constraints import EVIDENCE_ORDER, PathConstraints
+from fhrcc_mechanismkg.reasoning.distances import DISTANCE_INDEX_SUFFIX, DistanceIndex
+from fhrcc_mechanismkg.reasoning.signed import signed_shortest_paths
+from fhrcc_mechanismkg.reasoning.stats import add_search_hook
+from fhrcc_mechanismkg.reasoning.sweep import expand_penalty_grid, sensitivity_sweep
+from fhrcc_mechanismkg.delta import apply_delta, load_delta
+from fhrcc_mechanismkg.analytics import analyze_graph, ranked_counts
+from fhrcc_mechanismkg.lint import LINT_RULES, run_lint
+from fhrcc_mechanismkg.search import NodeIndex, find_nodes
+from fhrcc_mechanismkg.synthetic import write_synthetic_graph
+from fhrcc_mechanismkg.service import GraphService, serve_http, serve_unix
+from fhrcc_mechanismkg.reporting import path_to_dict, path_to_text, paths_to_markdown, paths_by_target_to_markdown, signed_paths_to_markdown
+import json
 from collections import Counter
 
 
+# Read-only commands check JSON records in one bulk pass after loading
+# (io.VALIDATION_MODES); `kg validate`, convert and apply keep full checks.
+QUERY_VALIDATION = "deferred"
+
+# Paths `explain` returns for a single target when -k is not given.
+DEFAULT_K = 5
+
+
+def open_graph(args, mmap = False):
+    # Inside `kg shell` the graph is already resident; otherwise load it from disk.
+    resident = getattr(args, "resident", None)
+    if resident is not None:
+        return resident
+    return load_graph(args.graph, mmap = mmap, validate = QUERY_VALIDATION)
+
+
 def cmd_validate(args):
-    graph_from_json(args.graph)
+    load_graph(args.graph, validate = "full")
     print(f"OK: graph validated successfully -> {args.graph}")
 
 
@@ -25,36 +58,123 @@ def divider(title = None, char = "=", width = 80):
     return char * width
 
 
+def open_index(args, g):
+    # The search index is kept next to the graph file and rebuilt when the file changes.
+    resident = getattr(args, "resident_index", None)
+    if resident is not None:
+        return resident
+    return NodeIndex.for_graph_file(g, args.graph)
+
+
+def open_distances(args, g):
+    # The distance index is kept next to the graph file (<graph>.dist) and rebuilt when the file changes.
+    return DistanceIndex.for_graph_file(g, args.graph)
+
+
 def cmd_find(args):
-    g = graph_from_json(args.graph)
-    keyword = (args.keyword or "").lower()
-    node_type = args.type.lower() if args.type else None
+    g = open_graph(args, mmap = True)
+    index = open_index(args, g)
 
-    hits = []
-    for n in g.nodes.values():
-        if node_type and n.type != node_type:
-            continue
-        hay = " ".join([n.id, n.name] + (n.synonyms or []) + ([n.description] if n.description else [])).lower()
-        if not keyword or keyword in hay:
-            hits.append(n)
+    if args.ranked:
+        hits = index.search(args.keyword or "", node_type = args.type, limit = args.limit, fuzzy = not args.no_fuzzy)
+        print(f"Matches: {len(hits)}")
+        for h in hits:
+            print(f"{h.node_id}\t{h.node_type}\t{h.name}\tscore = {h.score:.2f}")
+        return
 
-    hits.sort(key = lambda x: (x.type, x.id))
+    hits = find_nodes(g, keyword = args.keyword, node_type = args.type, index = index)
     print(f"Matches: {len(hits)}")
-    for n in hits:
+    for n in hits[:args.limit]:
         syn = f" | syn = {','.join(n.synonyms)}" if n.synonyms else ""
         print(f"{n.id}\t{n.type}\t{n.name}{syn}")
 
 
-def cmd_explain(args):
-    g = graph_from_json(args.graph)
+def write_report(out_md, md):
+    out_path = Path(out_md)
+    out_path.parent.mkdir(parents = True, exist_ok = True)
+    out_path.write_text(data = md, encoding = "utf-8")
+    print("")
+    print(divider("OUTPUT REPORT", char = "-"))
+    print(f"{out_path}")
 
-    paths = k_shortest_paths_explainable(
-        g,
-        source = args.source,
-        target = args.target,
-        k = args.k,
-        max_hops = args.max_hops,
-    )
+
+def cmd_explain(args):
+    if not args.stats:
+        return explain(args)
+    # Every search the command runs reports its statistics to this hook (a
+    # --cache hit runs none).
+    collected = []
+    remove = add_search_hook(lambda kind, stats: collected.append((kind, stats)))
+    try:
+        explain(args)
+    finally:
+        remove()
+        print("")
+        print(divider("SEARCH STATS", char = "-"))
+        if not collected:
+            print("(no search ran)")
+        for kind, stats in collected:
+            print(f"[{kind}]")
+            print(stats.to_text())
+
+
+def path_constraints(args):
+    # The explain filter flags as PathConstraints (None when none is given).
+    context = []
+    for item in args.context or []:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise SystemExit(f"--context expects KEY=VALUE, got {item!r}")
+        context.append((key, value))
+    try:
+        constraints = PathConstraints(
+            node_types = args.allow_type,
+            forbid_node_types = args.forbid_type or (),
+            predicates = args.allow_predicate,
+            forbid_predicates = args.forbid_predicate or (),
+            min_evidence = args.min_evidence,
+            context = context,
+            strict_context = args.strict_context,
+            waypoints = args.via or (),
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    return None if constraints.is_empty() else constraints
+
+
+def explain(args):
+    g = open_graph(args, mmap = True)
+
+    if not args.target and not args.target_type:
+        raise SystemExit("Give at least one target or --target-type.")
+    constraints = path_constraints(args)
+    if constraints is not None and args.cache:
+        raise SystemExit("--cache does not store constrained searches; drop the filter flags or --cache.")
+    if args.signed and (len(args.target) != 1 or args.target_type or args.cache or args.via):
+        raise SystemExit("--signed takes one target and no --target-type, --cache or --via.")
+    if len(args.target) > 1 or args.target_type:
+        if args.k is not None:
+            raise SystemExit("-k needs a single target; several targets or --target-type give the best path to each.")
+        return explain_many(g, args, constraints)
+    args.target = args.target[0]
+    if args.k is None:
+        args.k = DEFAULT_K
+    if args.signed:
+        return explain_signed(g, args, constraints)
+
+    if args.cache:
+        with PathQueryCache(path = args.cache) as cache:
+            paths = cache.k_shortest_paths(g, source = args.source, target = args.target, k = args.k, max_hops = args.max_hops)
+    else:
+        paths = k_shortest_paths_explainable(
+            g,
+            source = args.source,
+            target = args.target,
+            k = args.k,
+            max_hops = args.max_hops,
+            constraints = constraints,
+            distances = open_distances(args, g) if args.distance_index else None,
+        )
 
     if not paths:
         raise SystemExit("No paths found.")
@@ -82,9 +202,6 @@ def cmd_explain(args):
 
     # Optional: save Markdown report
     if args.out_md:
-        out_path = Path(args.out_md)
-        out_path.parent.mkdir(parents = True, exist_ok = True)
-
         header = f"Explainable paths: {args.source} -> {args.target}"
         md = paths_to_markdown(
             g,
@@ -94,41 +211,371 @@ def cmd_explain(args):
             show_mechanism = args.verbose,
             show_notes = args.verbose,
         )
-        out_path.write_text(data = md, encoding = "utf-8")
+        write_report(args.out_md, md)
+
+
+def explain_signed(g, args, constraints):
+    # Best path for each net sign of influence (-k is not used).
+    results = signed_shortest_paths(g, source = args.source, target = args.target, max_hops = args.max_hops, constraints = constraints)
+    if not results:
+        raise SystemExit("No signed paths found.")
+
+    for sign in ("+", "-"):
+        label = "ACTIVATING (+)" if sign == "+" else "INHIBITING (-)"
+        print(divider(f"BEST NET {label} PATH"))
+        if sign not in results:
+            print(f"No net {sign} path within {args.max_hops} hops.")
+        else:
+            print(path_to_text(
+                g,
+                results[sign],
+                title = f"{args.source} -> {args.target} (net {sign})",
+                show_cost = not args.no_cost,
+                show_mechanism = args.verbose,
+                show_notes = args.verbose,
+            ))
         print("")
-        print(divider("OUTPUT REPORT", char = "-"))
-        print(f"{out_path}")
+
+    if args.out_md:
+        md = signed_paths_to_markdown(
+            g,
+            results = results,
+            header = f"Signed paths: {args.source} -> {args.target}",
+            show_cost = not args.no_cost,
+            show_mechanism = args.verbose,
+            show_notes = args.verbose,
+        )
+        write_report(args.out_md, md)
+
+
+def explain_many(g, args, constraints = None):
+    # Several targets: best path to each one from a single search (no -k).
+    # The source itself is never a target (it would be a 0-hop "path").
+    if constraints is not None and constraints.waypoints:
+        raise SystemExit("--via needs a single target.")
+    targets = [t for t in args.target if t != args.source]
+    if args.target_type:
+        node_type = args.target_type.lower()
+        targets.extend(n.id for n in g.nodes.values() if n.type == node_type and n.id != args.source and n.id not in targets)
+    if not targets:
+        if args.target_type:
+            raise SystemExit(f"No nodes of type '{args.target_type}' other than the source.")
+        raise SystemExit(f"No targets other than the source {args.source}.")
+
+    results = shortest_paths_from(g, source = args.source, targets = targets, max_hops = args.max_hops, constraints = constraints)
+    found = sorted(results.items(), key = lambda x: (x[1].total_cost, x[0]))
+
+    print(divider(f"BEST PATHS FROM {args.source} ({len(found)}/{len(targets)} TARGETS REACHED)"))
+    for i, (target, p) in enumerate(found, start = 1):
+        print(f"[{i:02d}] cost = {p.total_cost:.3f} | hops = {len(p.steps):02d} | {args.source} -> {target}")
+    missing = [t for t in targets if t not in results]
+    if missing:
+        print("")
+        print(divider(f"NO PATH WITHIN {args.max_hops} HOPS", char = "-"))
+        for t in missing:
+            print(f"  {t}")
+
+    if args.out_md:
+        md = paths_by_target_to_markdown(
+            g,
+            results = dict(found),
+            header = f"Explainable paths from {args.source}",
+            show_cost = not args.no_cost,
+            show_mechanism = args.verbose,
+            show_notes = args.verbose,
+        )
+        write_report(args.out_md, md)
+
+
+def read_pairs(path):
+    # One "source target" pair per line (whitespace or tab separated); '#' starts a comment.
+    pairs = []
+    for lineno, line in enumerate(Path(path).read_text(encoding = "utf-8").splitlines(), start = 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        fields = line.split()
+        if len(fields) != 2:
+            raise SystemExit(f"{path}:{lineno}: expected 'source target', got {line!r}")
+        pairs.append((fields[0], fields[1]))
+    return pairs
+
+
+def cmd_reach(args):
+    # Reachability / best cost within max_hops for many pairs, from the distance index.
+    g = open_graph(args, mmap = True)
+    pairs = read_pairs(args.pairs)
+    index = open_distances(args, g)
+    records = []
+    for source, target in pairs:
+        try:
+            r = index.query(source, target, args.max_hops)
+        except ValueError as e:
+            records.append({"source": source, "target": target, "error": str(e)})
+            continue
+        records.append({"source": source, "target": target, "reachable": r.reachable, "cost": r.cost, "exact": r.exact})
+
+    if args.out_jsonl:
+        Path(args.out_jsonl).parent.mkdir(parents = True, exist_ok = True)
+        with open(args.out_jsonl, "w", encoding = "utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    print(divider(f"REACHABILITY WITHIN {args.max_hops} HOPS ({index.method} index)"))
+    for rec in records:
+        if "error" in rec:
+            status = rec["error"]
+        elif not rec["reachable"]:
+            status = "unreachable"
+        elif rec["exact"]:
+            status = f"best cost = {rec['cost']:.3f}"
+        else:
+            status = f"reachable, best cost >= {rec['cost']:.3f}"
+        print(f"{rec['source']} -> {rec['target']}: {status}")
+    print(f"{sum(bool(rec.get('reachable')) for rec in records)}/{len(records)} pairs reachable")
+
+
+def cmd_explain_batch(args):
+    g = open_graph(args, mmap = True)
+    pairs = read_pairs(args.pairs)
+
+    out_md = out_jsonl = None
+    if args.out_md:
+        Path(args.out_md).parent.mkdir(parents = True, exist_ok = True)
+        out_md = open(args.out_md, "w", encoding = "utf-8")
+    if args.out_jsonl:
+        Path(args.out_jsonl).parent.mkdir(parents = True, exist_ok = True)
+        out_jsonl = open(args.out_jsonl, "w", encoding = "utf-8")
+
+    n_found = 0
+    try:
+        # Results arrive in completion order and are written as they come in.
+        results = batch_explain(g, pairs, k = args.k, max_hops = args.max_hops, workers = args.workers)
+        for done, r in enumerate(results, start = 1):
+            if r.paths:
+                n_found += 1
+                status = f"{len(r.paths)} path(s), best cost = {r.paths[0].total_cost:.3f}"
+            else:
+                status = r.error or f"no path within {args.max_hops} hops"
+            print(f"[{done}/{len(pairs)}] {r.source} -> {r.target}: {status}", flush = True)
+
+            if out_jsonl:
+                record = {
+                    "index": r.index,
+                    "source": r.source,
+                    "target": r.target,
+                    "paths": [path_to_dict(p) for p in r.paths],
+                    "error": r.error,
+                }
+                out_jsonl.write(json.dumps(record) + "\n")
+                out_jsonl.flush()
+            if out_md:
+                header = f"Explainable paths: {r.source} -> {r.target}"
+                if r.paths:
+                    md = paths_to_markdown(
+                        g,
+                        paths = r.paths,
+                        header = header,
+                        show_cost = not args.no_cost,
+                        show_mechanism = args.verbose,
+                        show_notes = args.verbose,
+                    )
+                else:
+                    md = f"# {header}\n\n{status}\n"
+                out_md.write(md + "\n")
+                out_md.flush()
+    finally:
+        for f in (out_md, out_jsonl):
+            if f:
+                f.close()
+
+    print(f"\nOK: {n_found}/{len(pairs)} pairs with at least one path")
+
+
+def read_penalty_grid(path):
+    # Either a list of penalty tables or {"base": {...}, "vary": {"predicate": [values, ...]}}.
+    data = json.loads(Path(path).read_text(encoding = "utf-8"))
+    if isinstance(data, list):
+        return data
+    return expand_penalty_grid(data.get("base"), data.get("vary"))
+
+
+def cmd_sweep(args):
+    g = open_graph(args, mmap = True)
+    pairs = read_pairs(args.pairs)
+    grid = read_penalty_grid(args.grid)
+    if not 0 <= args.baseline < len(grid):
+        raise SystemExit(f"--baseline must index the grid (0..{len(grid) - 1})")
+
+    report = sensitivity_sweep(g, pairs, grid, k = args.k, max_hops = args.max_hops, workers = args.workers)
+    shifts = report.shifts(baseline = args.baseline)
+    base = grid[args.baseline]
+
+    print(divider(f"Sweep: {len(grid)} penalty tables x {len(pairs)} queries"))
+    print(f"Searches run: {report.searches} (naive: {len(grid) * len(pairs)})")
+    print(f"Baseline: table {args.baseline}")
+    print()
+    for c, table in enumerate(grid):
+        rows = [s for s in shifts if s.config == c]
+        changed = sum(1 for s in rows if s.top_changed)
+        moved = sum(s.moved for s in rows)
+        deltas = [s.cost_delta for s in rows if s.cost_delta is not None]
+        mean_delta = sum(deltas) / len(deltas) if deltas else 0.0
+        diff = {p: v for p, v in table.items() if base.get(p, 1.0) != v}
+        diff_str = ", ".join(f"{p} = {v:g}" for p, v in sorted(diff.items())) or "(baseline)"
+        print(f"[{c}] top path changed: {changed}/{len(rows)}, moved paths: {moved}, mean cost delta = {mean_delta:+.3f}  {diff_str}")
+
+    if args.out_jsonl:
+        Path(args.out_jsonl).parent.mkdir(parents = True, exist_ok = True)
+        with open(args.out_jsonl, "w", encoding = "utf-8") as f:
+            for r, s in zip(report.results, shifts):
+                record = {
+                    "index": r.index,
+                    "config": r.config,
+                    "source": r.source,
+                    "target": r.target,
+                    "paths": [path_to_dict(p) for p in r.paths],
+                    "error": r.error,
+                    "top_changed": s.top_changed,
+                    "cost_delta": s.cost_delta,
+                    "moved": s.moved,
+                }
+                f.write(json.dumps(record) + "\n")
+        print(f"\nOK: wrote {args.out_jsonl}")
 
 
 def cmd_summarize(args):
-    g = graph_from_json(args.graph)
+    g = open_graph(args, mmap = True)
 
     print(f"Graph: {args.graph}")
     print(f"n_nodes = {len(g.nodes)} n_edges = {len(g.edges)}\n")
 
-    type_counts = Counter([n.type for n in g.nodes.values()])
+    a = analyze_graph(g)
     print("Nodes by type:")
-    for t, c in sorted(type_counts.items(), key = lambda x: (-x[1], x[0])):
+    for t, c in ranked_counts(a.node_types):
         print(f"  {t}\t{c}")
     print("")
 
-    pred_counts = Counter([e.predicate for e in g.edges])
     print("Edges by predicate:")
-    for p, c in sorted(pred_counts.items(), key = lambda x: (-x[1], x[0])):
+    for p, c in ranked_counts(a.predicates):
         print(f"  {p}\t{c}")
     print("")
 
-    ev_counts = Counter([e.evidence_level for e in g.edges])
     print("Edges by evidence_level:")
-    for ev, c in sorted(ev_counts.items(), key = lambda x: (-x[1], x[0])):
+    for ev, c in ranked_counts(a.evidence_levels):
         print(f"  {ev}\t{c}")
 
 
 def cmd_lint(args):
-    # Reuse the standalone lint script logic by importing it is overkill; keep simple:
-    import subprocess, sys
-    r = subprocess.run([sys.executable, "scripts/lint_graph.py", args.graph])
-    raise SystemExit(r.returncode)
+    report = run_lint(open_graph(args, mmap = True), rules = args.rule, workers = args.workers)
+    if args.workers > 1 and report.shards == 1:
+        print("note: --workers only shards visitor rules; none of the selected rules is one, so lint ran in-process", file = sys.stderr)
+    if args.format != "text":
+        doc = report.to_sarif(artifact = args.graph) if args.format == "sarif" else report.to_dict()
+        text = json.dumps(doc, indent = 2, ensure_ascii = False) + "\n"
+        if args.out:
+            out_path = Path(args.out)
+            out_path.parent.mkdir(parents = True, exist_ok = True)
+            out_path.write_text(text, encoding = "utf-8")
+            print(f"{len(report.findings)} finding(s) -> {out_path}")
+        else:
+            print(text, end = "")
+        return
+
+    warnings = report.messages()
+    if warnings:
+        print(f"LINT WARNINGS ({len(warnings)}):")
+        for w in warnings:
+            print(f"- {w}")
+        return
+    print("OK: no lint warnings")
+
+
+def cmd_serve(args):
+    g = load_graph(args.graph, validate = QUERY_VALIDATION)
+    # Building distance labels is slow on large graphs: reuse a current <graph>.dist,
+    # otherwise the service builds the index on the first reach request.
+    distances = DistanceIndex.load(args.graph + DISTANCE_INDEX_SUFFIX, source = args.graph)
+    service = GraphService(g, index = NodeIndex.for_graph_file(g, args.graph), distances = distances)
+    if args.socket:
+        server = serve_unix(service, args.socket)
+        where = f"unix socket {args.socket}"
+    else:
+        server = serve_http(service, host = args.host, port = args.port)
+        where = f"http://{args.host}:{server.server_address[1]}"
+    print(f"Serving {args.graph} ({len(service.graph.nodes)} nodes / {len(service.graph.edges)} edges) on {where}", flush = True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket:
+            Path(args.socket).unlink(missing_ok = True)
+
+
+SHELL_COMMANDS = ("find", "explain", "explain-batch", "reach", "sweep", "summarize", "lint")
+
+
+def cmd_shell(args):
+    g = load_graph(args.graph, validate = QUERY_VALIDATION)
+    index = NodeIndex.for_graph_file(g, args.graph)
+    parser = build_parser()
+    print(f"Loaded {args.graph} ({len(g.nodes)} nodes / {len(g.edges)} edges).")
+    print(f"Commands: {', '.join(SHELL_COMMANDS)} (same options as the CLI, without the graph path); help; quit")
+    while True:
+        try:
+            line = input("kg> ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print("")
+            return
+        if not line:
+            continue
+        words = shlex.split(line)
+        if words[0] in ("quit", "exit"):
+            return
+        if words[0] == "help" or words[0] not in SHELL_COMMANDS:
+            if words[0] != "help":
+                print(f"Unknown command: {words[0]}")
+            print(f"Commands: {', '.join(SHELL_COMMANDS)}; add -h for options; quit")
+            continue
+        try:
+            sub_args = parser.parse_args([words[0], args.graph] + words[1:])
+            sub_args.resident = g
+            sub_args.resident_index = index
+            sub_args.func(sub_args)
+        except SystemExit as e:
+            # argparse errors/help and "No paths found." style exits end the command, not the shell.
+            if isinstance(e.code, str):
+                print(e.code)
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e}")
+
+
+def cmd_convert(args):
+    if args.progress and Path(args.graph).suffix in (".json", JSONL_SUFFIX):
+        def progress(n_nodes, n_edges, bytes_read):
+            print(f"  read {n_nodes} nodes / {n_edges} edges ({bytes_read} bytes)", flush = True)
+        load = graph_from_jsonl if Path(args.graph).suffix == JSONL_SUFFIX else graph_from_json
+        g = load(args.graph, progress = progress)
+    else:
+        g = load_graph(args.graph)
+    save_graph(g, args.out)
+    print(f"OK: wrote {len(g.nodes)} nodes / {len(g.edges)} edges -> {args.out}")
+
+
+def cmd_generate(args):
+    write_synthetic_graph(args.out, args.edges, seed = args.seed)
+    print(f"OK: synthetic graph with {args.edges} edges written -> {args.out}")
+
+
+def cmd_apply(args):
+    g = load_graph(args.graph)
+    changes = apply_delta(g, load_delta(args.delta))
+    counts = Counter(f"{c.op}_{c.kind}" for c in changes)
+    print(f"Applied {len(changes)} change(s): " + ", ".join(f"{k} = {v}" for k, v in sorted(counts.items())))
+    save_graph(g, args.out)
+    print(f"OK: wrote {len(g.nodes)} nodes / {len(g.edges)} edges -> {args.out}")
 
 
 def build_parser():
@@ -143,27 +590,106 @@ def build_parser():
     p_find.add_argument("graph")
     p_find.add_argument("keyword", nargs = "?", default = None)
     p_find.add_argument("--type", default = None, help = "Filter by node type (e.g., state, pathway, phenotype)")
+    p_find.add_argument("--ranked", action = "store_true", help = "Rank token matches (exact, prefix, substring, typo-tolerant) by field and quality")
+    p_find.add_argument("--no-fuzzy", action = "store_true", help = "With --ranked, disable typo-tolerant matching")
+    p_find.add_argument("--limit", type = int, default = None, help = "Show at most this many matches")
     p_find.set_defaults(func = cmd_find)
 
     p_exp = sub.add_parser("explain", help = "Explainable top-k paths from source to target")
     p_exp.add_argument("graph")
     p_exp.add_argument("source")
-    p_exp.add_argument("target")
-    p_exp.add_argument("-k", type = int, default = 5)
+    p_exp.add_argument("target", nargs = "*", help = "One target for top-k paths; several for the best path to each")
+    p_exp.add_argument("--target-type", default = None, help = "Also explain the best path to every node of this type")
+    p_exp.add_argument("-k", type = int, default = None, help = f"Paths to return for a single target (default: {DEFAULT_K})")
     p_exp.add_argument("--max-hops", type = int, default = 12)
     p_exp.add_argument("--out-md", default = None, help = "Write a Markdown report to this path")
+    p_exp.add_argument("--cache", default = None, help = "SQLite file for caching path results across runs")
     p_exp.add_argument("--no-cost", action = "store_true", help = "Hide per-edge cost/penalty components")
     p_exp.add_argument("--verbose", action = "store_true", help = "Include mechanism/notes when available")
+    p_exp.add_argument("--stats", action = "store_true", help = "Print search statistics (labels popped, edges relaxed, heap, max_hops pruning, phase timings)")
+    p_exp.add_argument("--distance-index", action = "store_true", help = "Answer from the distance index next to the graph (<graph>.dist, built on first use) when it can")
+    p_exp.add_argument("--signed", action = "store_true", help = "Best path for each net sign (+ activating / - inhibiting), from edge polarity and predicate")
+    p_exp.add_argument("--allow-type", action = "append", default = None, help = "Only pass through nodes of this type (repeatable; source/target/--via are exempt)")
+    p_exp.add_argument("--forbid-type", action = "append", default = None, help = "Never pass through nodes of this type (repeatable)")
+    p_exp.add_argument("--allow-predicate", action = "append", default = None, help = "Only follow edges with this predicate (repeatable)")
+    p_exp.add_argument("--forbid-predicate", action = "append", default = None, help = "Never follow edges with this predicate (repeatable)")
+    p_exp.add_argument("--min-evidence", choices = EVIDENCE_ORDER, default = None, help = "Weakest evidence level to follow (stronger levels are kept)")
+    p_exp.add_argument("--context", action = "append", default = None, metavar = "KEY=VALUE", help = "Skip edges whose context gives another value for KEY (repeatable)")
+    p_exp.add_argument("--strict-context", action = "store_true", help = "With --context, also skip edges without the key")
+    p_exp.add_argument("--via", action = "append", default = None, metavar = "NODE", help = "Node the path must visit, in the order given (repeatable; single target only)")
     p_exp.set_defaults(func = cmd_explain)
 
+    p_batch = sub.add_parser("explain-batch", help = "Explainable top-k paths for many source/target pairs in parallel")
+    p_batch.add_argument("graph")
+    p_batch.add_argument("pairs", help = "Text file with one 'source target' pair per line")
+    p_batch.add_argument("-k", type = int, default = 5)
+    p_batch.add_argument("--max-hops", type = int, default = 12)
+    p_batch.add_argument("--workers", type = int, default = None, help = "Worker processes (default: all cores; 1 = in-process)")
+    p_batch.add_argument("--out-md", default = None, help = "Stream a Markdown report to this path")
+    p_batch.add_argument("--out-jsonl", default = None, help = "Stream one JSON result per pair to this path")
+    p_batch.add_argument("--no-cost", action = "store_true", help = "Hide per-edge cost/penalty components")
+    p_batch.add_argument("--verbose", action = "store_true", help = "Include mechanism/notes when available")
+    p_batch.set_defaults(func = cmd_explain_batch)
+
+    p_reach = sub.add_parser("reach", help = "Reachability and best cost within max_hops for many pairs, from the distance index")
+    p_reach.add_argument("graph")
+    p_reach.add_argument("pairs", help = "Text file with one 'source target' pair per line")
+    p_reach.add_argument("--max-hops", type = int, default = 12)
+    p_reach.add_argument("--out-jsonl", default = None, help = "Write one JSON record per pair to this path")
+    p_reach.set_defaults(func = cmd_reach)
+
+    p_sweep = sub.add_parser("sweep", help = "Compare path rankings for many source/target pairs across penalty tables")
+    p_sweep.add_argument("graph")
+    p_sweep.add_argument("pairs", help = "Text file with one 'source target' pair per line")
+    p_sweep.add_argument("grid", help = "JSON list of penalty tables, or {\"base\": {...}, \"vary\": {\"predicate\": [values]}}")
+    p_sweep.add_argument("-k", type = int, default = 1)
+    p_sweep.add_argument("--max-hops", type = int, default = 12)
+    p_sweep.add_argument("--baseline", type = int, default = 0, help = "Grid index the other tables are compared with")
+    p_sweep.add_argument("--workers", type = int, default = None, help = "Worker processes (default: all cores; 1 = in-process)")
+    p_sweep.add_argument("--out-jsonl", default = None, help = "Write one JSON record per (pair, table) to this path")
+    p_sweep.set_defaults(func = cmd_sweep)
+
     p_sum = sub.add_parser("summarize", help ="Print summary counts")
     p_sum.add_argument("graph")
     p_sum.set_defaults(func = cmd_summarize)
 
     p_lint = sub.add_parser("lint", help = "Run lint warnings")
     p_lint.add_argument("graph")
+    p_lint.add_argument("--rule", action = "append", choices = list(LINT_RULES), default = None, help = "Run only this rule (repeatable; default: all)")
+    p_lint.add_argument("--format", choices = ["text", "json", "sarif"], default = "text")
+    p_lint.add_argument("--out", default = None, help = "Write the json/sarif output to this path instead of stdout")
+    p_lint.add_argument("--workers", type = int, default = 1, help = "Processes sharing the per-node/per-edge pass of visitor rules (plugin rules overriding visit_node/visit_edge); the built-in rules read one shared analytics sweep and always run in-process")
     p_lint.set_defaults(func = cmd_lint)
 
+    p_serve = sub.add_parser("serve", help = "Load the graph once and answer JSON queries over HTTP or a Unix socket")
+    p_serve.add_argument("graph")
+    p_serve.add_argument("--host", default = "127.0.0.1")
+    p_serve.add_argument("--port", type = int, default = 8765)
+    p_serve.add_argument("--socket", default = None, help = "Listen on this Unix socket path instead of HTTP")
+    p_serve.set_defaults(func = cmd_serve)
+
+    p_shell = sub.add_parser("shell", help = "Interactive prompt over a graph loaded once")
+    p_shell.add_argument("graph")
+    p_shell.set_defaults(func = cmd_shell)
+
+    p_apply = sub.add_parser("apply", help = "Apply a JSON delta (add/update/upsert/remove nodes and edges) to a graph")
+    p_apply.add_argument("graph")
+    p_apply.add_argument("delta", help = "Delta file: {\"changes\": [{\"op\": ...}, ...]}")
+    p_apply.add_argument("out", help = "Where to write the updated graph (format by suffix)")
+    p_apply.set_defaults(func = cmd_apply)
+
+    p_gen = sub.add_parser("generate", help = "Write a synthetic graph shaped like the curated pathway graph (for benchmarks)")
+    p_gen.add_argument("out", help = "Output path (.jsonl is streamed; .fhkg / JSON are built in memory)")
+    p_gen.add_argument("--edges", type = int, default = 10_000)
+    p_gen.add_argument("--seed", type = int, default = 0)
+    p_gen.set_defaults(func = cmd_generate)
+
+    p_conv = sub.add_parser("convert", help = "Convert between JSON, JSONL and the binary .fhkg format")
+    p_conv.add_argument("graph")
+    p_conv.add_argument("out", help = "Output path (.fhkg for binary, .jsonl for JSONL, otherwise JSON)")
+    p_conv.add_argument("--progress", action = "store_true", help = "Stream JSON/JSONL input and report progress")
+    p_conv.set_defaults(func = cmd_convert)
+
     return p
 
 
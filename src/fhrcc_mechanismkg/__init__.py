@@ -2,10 +2,12 @@
 
 from .schema import Node, Edge
 from .graph import Graph, build_minimal_example_graph
+from .compiled import CompiledGraph
 
 __all__ = [
     'Node',
     'Edge',
     'Graph',
+    'CompiledGraph',
     'build_minimal_example_graph',
 ]
@@ -0,0 +1,197 @@
+"""
+Graph-wide statistics shared by summaries and lint.
+
+`analyze_graph` computes, in one sweep over the graph's columns, everything
+`kg summarize`, scripts/summarize_graph.py and the lint rules read: category
+histograms, in/out-degree per node, hub rankings and the edge sets the lint
+rules report on. Counting runs through C-level builtins (Counter over
+`map`/`attrgetter`, list comprehensions) rather than per-edge Python
+statements; a memory-mapped .fhkg graph is analyzed straight from its coded
+columns (NumPy-vectorized when available), so no Edge objects are built
+except the few that end up in a lint warning.
+"""
+from __future__ import annotations
+import heapq
+import itertools
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from .binary import paused_gc
+from .compiled import np
+from .graph import Graph
+from .mapped import MappedGraph
+from .schema import Edge
+
+# Edges at or above this weight are checked by the high-weight lint rules.
+HIGH_WEIGHT = 0.70
+
+AnyGraph = Union[Graph, MappedGraph]
+
+
+@dataclass
+class GraphAnalytics:
+    n_nodes: int
+    n_edges: int
+    node_types: Dict[str, int]
+    predicates: Dict[str, int]
+    evidence_levels: Dict[str, int]
+    # Aligned with node_ids (graph node order).
+    node_ids: Sequence[str]
+    out_degree: Sequence[int]
+    in_degree: Sequence[int]
+    # Lint inputs, in graph edge order.
+    high_weight_hypotheses: List[Edge]
+    high_weight_missing_mechanism: List[Edge]
+    isolated_nodes: List[str]
+    # (subject, object) pairs with both an activates and an inhibits edge,
+    # ordered by the first edge between the two nodes.
+    contradictions: List[Tuple[str, str]]
+
+    def top_hubs(self, direction: str = "out", k: int = 10) -> List[Tuple[str, int]]:
+        """The k nodes of highest out- (or in-) degree, ties by node id; nodes without edges are left out."""
+        degree = self.out_degree if direction == "out" else self.in_degree
+        top = heapq.nlargest(k, range(len(degree)), key = degree.__getitem__)
+        if not top:
+            return []
+        # Every node tied with the k-th degree competes on node id.
+        cutoff = max(1, degree[top[-1]])
+        ranked = sorted(((self.node_ids[i], d) for i, d in enumerate(degree) if d >= cutoff), key = lambda x: (-x[1], x[0]))
+        return ranked[:k]
+
+    def degree_histogram(self, direction: str = "out") -> Dict[int, int]:
+        """degree -> number of nodes with that degree ("out", "in" or "total")."""
+        if direction == "total":
+            counts = Counter(map(int.__add__, self.out_degree, self.in_degree))
+        else:
+            counts = Counter(self.out_degree if direction == "out" else self.in_degree)
+        return dict(sorted(counts.items()))
+
+
+def ranked_counts(counts: Dict[str, int]) -> List[Tuple[str, int]]:
+    """Histogram entries by decreasing count, ties by key (the summary order)."""
+    return sorted(counts.items(), key = lambda x: (-x[1], x[0]))
+
+
+def analyze_graph(g: AnyGraph) -> GraphAnalytics:
+    # Millions of short-lived tuples and ints; see paused_gc.
+    with paused_gc():
+        if isinstance(g, MappedGraph):
+            return _analyze_mapped(g)
+        return _analyze_graph(g)
+
+
+def _analyze_graph(g: Graph) -> GraphAnalytics:
+    edges = g.edges
+    node_ids = list(g.nodes)
+    subjects = list(map(attrgetter("subject"), edges))
+    objects = list(map(attrgetter("object"), edges))
+    predicates = list(map(attrgetter("predicate"), edges))
+
+    out_counts, in_counts = Counter(subjects), Counter(objects)
+    out_degree = array("q", map(out_counts.__getitem__, node_ids))
+    in_degree = array("q", map(in_counts.__getitem__, node_ids))
+
+    heavy = [e for e in edges if e.weight >= HIGH_WEIGHT]
+    pairs = list(zip(subjects, objects))
+    activates = {pair for pair, p in zip(pairs, predicates) if p == "activates"}
+    inhibits = {pair for pair, p in zip(pairs, predicates) if p == "inhibits"}
+    both = activates & inhibits
+    contradictions: List[Tuple[str, str]] = []
+    if both:
+        contradictions = list(dict.fromkeys(pair for pair in pairs if pair in both))
+
+    return GraphAnalytics(
+        n_nodes = len(node_ids),
+        n_edges = len(edges),
+        node_types = dict(Counter(map(attrgetter("type"), g.nodes.values()))),
+        predicates = dict(Counter(predicates)),
+        evidence_levels = dict(Counter(map(attrgetter("evidence_level"), edges))),
+        node_ids = node_ids,
+        out_degree = out_degree,
+        in_degree = in_degree,
+        high_weight_hypotheses = [e for e in heavy if e.evidence_level == "hypothesis"],
+        high_weight_missing_mechanism = [e for e in heavy if _missing(e.mechanism)],
+        isolated_nodes = [n for n, a, b in zip(node_ids, out_degree, in_degree) if not a and not b],
+        contradictions = contradictions,
+    )
+
+
+def _analyze_mapped(g: MappedGraph) -> GraphAnalytics:
+    # Columns are in CSR (subject-grouped) order; edge_csr_position lists the
+    # CSR position of each edge in original order.
+    n, m = g.n_nodes, g.n_edges
+    offsets = g.column("edge_offsets")
+    targets = g.column("edge_target")
+    pred_codes = g.column("edge_predicate")
+    ev_codes = g.column("edge_evidence")
+    weights = g.column("edge_weight")
+    csr_position = g.column("edge_csr_position")
+
+    if np is not None and m:
+        degree = np.diff(np.frombuffer(offsets, dtype = np.int64))
+        subjects: Sequence[int] = np.repeat(np.arange(n, dtype = np.int64), degree).tolist()
+        out_degree: Sequence[int] = degree.tolist()
+        in_degree: Sequence[int] = np.bincount(np.frombuffer(targets, dtype = np.int32), minlength = n).tolist()
+        positions = np.frombuffer(csr_position, dtype = np.int32)
+        heavy = positions[np.frombuffer(weights, dtype = np.float64)[positions] >= HIGH_WEIGHT].tolist()
+    else:
+        out_degree = array("q", map(int.__sub__, offsets[1:], offsets[:-1]))
+        subjects = array("i", itertools.chain.from_iterable(map(itertools.repeat, range(n), out_degree)))
+        in_counts = Counter(targets)
+        in_degree = array("q", map(in_counts.__getitem__, range(n)))
+        heavy = [pos for pos in csr_position if weights[pos] >= HIGH_WEIGHT]
+
+    # CSR positions of the high-weight edges, in original edge order.
+    ev_names = g.evidence_level_names
+    hypothesis = ev_names.index("hypothesis") if "hypothesis" in ev_names else -1
+    mechanisms = g.column("edge_mechanism")
+    blank = {code for code in {mechanisms[pos] for pos in heavy} if _missing(g.string(code))}
+    edges = g.csr_edges
+
+    node_ids = list(g.node_ids)
+    type_names, pred_names = g.node_type_names, g.predicate_names
+    return GraphAnalytics(
+        n_nodes = n,
+        n_edges = m,
+        node_types = {type_names[c]: k for c, k in Counter(g.column("node_type")).items()},
+        predicates = {pred_names[c]: k for c, k in Counter(pred_codes).items()},
+        evidence_levels = {ev_names[c]: k for c, k in Counter(ev_codes).items()},
+        node_ids = node_ids,
+        out_degree = out_degree,
+        in_degree = in_degree,
+        high_weight_hypotheses = [edges[pos] for pos in heavy if ev_codes[pos] == hypothesis],
+        high_weight_missing_mechanism = [edges[pos] for pos in heavy if mechanisms[pos] in blank],
+        isolated_nodes = [node_ids[i] for i, (a, b) in enumerate(zip(out_degree, in_degree)) if not a and not b],
+        contradictions = _mapped_contradictions(g, subjects, targets, pred_codes, csr_position),
+    )
+
+
+def _mapped_contradictions(
+    g: MappedGraph,
+    subjects: Sequence[int],
+    targets: Sequence[int],
+    pred_codes: Sequence[int],
+    csr_position: Sequence[int],
+) -> List[Tuple[str, str]]:
+    names = g.predicate_names
+    if "activates" not in names or "inhibits" not in names:
+        return []
+    act, inh = names.index("activates"), names.index("inhibits")
+    # (subject, object) pairs packed as subject * n + object.
+    n = g.n_nodes
+    activates = {u * n + v for u, v, c in zip(subjects, targets, pred_codes) if c == act}
+    inhibits = {u * n + v for u, v, c in zip(subjects, targets, pred_codes) if c == inh}
+    both = activates & inhibits
+    if not both:
+        return []
+
+    # Order by the first edge (original order) between each pair.
+    first = dict.fromkeys(key for key in (subjects[pos] * n + targets[pos] for pos in csr_position) if key in both)
+    node_ids = g.node_ids
+    return [(node_ids[key // n], node_ids[key % n]) for key in first]
+
+
+def _missing(text: Optional[str]) -> bool:
+    return text is None or str(text).strip() == ""
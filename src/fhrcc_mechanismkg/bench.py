@@ -0,0 +1,257 @@
+"""
+Benchmark suite over synthetic graphs (see synthetic.py).
+
+Each benchmark times one operation of the toolkit (loading, validation,
+find, path search, report rendering) on a generated graph of a chosen size.
+Results are plain JSON so a run can be stored as a baseline and later runs
+compared against it:
+
+    python scripts/bench.py --edges 10000 --save benchmarks/baselines/edges_10000.json
+    python scripts/bench.py --edges 10000 --compare benchmarks/baselines/edges_10000.json
+
+Timings are the min and median of `repeat` runs; comparisons use the min,
+which is the least noisy estimate on a shared machine.
+"""
+from __future__ import annotations
+import json
+import platform
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from .compiled import CompiledGraph
+from .graph import Graph
+from .io import graph_from_dict, graph_from_json, graph_from_jsonl, graph_to_dict, load_graph, save_graph
+from .lint import lint_graph
+from .reasoning.path_search import PathResult, k_shortest_paths_explainable, shortest_path_explainable, shortest_paths_from
+from .reasoning.signed import signed_shortest_paths
+from .reporting import paths_to_markdown
+from .search import NodeIndex, find_nodes
+from .synthetic import write_synthetic_graph
+
+# Queries used by the find benchmarks (words from synthetic.NAME_WORDS).
+FIND_QUERIES = ("hif", "oxidative stress", "mito", "pseudohypoxa")
+
+
+@dataclass
+class BenchContext:
+    """Inputs shared by the benchmarks of one run (built once, untimed)."""
+
+    graph: Graph
+    compiled: CompiledGraph
+    json_path: str
+    jsonl_path: str
+    binary_path: str
+    payload: Dict[str, Any]
+    pairs: List[Tuple[str, str]]
+    index: NodeIndex
+    report_paths: List[PathResult]  # k-shortest paths of the pair with the longest best path
+    max_hops: int = 6
+
+    @classmethod
+    def build(cls, n_edges: int, workdir: str, seed: int = 0, max_hops: int = 6) -> "BenchContext":
+        base = Path(workdir)
+        jsonl_path = str(base / "graph.jsonl")
+        write_synthetic_graph(jsonl_path, n_edges, seed = seed)
+        graph = graph_from_jsonl(jsonl_path)
+        json_path, binary_path = str(base / "graph.json"), str(base / "graph.fhkg")
+        save_graph(graph, json_path)
+        save_graph(graph, binary_path)
+        compiled = graph.freeze()
+        pairs = _query_pairs(compiled, max_hops)
+        s, t = max(pairs, key = lambda p: len(shortest_path_explainable(compiled, p[0], p[1], max_hops = max_hops).steps))
+        return cls(
+            graph = graph,
+            compiled = compiled,
+            json_path = json_path,
+            jsonl_path = jsonl_path,
+            binary_path = binary_path,
+            payload = graph_to_dict(graph),
+            pairs = pairs,
+            index = NodeIndex.build(graph),
+            report_paths = k_shortest_paths_explainable(compiled, s, t, k = 5, max_hops = max_hops),
+            max_hops = max_hops,
+        )
+
+
+BENCHMARKS: Dict[str, Callable[[BenchContext], Any]] = {}
+
+
+def benchmark(name: str) -> Callable[[Callable[[BenchContext], Any]], Callable[[BenchContext], Any]]:
+    """Register a benchmark under `name`."""
+    def register(fn: Callable[[BenchContext], Any]) -> Callable[[BenchContext], Any]:
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+@benchmark("load_json")
+def _load_json(ctx: BenchContext) -> Any:
+    return graph_from_json(ctx.json_path)
+
+
+@benchmark("load_json_stream")
+def _load_json_stream(ctx: BenchContext) -> Any:
+    return graph_from_json(ctx.json_path, stream = True)
+
+
+@benchmark("load_jsonl")
+def _load_jsonl(ctx: BenchContext) -> Any:
+    return graph_from_jsonl(ctx.jsonl_path)
+
+
+@benchmark("load_binary")
+def _load_binary(ctx: BenchContext) -> Any:
+    return load_graph(ctx.binary_path)
+
+
+@benchmark("validate")
+def _validate(ctx: BenchContext) -> Any:
+    # Record checks and graph construction on an already parsed document.
+    return graph_from_dict(ctx.payload)
+
+
+@benchmark("validate_deferred")
+def _validate_deferred(ctx: BenchContext) -> Any:
+    return graph_from_dict(ctx.payload, validate = "deferred")
+
+
+@benchmark("validate_trusted")
+def _validate_trusted(ctx: BenchContext) -> Any:
+    return graph_from_dict(ctx.payload, validate = "trusted")
+
+
+@benchmark("lint")
+def _lint(ctx: BenchContext) -> Any:
+    return lint_graph(ctx.graph)
+
+
+@benchmark("freeze")
+def _freeze(ctx: BenchContext) -> Any:
+    return CompiledGraph.from_graph(ctx.graph)
+
+
+@benchmark("find_scan")
+def _find_scan(ctx: BenchContext) -> Any:
+    return [find_nodes(ctx.graph, keyword = q) for q in FIND_QUERIES]
+
+
+@benchmark("find_index_build")
+def _find_index_build(ctx: BenchContext) -> Any:
+    return NodeIndex.build(ctx.graph)
+
+
+@benchmark("find_ranked")
+def _find_ranked(ctx: BenchContext) -> Any:
+    return [ctx.index.search(q) for q in FIND_QUERIES]
+
+
+@benchmark("shortest_path")
+def _shortest_path(ctx: BenchContext) -> Any:
+    return [shortest_path_explainable(ctx.compiled, s, t, max_hops = ctx.max_hops) for s, t in ctx.pairs]
+
+
+@benchmark("signed_paths")
+def _signed_paths(ctx: BenchContext) -> Any:
+    return [signed_shortest_paths(ctx.compiled, s, t, max_hops = ctx.max_hops) for s, t in ctx.pairs]
+
+
+@benchmark("shortest_paths_from")
+def _shortest_paths_from(ctx: BenchContext) -> Any:
+    sources = sorted({s for s, _ in ctx.pairs})
+    return [shortest_paths_from(ctx.compiled, s, max_hops = ctx.max_hops) for s in sources]
+
+
+@benchmark("k_shortest")
+def _k_shortest(ctx: BenchContext) -> Any:
+    return [k_shortest_paths_explainable(ctx.compiled, s, t, k = 5, max_hops = ctx.max_hops) for s, t in ctx.pairs[:5]]
+
+
+@benchmark("report_markdown")
+def _report_markdown(ctx: BenchContext) -> Any:
+    return [paths_to_markdown(ctx.graph, ctx.report_paths, header = "Benchmark report", show_mechanism = True) for _ in range(20)]
+
+
+def run_benchmarks(
+    n_edges: int,
+    repeat: int = 5,
+    names: Optional[Sequence[str]] = None,
+    seed: int = 0,
+    progress: Optional[Callable[[str, Dict[str, float]], None]] = None,
+) -> Dict[str, Any]:
+    """Run the selected benchmarks (all by default) on a synthetic graph with `n_edges` edges."""
+    selected = list(names) if names else list(BENCHMARKS)
+    unknown = [n for n in selected if n not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)} (expected some of {', '.join(BENCHMARKS)})")
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        ctx = BenchContext.build(n_edges, workdir, seed = seed)
+        for name in selected:
+            fn = BENCHMARKS[name]
+            times = []
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                fn(ctx)
+                times.append(time.perf_counter() - start)
+            results[name] = {"min": min(times), "median": statistics.median(times), "repeat": len(times)}
+            if progress is not None:
+                progress(name, results[name])
+
+    return {
+        "meta": {
+            "n_nodes": len(ctx.graph.nodes),
+            "n_edges": len(ctx.graph.edges),
+            "seed": seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+@dataclass(frozen = True)
+class Comparison:
+    name: str
+    baseline: float  # seconds (min)
+    current: float
+    ratio: float  # current / baseline
+    regressed: bool
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 1.5) -> List[Comparison]:
+    """Compare two runs benchmark by benchmark; a ratio above `tolerance` is a regression."""
+    out: List[Comparison] = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = cur["min"] / base["min"] if base["min"] > 0 else float("inf")
+        out.append(Comparison(name, base["min"], cur["min"], ratio, ratio > tolerance))
+    return out
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    out_path = Path(path)
+    out_path.parent.mkdir(parents = True, exist_ok = True)
+    out_path.write_text(json.dumps(results, indent = 2) + "\n", encoding = "utf-8")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding = "utf-8"))
+
+
+def _query_pairs(cg: CompiledGraph, max_hops: int, n_sources: int = 5, per_source: int = 4) -> List[Tuple[str, str]]:
+    # Hubs as sources (the expensive, realistic case) and targets spread over
+    # what each can reach, so every pair has a path.
+    out_degree = sorted(range(cg.n_nodes), key = lambda i: (cg.offsets[i] - cg.offsets[i + 1], i))
+    pairs: List[Tuple[str, str]] = []
+    for i in out_degree[:n_sources]:
+        source = cg.node_ids[i]
+        reachable = sorted(shortest_paths_from(cg, source, max_hops = max_hops))
+        step = max(1, len(reachable) // per_source)
+        pairs.extend((source, t) for t in reachable[::step][:per_source])
+    return pairs
@@ -0,0 +1,361 @@
+"""
+Compact binary graph format (".fhkg").
+
+Layout (all integers little- or big-endian as recorded in the header):
+
+    MAGIC (8 bytes) | header length (uint64) | header JSON | sections...
+
+The JSON header holds the code tables (node types, predicates, evidence
+levels, polarities), the graph's content fingerprint (so a mapped file never
+hashes its records) and a section table `{name: [byte offset, typecode, count]}`.
+Each section is a packed `array` column starting on an 8-byte boundary, so the
+file can also be memory-mapped and read in place (see MappedGraph);
+`node_sorted` lists node indexes in id order for lookups without an index.
+
+Every string (ids, names, mechanisms, ...) is stored once in a NUL-terminated
+string table (`str_offsets` + `str_blob`); other columns refer to it by index,
+with -1 for None. Edges are stored in CSR order grouped by subject (`edge_offsets`,
+`edge_target`), with `edge_csr_position` mapping the original edge order onto
+CSR positions so a load round-trips exactly.
+"""
+
+from __future__ import annotations
+import gc
+import json
+import sys
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from .graph import Graph
+from .schema import EMPTY_DICT, EMPTY_LIST, Node, Edge
+
+MAGIC = b"FHKGBIN1"
+# Magic plus the header length field.
+PREAMBLE_SIZE = len(MAGIC) + 8
+FORMAT_VERSION = 2
+POLARITIES = ("+", "-", "0")
+_ALIGN = 8
+
+BinarySource = Union[bytes, bytearray, memoryview]
+
+
+def graph_to_binary(graph: Graph, path: str) -> None:
+    out_path = Path(path)
+    out_path.parent.mkdir(parents = True, exist_ok = True)
+    out_path.write_bytes(encode_graph(graph))
+
+
+def graph_from_binary(path: str) -> Graph:
+    return decode_graph(Path(path).read_bytes())
+
+
+def encode_graph(graph: Graph) -> bytes:
+    strings = _StringTable()
+    node_types = _CodeTable()
+    evidence_levels = _CodeTable()
+
+    cols: Dict[str, array] = {name: array(code) for name, code in _NODE_COLUMNS + _EDGE_COLUMNS}
+
+    cols["node_synonym_offsets"].append(0)
+    cols["node_xref_offsets"].append(0)
+    cols["node_tag_offsets"].append(0)
+    node_ids = list(graph.nodes)
+    cols["node_sorted"] = array("i", sorted(range(len(node_ids)), key = node_ids.__getitem__))
+    for n in graph.nodes.values():
+        cols["node_id"].append(strings.add(n.id))
+        cols["node_type"].append(node_types.add(n.type))
+        cols["node_name"].append(strings.add(n.name))
+        cols["node_description"].append(strings.add(n.description))
+        cols["node_synonyms"].extend(strings.add(x) for x in n.synonyms)
+        cols["node_synonym_offsets"].append(len(cols["node_synonyms"]))
+        for key, value in n.xrefs.items():
+            cols["node_xref_keys"].append(strings.add(key))
+            cols["node_xref_values"].append(strings.add(value))
+        cols["node_xref_offsets"].append(len(cols["node_xref_keys"]))
+        cols["node_tags"].extend(strings.add(x) for x in n.tags)
+        cols["node_tag_offsets"].append(len(cols["node_tags"]))
+
+    # The CSR snapshot already groups edges by subject and codes predicates.
+    cg = graph.freeze()
+    csr_position = {id(e): pos for pos, e in enumerate(cg.edges)}
+    cols["edge_offsets"] = array("q", cg.offsets)
+    cols["edge_target"] = array("i", cg.targets)
+    cols["edge_predicate"] = array("H", cg.predicate_codes)
+    cols["edge_neg_log_weight"] = array("d", cg.neg_log_weight)
+    cols["edge_context_offsets"].append(0)
+    cols["edge_citation_offsets"].append(0)
+    for e in cg.edges:
+        cols["edge_evidence"].append(evidence_levels.add(e.evidence_level))
+        cols["edge_polarity"].append(POLARITIES.index(e.polarity) if e.polarity is not None else -1)
+        cols["edge_weight"].append(float(e.weight))
+        cols["edge_mechanism"].append(strings.add(e.mechanism))
+        cols["edge_notes"].append(strings.add(e.notes))
+        for key, value in e.context.items():
+            cols["edge_context_keys"].append(strings.add(key))
+            cols["edge_context_values"].append(strings.add(value))
+        cols["edge_context_offsets"].append(len(cols["edge_context_keys"]))
+        cols["edge_citations"].extend(strings.add(x) for x in e.citations)
+        cols["edge_citation_offsets"].append(len(cols["edge_citations"]))
+
+    cols["edge_csr_position"] = array("q", [csr_position[id(e)] for e in graph.edges])
+
+    blob, str_offsets = strings.encode()
+    cols["str_offsets"] = str_offsets
+    cols["str_blob"] = array("B", blob)
+
+    header: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "schema_version": "0.1.0",
+        "byteorder": sys.byteorder,
+        "n_nodes": len(graph.nodes),
+        "n_edges": len(graph.edges),
+        "n_strings": len(strings),
+        "strings_nul_free": strings.nul_free,
+        "node_types": node_types.values,
+        "predicates": list(cg.predicate_names),
+        "evidence_levels": evidence_levels.values,
+        "polarities": list(POLARITIES),
+        "fingerprint": graph.fingerprint(),
+    }
+    return _pack(header, cols)
+
+
+def decode_graph(data: BinarySource) -> Graph:
+    header, cols = read_sections(data)
+    S = decode_strings(header, cols)
+    # Index -1 (None) lands on the trailing None.
+    S.append(None)
+
+    node_types = header["node_types"]
+    predicates = header["predicates"]
+    evidence_levels = header["evidence_levels"]
+    polarities = list(header["polarities"]) + [None]
+
+    c = {name: col.tolist() for name, col in cols.items() if name != "str_blob"}
+
+    with paused_gc():
+        syn_off, syn = c["node_synonym_offsets"], c["node_synonyms"]
+        xref_off, xref_k, xref_v = c["node_xref_offsets"], c["node_xref_keys"], c["node_xref_values"]
+        tag_off, tags = c["node_tag_offsets"], c["node_tags"]
+        nodes: Dict[str, Node] = {}
+        node_ids: List[str] = []
+        node_columns = zip(c["node_id"], c["node_type"], c["node_name"], c["node_description"])
+        for i, (nid, ntype, name, desc) in enumerate(node_columns):
+            node_id = S[nid]
+            node_ids.append(node_id)
+            a, b = xref_off[i], xref_off[i + 1]
+            nodes[node_id] = Node.unchecked(
+                node_id,
+                node_types[ntype],
+                S[name],
+                [S[x] for x in syn[syn_off[i]:syn_off[i + 1]]],
+                S[desc],
+                {S[k]: S[v] for k, v in zip(xref_k[a:b], xref_v[a:b])} if b > a else EMPTY_DICT,
+                [S[x] for x in tags[tag_off[i]:tag_off[i + 1]]],
+            )
+
+        offsets = c["edge_offsets"]
+        subjects = [node_ids[u] for u in range(len(node_ids)) for _ in range(offsets[u + 1] - offsets[u])]
+        n_edges = len(subjects)
+        contexts: List[Dict[str, str]] = [EMPTY_DICT] * n_edges
+        ctx_off, ctx_k, ctx_v = c["edge_context_offsets"], c["edge_context_keys"], c["edge_context_values"]
+        for pos in range(n_edges) if ctx_k else ():
+            a, b = ctx_off[pos], ctx_off[pos + 1]
+            if b > a:
+                contexts[pos] = {S[k]: S[v] for k, v in zip(ctx_k[a:b], ctx_v[a:b])}
+        citations: List[List[str]] = [EMPTY_LIST] * n_edges
+        cit_off, cits = c["edge_citation_offsets"], c["edge_citations"]
+        for pos in range(n_edges) if cits else ():
+            citations[pos] = [S[x] for x in cits[cit_off[pos]:cit_off[pos + 1]]]
+
+        # Column-wise construction in CSR order, then back to the original edge order.
+        string_at = S.__getitem__
+        csr_edges = list(map(
+            Edge.unchecked,
+            subjects,
+            map(predicates.__getitem__, c["edge_predicate"]),
+            map(node_ids.__getitem__, c["edge_target"]),
+            c["edge_weight"],
+            map(evidence_levels.__getitem__, c["edge_evidence"]),
+            map(polarities.__getitem__, c["edge_polarity"]),
+            map(string_at, c["edge_mechanism"]),
+            contexts,
+            citations,
+            map(string_at, c["edge_notes"]),
+        ))
+        edges = list(map(csr_edges.__getitem__, c["edge_csr_position"]))
+
+    return Graph(nodes = nodes, edges = edges)
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Suspend the cyclic garbage collector while bulk-creating objects. Loads
+    allocate millions of acyclic records, and repeated generational collections
+    over the growing heap would otherwise dominate load time.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def read_sections(data: BinarySource) -> Tuple[Dict[str, Any], Dict[str, Sequence[Any]]]:
+    """
+    Parse the header and return zero-copy typed views of every section. Views
+    are memoryviews when the file's byte order matches this machine, otherwise
+    byte-swapped array copies.
+    """
+    # Checked through plain slices first, so a bad file raises before any
+    # view of `data` exists (a mapping cannot close while one does).
+    if len(data) < PREAMBLE_SIZE or bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a FHRCC_mechanismKG binary graph (bad magic)")
+    header_len = int.from_bytes(data[len(MAGIC):PREAMBLE_SIZE], "little")
+    if PREAMBLE_SIZE + header_len > len(data):
+        raise ValueError("Truncated FHRCC_mechanismKG binary graph (header)")
+    header = json.loads(bytes(data[PREAMBLE_SIZE:PREAMBLE_SIZE + header_len]).decode("utf-8"))
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary format version: {header.get('format_version')} (expected {FORMAT_VERSION}; re-run kg convert)")
+    for name, (offset, typecode, count) in header["sections"].items():
+        if offset + array(typecode).itemsize * count > len(data):
+            raise ValueError(f"Truncated FHRCC_mechanismKG binary graph (section {name})")
+
+    buf = memoryview(data)
+    swap = header["byteorder"] != sys.byteorder
+    cols: Dict[str, Sequence[Any]] = {}
+    for name, (offset, typecode, count) in header["sections"].items():
+        size = array(typecode).itemsize
+        raw = buf[offset:offset + size * count]
+        if swap and size > 1:
+            col = array(typecode, raw.tobytes())
+            col.byteswap()
+            cols[name] = col
+        else:
+            cols[name] = raw.cast(typecode)
+    return header, cols
+
+
+def decode_strings(header: Dict[str, Any], cols: Dict[str, Sequence[Any]]) -> List[Optional[str]]:
+    blob = cols["str_blob"]
+    if header["n_strings"] == 0:
+        return []
+    if header["strings_nul_free"]:
+        strings: List[Optional[str]] = bytes(blob).decode("utf-8").split("\0")
+        strings.pop()  # after the final terminator
+        return strings
+    offsets = cols["str_offsets"]
+    raw = bytes(blob)
+    return [raw[offsets[i]:offsets[i + 1] - 1].decode("utf-8") for i in range(header["n_strings"])]
+
+
+_NODE_COLUMNS = (
+    ("node_id", "i"),
+    ("node_type", "B"),
+    ("node_name", "i"),
+    ("node_description", "i"),
+    ("node_synonym_offsets", "q"),
+    ("node_synonyms", "i"),
+    ("node_xref_offsets", "q"),
+    ("node_xref_keys", "i"),
+    ("node_xref_values", "i"),
+    ("node_tag_offsets", "q"),
+    ("node_tags", "i"),
+    ("node_sorted", "i"),
+)
+
+_EDGE_COLUMNS = (
+    ("edge_offsets", "q"),
+    ("edge_target", "i"),
+    ("edge_predicate", "H"),
+    ("edge_evidence", "B"),
+    ("edge_polarity", "b"),
+    ("edge_weight", "d"),
+    ("edge_neg_log_weight", "d"),
+    ("edge_mechanism", "i"),
+    ("edge_notes", "i"),
+    ("edge_context_offsets", "q"),
+    ("edge_context_keys", "i"),
+    ("edge_context_values", "i"),
+    ("edge_citation_offsets", "q"),
+    ("edge_citations", "i"),
+    ("edge_csr_position", "q"),
+)
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+        self.nul_free = True
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        idx = self.index.get(value)
+        if idx is None:
+            idx = self.index[value] = len(self.values)
+            self.values.append(value)
+            if "\0" in value:
+                self.nul_free = False
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self) -> Tuple[bytes, array]:
+        # NUL-terminated so a NUL-free table decodes with a single split().
+        offsets = array("q", [0])
+        blob = bytearray()
+        for value in self.values:
+            blob += value.encode("utf-8")
+            blob.append(0)
+            offsets.append(len(blob))
+        return bytes(blob), offsets
+
+
+class _CodeTable:
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _pack(header: Dict[str, Any], cols: Dict[str, array]) -> bytes:
+    # Section offsets depend on the header length, which depends on the offsets:
+    # lay out with a provisional header, then re-pack until the length is stable.
+    sections: Dict[str, List[Any]] = {name: [0, col.typecode, len(col)] for name, col in cols.items()}
+    while True:
+        header["sections"] = sections
+        header_bytes = json.dumps(header, separators = (",", ":")).encode("utf-8")
+        pos = _aligned(PREAMBLE_SIZE + len(header_bytes))
+        changed = False
+        for name, col in cols.items():
+            if sections[name][0] != pos:
+                sections[name][0] = pos
+                changed = True
+            pos = _aligned(pos + col.itemsize * len(col))
+        if not changed:
+            break
+
+    out = bytearray(MAGIC)
+    out += len(header_bytes).to_bytes(8, "little")
+    out += header_bytes
+    for name, col in cols.items():
+        out += b"\0" * (sections[name][0] - len(out))
+        out += col.tobytes()
+    return bytes(out)
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
@@ -0,0 +1,280 @@
+from __future__ import annotations
+import math
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from .fingerprint import content_fingerprint
+from .schema import Edge, Node
+
+if TYPE_CHECKING:
+    from .graph import Graph
+
+try:  # NumPy is an optional extra (pip install fhrcc-mechanismkg[fast])
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+
+# Cost of a predicate missing from a penalty table (mirrors edge_cost).
+UNKNOWN_PREDICATE_PENALTY = 1.0
+
+# Cost vectors kept per snapshot (least recently used tables are dropped first).
+COST_CACHE_SIZE = 64
+
+
+def penalty_key(predicate_penalty: Mapping[str, float]) -> Tuple[Tuple[str, float], ...]:
+    """Hashable, order-independent key for a predicate penalty table."""
+    return tuple(sorted((str(p), float(v)) for p, v in predicate_penalty.items()))
+
+
+class CompiledGraph:
+    """
+    Read-only CSR snapshot of a Graph, used by the path-search engine.
+
+    Node ids are mapped to dense integers (`index` / `node_ids`). The outgoing
+    edges of node `i` occupy positions `offsets[i]:offsets[i + 1]` of `targets`
+    (object node index), `edges` (the original Edge), `predicate_codes` and
+    `neg_log_weight`. Per-edge costs are derived from those columns once per
+    penalty table in one vectorized pass and cached (see `costs` and
+    `cost_matrix`). The columns may be `array`s or
+    read-only memoryviews (see MappedGraph).
+
+    The reverse adjacency (`reverse()`) is built lazily for backward searches.
+    Other derived search structures (e.g. landmark distances) can be cached on
+    the snapshot with `memo`.
+
+    Build one with `Graph.freeze()`; the snapshot does not follow later
+    mutations of the source graph (`with_edges` derives an updated copy).
+    """
+
+    def __init__(
+        self,
+        node_ids: Sequence[str],
+        offsets: array,
+        targets: array,
+        edges: Sequence[Edge],
+        predicate_names: Sequence[str],
+        predicate_codes: array,
+        neg_log_weight: array,
+        nodes: Optional[Mapping[str, Node]] = None,
+        index: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self.node_ids = node_ids
+        self.index: Mapping[str, int] = index if index is not None else {nid: i for i, nid in enumerate(node_ids)}
+        self.offsets = offsets
+        self.targets = targets
+        self.edges = edges
+        self.predicate_names = tuple(predicate_names)
+        self.predicate_codes = predicate_codes
+        self.neg_log_weight = neg_log_weight
+        self.nodes: Mapping[str, Node] = nodes if nodes is not None else {}
+        self._cost_cache: "OrderedDict[Tuple[Tuple[str, float], ...], array]" = OrderedDict()
+        self._reverse: Optional[Tuple[array, array, array]] = None
+        self._memo: Dict[Any, Any] = {}
+
+    @classmethod
+    def from_graph(cls, graph: "Graph") -> "CompiledGraph":
+        node_ids = list(graph.nodes)
+        index = {nid: i for i, nid in enumerate(node_ids)}
+
+        # Counting sort of edges by subject index -> CSR layout.
+        offsets = array("q", [0]) * (len(node_ids) + 1)
+        for e in graph.edges:
+            offsets[index[e.subject] + 1] += 1
+        for i in range(len(node_ids)):
+            offsets[i + 1] += offsets[i]
+
+        n_edges = len(graph.edges)
+        fill = array("q", offsets[:-1])
+        slots: List[Optional[Edge]] = [None] * n_edges
+        for e in graph.edges:
+            i = index[e.subject]
+            slots[fill[i]] = e
+            fill[i] += 1
+        edges: List[Edge] = slots  # type: ignore[assignment]
+
+        predicate_names: List[str] = []
+        predicate_index: Dict[str, int] = {}
+        predicate_codes = array("H")
+        targets = array("i")
+        neg_log_weight = array("d")
+        for e in edges:
+            code = predicate_index.get(e.predicate)
+            if code is None:
+                code = predicate_index[e.predicate] = len(predicate_names)
+                predicate_names.append(e.predicate)
+            predicate_codes.append(code)
+            targets.append(index[e.object])
+            neg_log_weight.append(-math.log(e.weight))
+
+        return cls(
+            node_ids = node_ids,
+            offsets = offsets,
+            targets = targets,
+            edges = edges,
+            predicate_names = predicate_names,
+            predicate_codes = predicate_codes,
+            neg_log_weight = neg_log_weight,
+            nodes = dict(graph.nodes),
+        )
+
+    def with_edges(self, replaced: Mapping[int, Edge]) -> "CompiledGraph":
+        """
+        A copy of the snapshot with the edges at some CSR positions replaced by
+        edges with the same subject and object (weight, predicate or annotation
+        updates), so the layout is unchanged.
+
+        The layout columns, node maps and reverse adjacency are shared; the
+        weight and predicate columns are copied and patched. Cached cost
+        vectors are carried over with only the replaced positions recomputed;
+        other memoized structures are not.
+        """
+        edges = list(self.edges)
+        predicate_names = list(self.predicate_names)
+        predicate_index = {p: i for i, p in enumerate(predicate_names)}
+        predicate_codes = array("H", self.predicate_codes)
+        neg_log_weight = array("d", self.neg_log_weight)
+        for pos, e in replaced.items():
+            code = predicate_index.get(e.predicate)
+            if code is None:
+                code = predicate_index[e.predicate] = len(predicate_names)
+                predicate_names.append(e.predicate)
+            edges[pos] = e
+            predicate_codes[pos] = code
+            neg_log_weight[pos] = -math.log(e.weight)
+
+        cg = CompiledGraph(
+            node_ids = self.node_ids,
+            offsets = self.offsets,
+            targets = self.targets,
+            edges = edges,
+            predicate_names = predicate_names,
+            predicate_codes = predicate_codes,
+            neg_log_weight = neg_log_weight,
+            nodes = self.nodes,
+            index = self.index,
+        )
+        cg._reverse = self._reverse
+        for key, cached in self._cost_cache.items():
+            table = dict(key)
+            costs = array("d", cached)
+            for pos, e in replaced.items():
+                costs[pos] = neg_log_weight[pos] + float(table.get(e.predicate, UNKNOWN_PREDICATE_PENALTY))
+            cg._cost_cache[key] = costs
+        return cg
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.targets)
+
+    def node_index(self, node_id: str) -> int:
+        try:
+            return self.index[node_id]
+        except KeyError as e:
+            raise KeyError(f"Node not found: {node_id}") from e
+
+    def penalties(self, predicate_penalty: Mapping[str, float]) -> List[float]:
+        """Penalty of each predicate code (`predicate_names` order) under a table."""
+        return [float(predicate_penalty.get(p, UNKNOWN_PREDICATE_PENALTY)) for p in self.predicate_names]
+
+    def costs(self, predicate_penalty: Mapping[str, float]) -> array:
+        """
+        Per-edge additive costs (CSR order) for a penalty table, equal to
+        `edge_cost(edges[i], predicate_penalty)`.
+
+        The vector is one gather-and-add over the `neg_log_weight` and
+        `predicate_codes` columns (NumPy when installed, a single Python pass
+        otherwise) and is cached per table contents, so repeated queries and
+        sweeps revisiting a table reuse it.
+        """
+        key = penalty_key(predicate_penalty)
+        cached = self._cost_cache.get(key)
+        if cached is not None:
+            self._cost_cache.move_to_end(key)
+            return cached
+
+        pen = self.penalties(predicate_penalty)
+        if np is not None and self.n_edges:
+            out = array("d")
+            out.frombytes(self._np_weights() + np.asarray(pen, dtype = np.float64)[self._np_codes()])
+        else:
+            out = array("d", [w + pen[c] for w, c in zip(self.neg_log_weight, self.predicate_codes)])
+        self._cost_cache[key] = out
+        if len(self._cost_cache) > COST_CACHE_SIZE:
+            self._cost_cache.popitem(last = False)
+        return out
+
+    def cost_matrix(self, predicate_penalties: Sequence[Mapping[str, float]]) -> Any:
+        """
+        Edge costs for many penalty tables at once: row `t` equals
+        `costs(predicate_penalties[t])`.
+
+        With NumPy this is a (tables x edges) float64 array built by a single
+        fancy-index over a (tables x predicates) penalty matrix, so sweeping
+        penalty configurations is a column operation rather than a pass per
+        table. Without NumPy a list of cached cost vectors is returned.
+        """
+        if np is None or not self.n_edges:
+            return [self.costs(table) for table in predicate_penalties]
+        pen = np.asarray([self.penalties(table) for table in predicate_penalties], dtype = np.float64)
+        pen = pen.reshape(len(predicate_penalties), len(self.predicate_names))
+        return self._np_weights()[np.newaxis, :] + pen[:, self._np_codes()]
+
+    def _np_weights(self) -> Any:
+        return self.memo("np_weights", lambda: np.frombuffer(self.neg_log_weight, dtype = np.float64))
+
+    def _np_codes(self) -> Any:
+        return self.memo("np_codes", lambda: np.frombuffer(self.predicate_codes, dtype = np.uint16).astype(np.intp))
+
+    def reverse(self) -> Tuple[array, array, array]:
+        """
+        Incoming adjacency in CSR form: `(in_offsets, in_sources, in_positions)`.
+        The incoming edges of node `i` occupy `in_offsets[i]:in_offsets[i + 1]`;
+        `in_positions` maps each one back to its forward CSR position.
+        """
+        if self._reverse is None:
+            n = self.n_nodes
+            in_offsets = array("q", [0]) * (n + 1)
+            for v in self.targets:
+                in_offsets[v + 1] += 1
+            for i in range(n):
+                in_offsets[i + 1] += in_offsets[i]
+
+            fill = array("q", in_offsets[:-1])
+            in_sources = array("i", [0]) * self.n_edges
+            in_positions = array("q", [0]) * self.n_edges
+            offsets, targets = self.offsets, self.targets
+            for u in range(n):
+                for pos in range(offsets[u], offsets[u + 1]):
+                    v = targets[pos]
+                    slot = fill[v]
+                    in_sources[slot] = u
+                    in_positions[slot] = pos
+                    fill[v] = slot + 1
+            self._reverse = (in_offsets, in_sources, in_positions)
+        return self._reverse
+
+    def memo(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Cache a structure derived from this (immutable) snapshot."""
+        if key not in self._memo:
+            self._memo[key] = build()
+        return self._memo[key]
+
+    def fingerprint(self) -> str:
+        """Content hash of the snapshot (equal to the source Graph's fingerprint)."""
+        return self.memo("fingerprint", lambda: content_fingerprint(self.nodes.values(), self.edges))
+
+    def as_numpy(self) -> Dict[str, Any]:
+        """Zero-copy NumPy views of the CSR columns (requires the `fast` extra)."""
+        if np is None:
+            raise ImportError("NumPy is required for CompiledGraph.as_numpy(); install the 'fast' extra")
+        return {
+            "offsets": np.frombuffer(self.offsets, dtype = np.int64),
+            "targets": np.frombuffer(self.targets, dtype = np.int32),
+            "predicate_codes": np.frombuffer(self.predicate_codes, dtype = np.uint16),
+            "neg_log_weight": np.frombuffer(self.neg_log_weight, dtype = np.float64),
+        }
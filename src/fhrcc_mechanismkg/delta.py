@@ -0,0 +1,167 @@
+"""
+Change logs and delta files for incremental graph curation.
+
+A delta is a JSON document listing operations to apply, in order, to an
+already-loaded graph:
+
+    {
+      "schema_version": "0.1.0",
+      "changes": [
+        {"op": "add_node", "node": {...}},
+        {"op": "update_node", "node": {...}},
+        {"op": "upsert_node", "node": {...}},
+        {"op": "remove_node", "id": "gene:X", "cascade": true},
+        {"op": "add_edge", "edge": {...}},
+        {"op": "update_edge", "edge": {...}},
+        {"op": "upsert_edge", "edge": {...}},
+        {"op": "remove_edge", "subject": "...", "predicate": "...", "object": "..."}
+      ]
+    }
+
+Node and edge records use the graph JSON layout. Edges are addressed by
+(subject, predicate, object); `update_edge` replaces the edge with the
+record's key. Applying a delta is all-or-nothing: if an operation fails, the
+operations already applied are rolled back before the error propagates.
+"""
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from .graph import Change, Graph
+from .io import SCHEMA_VERSION, edge_from_record, edge_to_record, node_from_record, node_to_record
+from .schema import Edge
+
+DeltaOp = Dict[str, Any]
+
+
+class ChangeLog:
+    """Records every Change made to a graph while attached."""
+
+    def __init__(self, graph: Optional[Graph] = None) -> None:
+        self.changes: List[Change] = []
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        if graph is not None:
+            self.attach(graph)
+
+    def attach(self, graph: Graph) -> None:
+        self.detach()
+        self._unsubscribe = graph.subscribe(self.changes.append)
+
+    def detach(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __enter__(self) -> "ChangeLog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.detach()
+
+    def clear(self) -> None:
+        self.changes.clear()
+
+    def to_delta(self) -> Dict[str, Any]:
+        """The recorded changes as a delta document that replays them."""
+        return {"schema_version": SCHEMA_VERSION, "changes": [op for c in self.changes for op in change_to_ops(c)]}
+
+    def undo(self, graph: Graph) -> None:
+        """Revert the recorded changes on `graph`, newest first, and clear the log."""
+        self.detach()
+        for change in reversed(self.changes):
+            if change.kind == "node":
+                if change.after is None:
+                    graph.add_node(change.before)  # type: ignore[arg-type]
+                elif change.before is None:
+                    graph.remove_node(change.after.id)  # type: ignore[union-attr]
+                else:
+                    graph.update_node(change.before)  # type: ignore[arg-type]
+            else:
+                if change.after is None:
+                    graph.add_edge(change.before)  # type: ignore[arg-type]
+                elif change.before is None:
+                    graph.remove_edge(change.after)  # type: ignore[arg-type]
+                else:
+                    graph.update_edge(change.after, change.before)  # type: ignore[arg-type]
+        self.changes.clear()
+
+
+def change_to_ops(change: Change) -> List[DeltaOp]:
+    if change.kind == "node":
+        if change.after is None:
+            return [{"op": "remove_node", "id": change.before.id}]  # type: ignore[union-attr]
+        op = "add_node" if change.before is None else "update_node"
+        return [{"op": op, "node": node_to_record(change.after)}]  # type: ignore[arg-type]
+
+    before, after = change.before, change.after
+    if after is None:
+        return [{"op": "remove_edge", **_edge_key(before)}]  # type: ignore[arg-type]
+    if before is None:
+        return [{"op": "add_edge", "edge": edge_to_record(after)}]  # type: ignore[arg-type]
+    if _edge_key(before) == _edge_key(after):  # type: ignore[arg-type]
+        return [{"op": "update_edge", "edge": edge_to_record(after)}]  # type: ignore[arg-type]
+    return [{"op": "remove_edge", **_edge_key(before)}, {"op": "add_edge", "edge": edge_to_record(after)}]  # type: ignore[arg-type]
+
+
+def apply_delta(graph: Graph, delta: Union[Dict[str, Any], Iterable[DeltaOp]]) -> List[Change]:
+    """Apply a delta (document or list of operations) in place; returns the resulting changes."""
+    ops = delta.get("changes", []) if isinstance(delta, dict) else delta
+    log = ChangeLog(graph)
+    try:
+        for i, op in enumerate(ops):
+            try:
+                _apply_op(graph, op)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Delta operation {i} ({op.get('op')!r}) failed: {str(e).strip(chr(39))}") from e
+    except BaseException:
+        log.undo(graph)
+        raise
+    log.detach()
+    return log.changes
+
+
+def load_delta(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding = "utf-8"))
+
+
+def save_delta(delta: Dict[str, Any], path: str) -> None:
+    out_path = Path(path)
+    out_path.parent.mkdir(parents = True, exist_ok = True)
+    out_path.write_text(json.dumps(delta, indent = 2), encoding = "utf-8")
+
+
+def _apply_op(graph: Graph, op: DeltaOp) -> None:
+    kind = op["op"]
+    if kind == "add_node":
+        graph.add_node(node_from_record(op["node"]))
+    elif kind == "update_node":
+        graph.update_node(node_from_record(op["node"]))
+    elif kind == "upsert_node":
+        graph.upsert_node(node_from_record(op["node"]))
+    elif kind == "remove_node":
+        graph.remove_node(op["id"], cascade = bool(op.get("cascade", False)))
+    elif kind == "add_edge":
+        graph.add_edge(edge_from_record(op["edge"]))
+    elif kind == "update_edge":
+        new = edge_from_record(op["edge"])
+        graph.update_edge(_existing_edge(graph, op["edge"]), new)
+    elif kind == "upsert_edge":
+        graph.upsert_edge(edge_from_record(op["edge"]))
+    elif kind == "remove_edge":
+        graph.remove_edge(_existing_edge(graph, op))
+    else:
+        raise ValueError(f"Unknown delta op: {kind!r}")
+
+
+def _existing_edge(graph: Graph, key: Dict[str, Any]) -> Edge:
+    edge = graph.edge_by_key(key["subject"], key["predicate"], key["object"])
+    if edge is None:
+        raise ValueError(f"Edge not found: {key['subject']} --{key['predicate']}--> {key['object']}")
+    return edge
+
+
+def _edge_key(edge: Edge) -> Dict[str, str]:
+    return {"subject": edge.subject, "predicate": edge.predicate, "object": edge.object}
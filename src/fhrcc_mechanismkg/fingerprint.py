@@ -0,0 +1,52 @@
+from __future__ import annotations
+import hashlib
+from typing import Iterable
+from .schema import Node, Edge
+
+# Content fingerprints are order-independent sums of per-record digests, so a
+# graph's fingerprint depends only on its set of nodes and (multi)set of edges.
+_MODULUS = 1 << 128
+
+
+def node_digest(node: Node) -> int:
+    record = (
+        "node",
+        node.id,
+        node.type,
+        node.name,
+        tuple(node.synonyms),
+        node.description,
+        tuple(sorted(node.xrefs.items())),
+        tuple(node.tags),
+    )
+    return _digest(record)
+
+
+def edge_digest(edge: Edge) -> int:
+    record = (
+        "edge",
+        edge.subject,
+        edge.predicate,
+        edge.object,
+        float(edge.weight),
+        edge.evidence_level,
+        edge.polarity,
+        edge.mechanism,
+        tuple(sorted(edge.context.items())),
+        tuple(edge.citations),
+        edge.notes,
+    )
+    return _digest(record)
+
+
+def combine(digests: Iterable[int]) -> int:
+    return sum(digests) % _MODULUS
+
+
+def content_fingerprint(nodes: Iterable[Node], edges: Iterable[Edge]) -> str:
+    total = combine(node_digest(n) for n in nodes) + combine(edge_digest(e) for e in edges)
+    return format(total % _MODULUS, "032x")
+
+
+def _digest(record: tuple) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(record).encode("utf-8"), digest_size = 16).digest(), "big")
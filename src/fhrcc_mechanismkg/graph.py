@@ -1,18 +1,224 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Iterable, Optional
+from typing import Callable, Dict, List, Iterable, Optional, Tuple, Union
 from .schema import Node, Edge
+from .compiled import CompiledGraph
+from .fingerprint import _MODULUS, edge_digest, node_digest, content_fingerprint
+
+
+@dataclass(frozen = True)
+class Change:
+    """One mutation of a Graph: `before` is None for additions, `after` for removals."""
+    kind: str  # 'node' or 'edge'
+    before: Optional[Union[Node, Edge]]
+    after: Optional[Union[Node, Edge]]
+
+    @property
+    def op(self) -> str:
+        if self.before is None:
+            return 'add'
+        if self.after is None:
+            return 'remove'
+        return 'update'
+
+
+Listener = Callable[[Change], None]
 
 
 @dataclass
 class Graph:
+    """
+    Directed, typed multigraph of mechanism claims.
+
+    Subject, object, predicate and (subject, predicate) indexes make adjacency
+    lookups cost O(degree) instead of O(|E|). They are built in one pass on the
+    first lookup (so bulk loads stay cheap) and the mutation methods keep them
+    in sync afterwards. Mutate the graph through its methods; changing `nodes`
+    or `edges` directly bypasses the indexes.
+
+    Nodes and edges can also be updated or removed (`update_*`, `upsert_*`,
+    `remove_*`) in O(degree): a slot map finds an edge's position in `edges`,
+    and a removed edge's slot is filled with the last edge (so removals do not
+    keep the order of `edges`; updates do). Every mutation is reported as a
+    Change to the listeners registered with `subscribe()`, which is how
+    dependent structures (a ChangeLog, a search index) follow the graph
+    without being rebuilt.
+
+    `freeze()` returns a read-only CompiledGraph snapshot for path search and
+    `fingerprint()` a content hash of the nodes and edges; the fingerprint is
+    adjusted in place. Edge updates that keep both endpoints (new weight,
+    predicate or annotations) leave the CSR layout unchanged, so the next
+    `freeze()` patches a copy of the snapshot (and its cached cost vectors)
+    at those positions; any other mutation rebuilds it.
+    """
     nodes: Dict[str, Node] = field(default_factory = dict)
     edges: List[Edge] = field(default_factory = list)
+    _out: Dict[str, List[Edge]] = field(default_factory = dict, init = False, repr = False, compare = False)
+    _in: Dict[str, List[Edge]] = field(default_factory = dict, init = False, repr = False, compare = False)
+    # Predicate buckets hold a large share of all edges, so they map id(edge) -> edge
+    # for O(1) removal; built on the first predicate-only lookup.
+    _by_predicate: Optional[Dict[str, Dict[int, Edge]]] = field(default = None, init = False, repr = False, compare = False)
+    _by_subject_predicate: Dict[Tuple[str, str], List[Edge]] = field(
+        default_factory = dict, init = False, repr = False, compare = False
+    )
+    _indexed: bool = field(default = False, init = False, repr = False, compare = False)
+    # Position of each edge in `edges`, keyed by id(edge); built on the first removal or update.
+    _slots: Optional[Dict[int, int]] = field(default = None, init = False, repr = False, compare = False)
+    _version: int = field(default = 0, init = False, repr = False, compare = False)
+    _frozen: Optional[Tuple[int, CompiledGraph]] = field(default = None, init = False, repr = False, compare = False)
+    # (version, {CSR position: edge}): same-endpoint edge updates since `_frozen`, applied by freeze().
+    _patches: Optional[Tuple[int, Dict[int, Edge]]] = field(default = None, init = False, repr = False, compare = False)
+    _fingerprint_sum: Optional[int] = field(default = None, init = False, repr = False, compare = False)
+    _listeners: List[Listener] = field(default_factory = list, init = False, repr = False, compare = False)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Listeners belong to this process (e.g. bound methods of a local index).
+        state = dict(self.__dict__)
+        state['_listeners'] = []
+        # Object ids do not survive pickling: the slot map and indexes are rebuilt on demand.
+        state['_slots'] = None
+        state.update(_out = {}, _in = {}, _by_predicate = None, _by_subject_predicate = {}, _indexed = False)
+        return state
+
+    def _ensure_index(self) -> None:
+        # Edges passed to the constructor are indexed as-is (no validation), matching
+        # the previous behaviour of Graph(nodes = ..., edges = ...).
+        if not self._indexed:
+            for edge in self.edges:
+                self._index_edge(edge)
+            self._indexed = True
+
+    def _slot(self, edge: Edge) -> Optional[int]:
+        # Position of `edge` (the same object if present, otherwise an equal edge) in `edges`.
+        if self._slots is None:
+            self._slots = {id(e): i for i, e in enumerate(self.edges)}
+        at = self._slots.get(id(edge))
+        if at is None:
+            self._ensure_index()
+            same = next((e for e in self._out.get(edge.subject, ()) if e == edge), None)
+            if same is None:
+                return None
+            at = self._slots.get(id(same))
+            if at is None:
+                # Only when one edge object was added more than once (the map keeps its last slot).
+                at = _position(self.edges, same)
+        return at
+
+    def _pop_edge(self, at: int) -> Edge:
+        # Swap-remove: the last edge takes the freed slot.
+        edges, slots = self.edges, self._slots
+        edge = edges[at]
+        last = edges.pop()
+        if slots is not None:
+            slots.pop(id(edge), None)
+            if last is not edge:
+                edges[at] = last
+                slots[id(last)] = at
+        elif last is not edge:
+            edges[at] = last
+        return edge
+
+    def _index_edge(self, edge: Edge) -> None:
+        self._out.setdefault(edge.subject, []).append(edge)
+        self._in.setdefault(edge.object, []).append(edge)
+        if self._by_predicate is not None:
+            self._by_predicate.setdefault(edge.predicate, {})[id(edge)] = edge
+        self._by_subject_predicate.setdefault((edge.subject, edge.predicate), []).append(edge)
+
+    def _index_keys(self, edge: Edge) -> Tuple[Tuple[Dict, object], ...]:
+        # The list-bucket indexes (O(degree) buckets).
+        return (
+            (self._out, edge.subject),
+            (self._in, edge.object),
+            (self._by_subject_predicate, (edge.subject, edge.predicate)),
+        )
+
+    def _unindex_edge(self, edge: Edge) -> None:
+        for index, key in self._index_keys(edge):
+            bucket = index[key]
+            del bucket[_position(bucket, edge)]
+            if not bucket:
+                del index[key]
+        self._unindex_predicate(edge)
+
+    def _unindex_predicate(self, edge: Edge) -> None:
+        if self._by_predicate is None:
+            return
+        bucket = self._by_predicate[edge.predicate]
+        del bucket[id(edge)]
+        if not bucket:
+            del self._by_predicate[edge.predicate]
+
+    def _reindex_edge(self, old: Edge, new: Edge) -> None:
+        # Replace in place where the key is unchanged (keeps bucket order); otherwise
+        # move the edge to the end of its new bucket. Predicate buckets are keyed by
+        # the edge object, so there the new edge always goes to the end.
+        if self._by_predicate is not None:
+            self._unindex_predicate(old)
+            self._by_predicate.setdefault(new.predicate, {})[id(new)] = new
+        for (index, old_key), (_, new_key) in zip(self._index_keys(old), self._index_keys(new)):
+            bucket = index[old_key]
+            at = _position(bucket, old)
+            if old_key == new_key:
+                bucket[at] = new
+                continue
+            del bucket[at]
+            if not bucket:
+                del index[old_key]
+            index.setdefault(new_key, []).append(new)
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Call `listener(change)` after every mutation; returns an unsubscribe function."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _changed(self, kind: str, before: Optional[Union[Node, Edge]], after: Optional[Union[Node, Edge]]) -> None:
+        self._version += 1
+        if self._fingerprint_sum is not None:
+            digest = node_digest if kind == 'node' else edge_digest
+            delta = (digest(after) if after is not None else 0) - (digest(before) if before is not None else 0)  # type: ignore[arg-type]
+            self._fingerprint_sum = (self._fingerprint_sum + delta) % _MODULUS
+        if self._listeners:
+            change = Change(kind, before, after)
+            for listener in list(self._listeners):
+                listener(change)
 
     def add_node(self, node: Node) -> None:
         if node.id in self.nodes:
             raise ValueError(f'Duplicate node id: {node.id}')
         self.nodes[node.id] = node
+        self._changed('node', None, node)
+
+    def update_node(self, node: Node) -> Node:
+        """Replace the node with the same id; returns the previous node."""
+        old = self.get_node(node.id)
+        self.nodes[node.id] = node
+        self._changed('node', old, node)
+        return old
+
+    def upsert_node(self, node: Node) -> None:
+        if node.id in self.nodes:
+            self.update_node(node)
+        else:
+            self.add_node(node)
+
+    def remove_node(self, node_id: str, cascade: bool = False) -> Node:
+        """
+        Remove a node; returns it. A node with edges is only removed with
+        `cascade=True`, which removes those edges first.
+        """
+        node = self.get_node(node_id)
+        self._ensure_index()
+        incident = self._out.get(node_id, []) + [e for e in self._in.get(node_id, []) if e.subject != node_id]
+        if incident and not cascade:
+            raise ValueError(f'Node has {len(incident)} edge(s), remove them first or use cascade: {node_id}')
+        for edge in incident:
+            self._pop_edge(self._slot(edge))  # type: ignore[arg-type]
+            self._unindex_edge(edge)
+            self._changed('edge', edge, None)
+        del self.nodes[node_id]
+        self._changed('node', node, None)
+        return node
 
     def add_nodes(self, nodes: Iterable[Node]) -> None:
         for node in nodes:
@@ -24,11 +230,96 @@ class Graph:
         if edge.object not in self.nodes:
             raise ValueError(f'Edge object node not found: {edge.object}')
         self.edges.append(edge)
+        if self._slots is not None:
+            self._slots[id(edge)] = len(self.edges) - 1
+        if self._indexed:
+            self._index_edge(edge)
+        self._changed('edge', None, edge)
 
     def add_edges(self, edges: Iterable[Edge]) -> None:
         for edge in edges:
             self.add_edge(edge)
 
+    def remove_edge(self, edge: Edge) -> None:
+        """Remove `edge` (the same object if present, otherwise an equal edge)."""
+        at = self._slot(edge)
+        if at is None:
+            raise ValueError(f'Edge not found: {edge.subject} --{edge.predicate}--> {edge.object}')
+        edge = self._pop_edge(at)
+        if self._indexed:
+            self._unindex_edge(edge)
+        self._changed('edge', edge, None)
+
+    def update_edge(self, old: Edge, new: Edge) -> None:
+        """Replace `old` by `new`, keeping its position in `edges`."""
+        if new.subject not in self.nodes:
+            raise ValueError(f'Edge subject node not found: {new.subject}')
+        if new.object not in self.nodes:
+            raise ValueError(f'Edge object node not found: {new.object}')
+        at = self._slot(old)
+        if at is None:
+            raise ValueError(f'Edge not found: {old.subject} --{old.predicate}--> {old.object}')
+        old = self.edges[at]
+        self.edges[at] = new
+        if self._slots is not None:
+            self._slots.pop(id(old), None)
+            self._slots[id(new)] = at
+        if self._indexed:
+            self._reindex_edge(old, new)
+        self._changed('edge', old, new)
+        self._patch_snapshot(old, new)
+
+    def _patch_snapshot(self, old: Edge, new: Edge) -> None:
+        # Record the update against the last snapshot if nothing else changed since.
+        frozen, patches = self._frozen, self._patches
+        if frozen is None or old.subject != new.subject or old.object != new.object:
+            return
+        if patches is None or patches[0] != self._version - 1:
+            if frozen[0] != self._version - 1:
+                return
+            patches = (frozen[0], {})
+        cg, replaced = frozen[1], patches[1]
+        u = cg.index[old.subject]
+        for pos in range(cg.offsets[u], cg.offsets[u + 1]):
+            if replaced.get(pos, cg.edges[pos]) is old:
+                replaced[pos] = new
+                self._patches = (self._version, replaced)
+                return
+
+    def edge_by_key(self, subject: str, predicate: str, object: str) -> Optional[Edge]:
+        """
+        The edge identified by (subject, predicate, object), or None. Raises
+        ValueError if several parallel edges share that key.
+        """
+        hits = self.find_edges(subject = subject, predicate = predicate, object = object)
+        if len(hits) > 1:
+            raise ValueError(f'Ambiguous edge key, {len(hits)} edges match: {subject} --{predicate}--> {object}')
+        return hits[0] if hits else None
+
+    def upsert_edge(self, edge: Edge) -> None:
+        """Replace the edge with the same (subject, predicate, object), or add it."""
+        old = self.edge_by_key(edge.subject, edge.predicate, edge.object)
+        if old is None:
+            self.add_edge(edge)
+        else:
+            self.update_edge(old, edge)
+
+    def freeze(self) -> CompiledGraph:
+        if self._frozen is None or self._frozen[0] != self._version:
+            if self._frozen is not None and self._patches is not None and self._patches[0] == self._version:
+                cg = self._frozen[1].with_edges(self._patches[1])
+            else:
+                cg = CompiledGraph.from_graph(self)
+            self._frozen = (self._version, cg)
+            self._patches = None
+        return self._frozen[1]
+
+    def fingerprint(self) -> str:
+        # Computed once, then kept current by _changed (fingerprints are sums of record digests).
+        if self._fingerprint_sum is None:
+            self._fingerprint_sum = int(content_fingerprint(self.nodes.values(), self.edges), 16)
+        return format(self._fingerprint_sum, '032x')
+
     def get_node(self, node_id: str) -> Node:
         try:
             return self.nodes[node_id]
@@ -36,10 +327,12 @@ class Graph:
             raise KeyError(f'Node not found: {node_id}') from e
 
     def outgoing(self, node_id: str) -> List[Edge]:
-        return [e for e in self.edges if e.subject == node_id]
+        self._ensure_index()
+        return list(self._out.get(node_id, ()))
 
     def incoming(self, node_id: str) -> List[Edge]:
-        return [e for e in self.edges if e.object == node_id]
+        self._ensure_index()
+        return list(self._in.get(node_id, ()))
 
     def find_edges(
         self,
@@ -47,14 +340,40 @@ class Graph:
         predicate: Optional[str] = None,
         object: Optional[str] = None,
     ) -> List[Edge]:
-        hits = self.edges
+        # Start from the most selective index, then filter on the remaining fields.
+        self._ensure_index()
+        if subject is not None and predicate is not None:
+            hits = self._by_subject_predicate.get((subject, predicate), [])
+            subject = predicate = None
+        elif subject is not None:
+            hits = self._out.get(subject, [])
+            subject = None
+        elif object is not None:
+            hits = self._in.get(object, [])
+            object = None
+        elif predicate is not None:
+            if self._by_predicate is None:
+                self._by_predicate = {}
+                for e in self.edges:
+                    self._by_predicate.setdefault(e.predicate, {})[id(e)] = e
+            hits = list(self._by_predicate.get(predicate, {}).values())
+            predicate = None
+        else:
+            hits = self.edges
+
         if subject is not None:
             hits = [e for e in hits if e.subject == subject]
         if predicate is not None:
             hits = [e for e in hits if e.predicate == predicate]
         if object is not None:
             hits = [e for e in hits if e.object == object]
-        return hits
+        return list(hits)
+
+
+def _position(items: List[Edge], edge: Edge) -> int:
+    # Prefer the identical object so parallel duplicates stay distinguishable.
+    at = next((i for i, item in enumerate(items) if item is edge), None)
+    return items.index(edge) if at is None else at
 
 
 def build_minimal_example_graph() -> Graph:
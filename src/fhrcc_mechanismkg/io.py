@@ -1,89 +1,422 @@
 from __future__ import annotations
 import json
 from pathlib import Path
-from typing import Any, Dict
+from operator import attrgetter
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from .binary import graph_from_binary, graph_to_binary, paused_gc
 from .graph import Graph
-from .schema import Node, Edge
+from .mapped import MappedGraph
+from .schema import EMPTY_DICT, EMPTY_LIST, Node, Edge
 
+BINARY_SUFFIX = ".fhkg"
+JSONL_SUFFIX = ".jsonl"
+SCHEMA_VERSION = "0.1.0"
 
-def graph_to_dict(graph: Graph) -> Dict[str, Any]:
+# Streaming loaders report progress as (n_nodes, n_edges, bytes_read); the JSON
+# reader counts decoded characters, which equals bytes for ASCII files.
+ProgressCallback = Callable[[int, int, int], None]
+PROGRESS_EVERY = 10_000
+
+# Chunk size for the incremental JSON reader.
+_READ_CHUNK = 1 << 20
+
+# How loaders check records:
+#   "full"     - every Node/Edge runs its own checks and every edge is checked
+#                against the nodes as it is added (the default);
+#   "trusted"  - no checks at all, for files this toolkit wrote and already
+#                validated;
+#   "deferred" - records are built unchecked, then validate_records checks
+#                them all in one bulk pass (same errors as "full").
+VALIDATION_MODES = ("full", "trusted", "deferred")
+
+
+def node_to_record(n: Node) -> Dict[str, Any]:
     return {
-        "nodes": [
-            {
-                "id": n.id,
-                "type": n.type,
-                "name": n.name,
-                "synonyms": n.synonyms,
-                "description": n.description,
-                "xrefs": n.xrefs,
-                "tags": n.tags,
-            }
-            for n in graph.nodes.values()
-        ],
-        "edges": [
-            {
-                "subject": e.subject,
-                "predicate": e.predicate,
-                "object": e.object,
-                "weight": e.weight,
-                "evidence_level": e.evidence_level,
-                "polarity": e.polarity,
-                "mechanism": e.mechanism,
-                "context": e.context,
-                "citations": e.citations,
-                "notes": e.notes,
-            }
-            for e in graph.edges
-        ],
-        "schema_version": "0.1.0",
+        "id": n.id,
+        "type": n.type,
+        "name": n.name,
+        "synonyms": n.synonyms,
+        "description": n.description,
+        "xrefs": n.xrefs,
+        "tags": n.tags,
     }
 
 
-def graph_from_dict(payload: Dict[str, Any]) -> Graph:
-    graph = Graph()
+def edge_to_record(e: Edge) -> Dict[str, Any]:
+    return {
+        "subject": e.subject,
+        "predicate": e.predicate,
+        "object": e.object,
+        "weight": e.weight,
+        "evidence_level": e.evidence_level,
+        "polarity": e.polarity,
+        "mechanism": e.mechanism,
+        "context": e.context,
+        "citations": e.citations,
+        "notes": e.notes,
+    }
 
-    nodes = payload.get("nodes", [])
-    edges = payload.get("edges", [])
 
-    for n in nodes:
-        node = Node(
-            id = n["id"],
-            type = n["type"],
-            name = n["name"],
-            synonyms = n.get("synonyms", []) or [],
-            description = n.get("description"),
-            xrefs = n.get("xrefs", {}) or {},
-            tags = n.get("tags", []) or [],
+def node_from_record(n: Dict[str, Any], validate: str = "full") -> Node:
+    if validate != "full":
+        return Node.unchecked(
+            n["id"], n["type"], n["name"], n.get("synonyms", []), n.get("description"), n.get("xrefs", {}), n.get("tags", []),
         )
-        graph.add_node(node)
+    return Node(
+        id = n["id"],
+        type = n["type"],
+        name = n["name"],
+        synonyms = n.get("synonyms") or EMPTY_LIST,
+        description = n.get("description"),
+        xrefs = n.get("xrefs") or EMPTY_DICT,
+        tags = n.get("tags") or EMPTY_LIST,
+    )
 
-    for e in edges:
-        edge = Edge(
-            subject = e["subject"],
-            predicate = e["predicate"],
-            object = e["object"],
-            weight = float(e["weight"]),
-            evidence_level = e["evidence_level"],
-            polarity = e.get("polarity"),
-            mechanism = e.get("mechanism"),
-            context = e.get("context", {}) or {},
-            citations = e.get("citations", []) or [],
-            notes = e.get("notes"),
+
+def edge_from_record(e: Dict[str, Any], validate: str = "full") -> Edge:
+    if validate != "full":
+        return Edge.unchecked(
+            e["subject"], e["predicate"], e["object"], e["weight"], e["evidence_level"], e.get("polarity"),
+            e.get("mechanism"), e.get("context", {}), e.get("citations", []), e.get("notes"),
         )
-        graph.add_edge(edge)
+    return Edge(
+        subject = e["subject"],
+        predicate = e["predicate"],
+        object = e["object"],
+        weight = float(e["weight"]),
+        evidence_level = e["evidence_level"],
+        polarity = e.get("polarity"),
+        mechanism = e.get("mechanism"),
+        context = e.get("context") or EMPTY_DICT,
+        citations = e.get("citations") or EMPTY_LIST,
+        notes = e.get("notes"),
+    )
+
+
+def graph_to_dict(graph: Graph) -> Dict[str, Any]:
+    return {
+        "nodes": [node_to_record(n) for n in graph.nodes.values()],
+        "edges": [edge_to_record(e) for e in graph.edges],
+        "schema_version": SCHEMA_VERSION,
+    }
+
+
+def graph_from_dict(payload: Dict[str, Any], validate: str = "full") -> Graph:
+    """Build a graph from the JSON layout; `validate` is one of VALIDATION_MODES."""
+    _check_mode(validate)
+    nodes = payload.get("nodes", [])
+    edges = payload.get("edges", [])
+
+    with paused_gc():
+        if validate != "full":
+            return _bulk_graph(
+                [node_from_record(n, validate) for n in nodes],
+                [edge_from_record(e, validate) for e in edges],
+                validate,
+            )
+
+        graph = Graph()
+        for n in nodes:
+            graph.add_node(node_from_record(n))
+
+        for e in edges:
+            graph.add_edge(edge_from_record(e))
 
     return graph
 
 
 def graph_to_json(graph: Graph, path: str) -> None:
+    """
+    Write the graph as indented JSON, one record at a time. The output is
+    identical to `json.dumps(graph_to_dict(graph), indent = 2)` without
+    building that payload or string in memory.
+    """
     out_path = Path(path)
     out_path.parent.mkdir(parents = True, exist_ok = True)
 
-    payload = graph_to_dict(graph)
-    out_path.write_text(json.dumps(payload, indent = 2), encoding = "utf-8")
+    with out_path.open("w", encoding = "utf-8") as f:
+        f.write("{\n")
+        _write_json_array(f, "nodes", (node_to_record(n) for n in graph.nodes.values()))
+        f.write(",\n")
+        _write_json_array(f, "edges", (edge_to_record(e) for e in graph.edges))
+        f.write(f',\n  "schema_version": {json.dumps(SCHEMA_VERSION)}\n}}')
 
 
-def graph_from_json(path: str) -> Graph:
+def graph_from_json(
+    path: str,
+    stream: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    validate: str = "full",
+) -> Graph:
+    """
+    Load a graph from the JSON layout. With `stream=True` records are parsed
+    incrementally from the file instead of reading and parsing it whole, which
+    keeps the loader's own memory bounded (and enables `progress`).
+    `validate` is one of VALIDATION_MODES.
+    """
+    if stream or progress is not None:
+        return graph_from_records(iter_json_records(path), progress = progress, validate = validate)
     in_path = Path(path)
     payload = json.loads(in_path.read_text(encoding = "utf-8"))
-    return graph_from_dict(payload)
+    return graph_from_dict(payload, validate = validate)
+
+
+def graph_to_jsonl(graph: Graph, path: str) -> None:
+    """Write the graph as JSONL: a header line, then one node or edge record per line."""
+    out_path = Path(path)
+    out_path.parent.mkdir(parents = True, exist_ok = True)
+
+    with out_path.open("w", encoding = "utf-8") as f:
+        f.write(json.dumps({"kind": "header", "schema_version": SCHEMA_VERSION}) + "\n")
+        for n in graph.nodes.values():
+            f.write(json.dumps({"kind": "node", **node_to_record(n)}) + "\n")
+        for e in graph.edges:
+            f.write(json.dumps({"kind": "edge", **edge_to_record(e)}) + "\n")
+
+
+def graph_from_jsonl(path: str, progress: Optional[ProgressCallback] = None, validate: str = "full") -> Graph:
+    return graph_from_records(iter_jsonl_records(path), progress = progress, validate = validate)
+
+
+def graph_from_records(
+    records: Iterable[Tuple[str, Dict[str, Any], int]],
+    progress: Optional[ProgressCallback] = None,
+    validate: str = "full",
+) -> Graph:
+    """
+    Build a graph from ("node" | "edge", record, bytes_read) tuples; `validate`
+    is one of VALIDATION_MODES. Records may come in any order: in "full" mode
+    an edge that arrives before one of its nodes (e.g. `"edges"` ahead of
+    `"nodes"` in a JSON file) is held back, with every edge after it, until
+    all records are read, so edges end up in file order as with graph_from_dict.
+    """
+    _check_mode(validate)
+    graph = Graph()
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    n_nodes = n_edges = bytes_read = 0
+
+    with paused_gc():
+        for kind, record, bytes_read in records:
+            if kind == "node":
+                if validate == "full":
+                    graph.add_node(node_from_record(record))
+                else:
+                    nodes.append(node_from_record(record, validate))
+                n_nodes += 1
+            else:
+                edge = edge_from_record(record, validate)
+                if validate == "full" and not edges and edge.subject in graph.nodes and edge.object in graph.nodes:
+                    graph.add_edge(edge)
+                else:
+                    edges.append(edge)
+                n_edges += 1
+            if progress is not None and (n_nodes + n_edges) % PROGRESS_EVERY == 0:
+                progress(n_nodes, n_edges, bytes_read)
+
+        if validate == "full":
+            graph.add_edges(edges)
+        else:
+            graph = _bulk_graph(nodes, edges, validate)
+
+    if progress is not None:
+        progress(n_nodes, n_edges, bytes_read)
+    return graph
+
+
+def validate_records(nodes: List[Node], edges: List[Edge]) -> None:
+    """
+    Bulk form of the checks "full" loads run record by record (Node and Edge
+    __post_init__, Graph.add_node / add_edge): node ids, duplicate ids, edge
+    weights, self-loops and edge endpoints, each checked over all records at
+    once (endpoints by set difference). Raises ValueError with the message
+    "full" mode gives for the first offending record of the first failing
+    check. Also coerces weights to float, as edge_from_record does (null
+    list/dict fields already become the shared empties on construction).
+    """
+    for n in nodes:
+        if ":" not in n.id or n.id.split(":", 1)[0] != n.type:
+            Node(n.id, n.type, n.name)  # raises the per-record error
+    ids = {n.id for n in nodes}
+    if len(ids) != len(nodes):
+        seen: Set[str] = set()
+        for n in nodes:
+            if n.id in seen:
+                raise ValueError(f"Duplicate node id: {n.id}")
+            seen.add(n.id)
+
+    for e in edges:
+        if type(e.weight) is not float:
+            e.weight = float(e.weight)
+        if not (0.01 <= e.weight <= 0.99) or e.subject == e.object:
+            Edge(e.subject, e.predicate, e.object, e.weight, e.evidence_level)  # raises the per-record error
+    for end in ("subject", "object"):
+        missing = set(map(attrgetter(end), edges)) - ids
+        if missing:
+            bad = next(e for e in edges if getattr(e, end) in missing)
+            raise ValueError(f"Edge {end} node not found: {getattr(bad, end)}")
+
+
+def _bulk_graph(nodes: List[Node], edges: List[Edge], validate: str) -> Graph:
+    if validate == "deferred":
+        validate_records(nodes, edges)
+    return Graph(nodes = {n.id: n for n in nodes}, edges = edges)
+
+
+def _check_mode(validate: str) -> None:
+    if validate not in VALIDATION_MODES:
+        raise ValueError(f"validate must be one of {', '.join(VALIDATION_MODES)}, got {validate!r}")
+
+
+def iter_jsonl_records(path: str) -> Iterator[Tuple[str, Dict[str, Any], int]]:
+    bytes_read = 0
+    with Path(path).open("rb") as f:
+        for lineno, line in enumerate(f, start = 1):
+            bytes_read += len(line)
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record.pop("kind", None)
+            if kind == "header":
+                continue
+            if kind not in ("node", "edge"):
+                raise ValueError(f"{path}:{lineno}: expected a node or edge record, got kind = {kind!r}")
+            yield kind, record, bytes_read
+
+
+def iter_json_records(path: str) -> Iterator[Tuple[str, Dict[str, Any], int]]:
+    """
+    Incrementally parse the `{"nodes": [...], "edges": [...]}` layout, yielding
+    one record at a time while holding only a bounded window of the file.
+    """
+    reader = _JsonStream(Path(path).open("r", encoding = "utf-8"))
+    with reader:
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key in ("nodes", "edges"):
+                kind = key[:-1]
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.expect("]")
+                else:
+                    while True:
+                        yield kind, reader.value(), reader.consumed
+                        if reader.next_char() == "]":
+                            break
+            else:
+                reader.value()  # e.g. schema_version
+            if reader.next_char() == "}":
+                return
+
+
+def load_graph(path: str, mmap: bool = False, validate: str = "full") -> Union[Graph, MappedGraph]:
+    """
+    Load a graph from JSON, JSONL (`.jsonl`, streamed) or, for `.fhkg` files,
+    the compact binary format. With `mmap=True` a `.fhkg` file is opened as a
+    read-only MappedGraph instead of being loaded into memory. `validate`
+    (one of VALIDATION_MODES) applies to JSON and JSONL; binary files are
+    only ever written from validated graphs and always load as "trusted".
+    """
+    suffix = Path(path).suffix
+    if suffix == BINARY_SUFFIX:
+        if mmap:
+            return MappedGraph(path)
+        return graph_from_binary(path)
+    if suffix == JSONL_SUFFIX:
+        return graph_from_jsonl(path, validate = validate)
+    return graph_from_json(path, validate = validate)
+
+
+def save_graph(graph: Graph, path: str) -> None:
+    """Write a graph as JSON, JSONL (`.jsonl`) or binary (`.fhkg`), by suffix."""
+    suffix = Path(path).suffix
+    if suffix == BINARY_SUFFIX:
+        graph_to_binary(graph, path)
+    elif suffix == JSONL_SUFFIX:
+        graph_to_jsonl(graph, path)
+    else:
+        graph_to_json(graph, path)
+
+
+def _write_json_array(f: IO[str], key: str, records: Iterable[Dict[str, Any]]) -> None:
+    f.write(f"  {json.dumps(key)}: [")
+    first = True
+    for record in records:
+        f.write("\n    " if first else ",\n    ")
+        f.write(json.dumps(record, indent = 2).replace("\n", "\n    "))
+        first = False
+    f.write("]" if first else "\n  ]")
+
+
+class _JsonStream:
+    """Minimal pull reader for top-level JSON structure over a text stream."""
+
+    def __init__(self, f: IO[str]) -> None:
+        self._f = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+        self.consumed = 0  # characters consumed so far
+
+    def __enter__(self) -> "_JsonStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._f.close()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(_READ_CHUNK)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._advance(1)
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def next_char(self) -> str:
+        ch = self.peek()
+        if ch not in ",]}":
+            raise ValueError(f"Malformed JSON near character {self.consumed}: expected ',' ']' or '}}', got {ch!r}")
+        self._advance(1)
+        return ch
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"Malformed JSON near character {self.consumed}: expected {ch!r}, got {got!r}")
+        self._advance(1)
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A scalar ending exactly at the buffer edge may continue in the next chunk.
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._advance(end - self._pos)
+            return obj
+
+    def _advance(self, n: int) -> None:
+        self._pos += n
+        self.consumed += n
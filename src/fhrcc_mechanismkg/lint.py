@@ -0,0 +1,334 @@
+"""
+Curation lint: a registry of rules run by a single-pass engine.
+
+A rule (a LintRule subclass registered with @lint_rule) reads the graph in
+any of two ways:
+
+- aggregates: the GraphAnalytics of analytics.py (histograms, degrees,
+  high-weight edges, activates/inhibits pairs), computed once per run in
+  one columnar sweep and shared by every rule;
+- visitors: `visit_node` / `visit_edge`, called for every node / edge. The
+  engine fuses the visitors of all selected rules into one pass, so adding
+  a rule never adds a scan of the graph.
+
+Visitor state comes from `start()` and is turned into findings by
+`finish(state, analytics)`. With `workers > 1` the visitor pass is split
+into shards (contiguous node and edge ranges) run across a process pool;
+shard states are combined in order with `merge`, so findings come out in
+the same order as a single-process run.
+
+`run_lint` returns a LintReport (JSON via `to_dict`, SARIF 2.1.0 via
+`to_sarif`); `lint_graph` keeps returning the plain warning messages.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+from .analytics import HIGH_WEIGHT, GraphAnalytics, analyze_graph
+from .graph import Graph
+from .io import load_graph
+from .mapped import MappedGraph
+from .reasoning import batch
+from .reasoning.batch import _init_worker
+from .schema import Edge, Node
+
+AnyGraph = Union[Graph, MappedGraph]
+R = TypeVar("R", bound = Type["LintRule"])
+
+SEVERITIES = ("error", "warning", "note")
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+@dataclass(frozen = True)
+class LintFinding:
+    rule: str
+    severity: str  # one of SEVERITIES
+    message: str
+    node: Optional[str] = None  # node the finding is about, if any
+    edge: Optional[Tuple[str, str, str]] = None  # (subject, predicate, object), if about an edge or node pair
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"rule": self.rule, "severity": self.severity, "message": self.message}
+        if self.node is not None:
+            out["node"] = self.node
+        if self.edge is not None:
+            out["edge"] = {"subject": self.edge[0], "predicate": self.edge[1], "object": self.edge[2]}
+        return out
+
+
+class LintRule:
+    """
+    Base class of lint rules; override `finish` and, for per-record checks,
+    `visit_node` / `visit_edge` (plus `start` / `merge` if the state is not a
+    list). The default state is a list of findings, merged by concatenation.
+    """
+
+    id: str = ""
+    description: str = ""
+    severity: str = "warning"
+
+    def start(self) -> Any:
+        return []
+
+    def visit_node(self, state: Any, node: Node) -> None:
+        pass
+
+    def visit_edge(self, state: Any, edge: Edge) -> None:
+        pass
+
+    def merge(self, state: Any, other: Any) -> Any:
+        """Combine the state of a shard with that of the shard after it."""
+        state.extend(other)
+        return state
+
+    def finish(self, state: Any, analytics: GraphAnalytics) -> Iterable[LintFinding]:
+        return state
+
+    def finding(self, message: str, node: Optional[str] = None, edge: Optional[Edge] = None) -> LintFinding:
+        key = (edge.subject, edge.predicate, edge.object) if edge is not None else None
+        return LintFinding(self.id, self.severity, message, node = node, edge = key)
+
+    @property
+    def visits_nodes(self) -> bool:
+        return type(self).visit_node is not LintRule.visit_node
+
+    @property
+    def visits_edges(self) -> bool:
+        return type(self).visit_edge is not LintRule.visit_edge
+
+
+# Registered rules by id, in registration (= report) order.
+LINT_RULES: Dict[str, LintRule] = {}
+
+
+def lint_rule(cls: R) -> R:
+    """Class decorator registering a LintRule subclass under its `id`."""
+    if not cls.id:
+        raise ValueError(f"Lint rule {cls.__name__} has no id")
+    if cls.severity not in SEVERITIES:
+        raise ValueError(f"Lint rule {cls.id}: severity must be one of {', '.join(SEVERITIES)}, got {cls.severity!r}")
+    LINT_RULES[cls.id] = cls()
+    return cls
+
+
+@lint_rule
+class PredicateOveruse(LintRule):
+    id = "predicate-overuse"
+    description = "Generic predicates (associates_with, enables) used on 35% or more of the edges."
+
+    def finish(self, state: Any, a: GraphAnalytics) -> Iterable[LintFinding]:
+        n_edges = a.n_edges
+        for pred in ["associates_with", "enables"]:
+            frac = a.predicates.get(pred, 0) / max(n_edges, 1)
+            if frac >= 0.35:
+                yield self.finding(f"High usage of predicate '{pred}': {a.predicates.get(pred, 0)}/{n_edges} ({frac:.1%}). Consider adding more specific intermediates/predicates.")
+
+
+@lint_rule
+class HighWeightHypothesis(LintRule):
+    id = "high-weight-hypothesis"
+    description = f"Hypothesis-level edges with weight >= {HIGH_WEIGHT:.2f}."
+
+    def finish(self, state: Any, a: GraphAnalytics) -> Iterable[LintFinding]:
+        for e in a.high_weight_hypotheses:
+            yield self.finding(f"Hypothesis edge has high weight (>=0.70): {e.subject} --{e.predicate}--> {e.object} (w = {e.weight:.2f}).", edge = e)
+
+
+@lint_rule
+class MissingMechanism(LintRule):
+    id = "high-weight-missing-mechanism"
+    description = f"Edges with weight >= {HIGH_WEIGHT:.2f} and no mechanism text."
+
+    def finish(self, state: Any, a: GraphAnalytics) -> Iterable[LintFinding]:
+        for e in a.high_weight_missing_mechanism:
+            yield self.finding(f"High-weight edge missing mechanism: {e.subject} --{e.predicate}--> {e.object} (w = {e.weight:.2f}).", edge = e)
+
+
+@lint_rule
+class IsolatedNode(LintRule):
+    id = "isolated-node"
+    description = "Nodes without any edge."
+
+    def finish(self, state: Any, a: GraphAnalytics) -> Iterable[LintFinding]:
+        for node_id in a.isolated_nodes:
+            yield self.finding(f"Isolated node (no edges): {node_id}", node = node_id)
+
+
+@lint_rule
+class Contradiction(LintRule):
+    id = "contradiction"
+    description = "Node pairs joined by both an activates and an inhibits edge."
+
+    def finish(self, state: Any, a: GraphAnalytics) -> Iterable[LintFinding]:
+        for subj, obj in a.contradictions:
+            yield LintFinding(
+                self.id,
+                self.severity,
+                f"Potential contradiction: both activates and inhibits present for {subj} -> {obj}. Add notes/mechanism or refine nodes.",
+                edge = (subj, "activates|inhibits", obj),
+            )
+
+
+@dataclass
+class LintReport:
+    rules: List[LintRule]
+    findings: List[LintFinding]
+    shards: int = 1  # visitor-pass shards (1 = ran in this process)
+    counts: Dict[str, int] = field(default_factory = dict)  # findings per rule id
+
+    def messages(self) -> List[str]:
+        return [f.message for f in self.findings]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rules": [{"id": r.id, "severity": r.severity, "description": r.description} for r in self.rules],
+            "counts": self.counts,
+            "findings": [f.to_dict() for f in self.findings],
+        }
+
+    def to_sarif(self, artifact: Optional[str] = None) -> Dict[str, Any]:
+        """The report as a SARIF 2.1.0 log; `artifact` (the graph file) is attached to every result."""
+        rule_index = {r.id: i for i, r in enumerate(self.rules)}
+        results = []
+        for f in self.findings:
+            if f.edge is not None:
+                logical = {"name": f"{f.edge[0]} --{f.edge[1]}--> {f.edge[2]}", "kind": "edge"}
+            elif f.node is not None:
+                logical = {"name": f.node, "kind": "node"}
+            else:
+                logical = {"name": "graph", "kind": "graph"}
+            location: Dict[str, Any] = {"logicalLocations": [logical]}
+            if artifact is not None:
+                location["physicalLocation"] = {"artifactLocation": {"uri": artifact}}
+            results.append({
+                "ruleId": f.rule,
+                "ruleIndex": rule_index[f.rule],
+                "level": f.severity,
+                "message": {"text": f.message},
+                "locations": [location],
+            })
+        return {
+            "$schema": SARIF_SCHEMA,
+            "version": "2.1.0",
+            "runs": [{
+                "tool": {"driver": {
+                    "name": "fhrcc-mechanismkg lint",
+                    "rules": [{"id": r.id, "shortDescription": {"text": r.description}, "defaultConfiguration": {"level": r.severity}} for r in self.rules],
+                }},
+                "results": results,
+            }],
+        }
+
+
+def select_rules(rules: Optional[Sequence[Union[str, LintRule]]] = None) -> List[LintRule]:
+    """Rules by id (or instances, e.g. unregistered ones); None selects every registered rule."""
+    if rules is None:
+        return list(LINT_RULES.values())
+    out: List[LintRule] = []
+    for r in rules:
+        if isinstance(r, LintRule):
+            out.append(r)
+        elif r in LINT_RULES:
+            out.append(LINT_RULES[r])
+        else:
+            raise ValueError(f"Unknown lint rule: {r} (expected one of {', '.join(LINT_RULES)})")
+    return out
+
+
+def run_lint(
+    g: Union[AnyGraph, str],
+    rules: Optional[Sequence[Union[str, LintRule]]] = None,
+    analytics: Optional[GraphAnalytics] = None,
+    workers: int = 1,
+) -> LintReport:
+    """
+    Run lint rules (all registered ones by default) over a graph, or the path
+    of a graph file (opened memory-mapped when it is a .fhkg file).
+
+    Aggregates come from `analytics` if given (e.g. reused from a summary of
+    the same graph), else from one analyze_graph sweep. Visitor rules share
+    one pass over nodes and edges; `workers > 1` shards that pass across a
+    process pool (a MappedGraph or graph file is reopened by path in each
+    worker, an in-memory graph is sent once per worker). The built-in rules
+    are all aggregate rules, so `workers` only matters once visitor rules
+    are selected; the report's `shards` says how the pass actually ran.
+    """
+    graph = load_graph(g, mmap = True) if isinstance(g, str) else g
+    selected = select_rules(rules)
+    a = analytics or analyze_graph(graph)
+
+    visitors = [r for r in selected if r.visits_nodes or r.visits_edges]
+    states: Dict[int, Any] = {}
+    shards = 1
+    if visitors:
+        ranges = _shard_ranges(a.n_nodes, a.n_edges, max(1, workers))
+        shards = len(ranges)
+        if shards == 1:
+            shard_states = [_visit(graph, visitors, ranges[0])]
+        else:
+            shipped = g if isinstance(g, str) else (graph.path if isinstance(graph, MappedGraph) else graph)
+            with ProcessPoolExecutor(max_workers = workers, initializer = _init_worker, initargs = (shipped,)) as pool:
+                shard_states = list(pool.map(_visit_shard, [visitors] * shards, ranges))
+        for i, rule in enumerate(visitors):
+            state = shard_states[0][i]
+            for later in shard_states[1:]:
+                state = rule.merge(state, later[i])
+            states[id(rule)] = state
+
+    findings: List[LintFinding] = []
+    counts: Dict[str, int] = {}
+    for rule in selected:
+        state = states[id(rule)] if id(rule) in states else rule.start()
+        found = list(rule.finish(state, a))
+        counts[rule.id] = len(found)
+        findings.extend(found)
+    return LintReport(rules = selected, findings = findings, shards = shards, counts = counts)
+
+
+def lint_graph(g: AnyGraph, analytics: Optional[GraphAnalytics] = None) -> List[str]:
+    """
+    Heuristic curation warnings for a graph (an empty list means clean): the
+    messages of run_lint with every registered rule.
+    """
+    return run_lint(g, analytics = analytics).messages()
+
+
+# ((node start, node stop), (edge start, edge stop)) covered by one shard.
+Shard = Tuple[Tuple[int, int], Tuple[int, int]]
+
+
+def _shard_ranges(n_nodes: int, n_edges: int, n_shards: int) -> List[Shard]:
+    n_shards = max(1, min(n_shards, max(n_nodes, n_edges, 1)))
+    return [
+        ((n_nodes * i // n_shards, n_nodes * (i + 1) // n_shards), (n_edges * i // n_shards, n_edges * (i + 1) // n_shards))
+        for i in range(n_shards)
+    ]
+
+
+def _visit(g: AnyGraph, rules: Sequence[LintRule], shard: Shard) -> List[Any]:
+    # The fused pass: every node and edge of the shard is read once and
+    # handed to each rule that visits it.
+    states = [rule.start() for rule in rules]
+    (n0, n1), (e0, e1) = shard
+    node_visits: List[Tuple[Callable[[Any, Node], None], Any]] = [(r.visit_node, s) for r, s in zip(rules, states) if r.visits_nodes]
+    edge_visits: List[Tuple[Callable[[Any, Edge], None], Any]] = [(r.visit_edge, s) for r, s in zip(rules, states) if r.visits_edges]
+    if node_visits:
+        nodes = g.nodes
+        for node_id in islice(nodes, n0, n1):
+            node = nodes[node_id]
+            for visit, state in node_visits:
+                visit(state, node)
+    if edge_visits:
+        edges = g.edges
+        for i in range(e0, e1):
+            edge = edges[i]
+            for visit, state in edge_visits:
+                visit(state, edge)
+    return states
+
+
+def _visit_shard(rules: Sequence[LintRule], shard: Shard) -> List[Any]:
+    assert batch._WORKER_GRAPH is not None, "worker graph not initialized"
+    return _visit(batch._WORKER_GRAPH, rules, shard)  # type: ignore[arg-type]
@@ -0,0 +1,272 @@
+from __future__ import annotations
+import mmap
+import os
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, overload
+from .binary import POLARITIES, PREAMBLE_SIZE, read_sections
+from .compiled import CompiledGraph
+from .schema import Node, Edge
+
+
+class MappedGraph:
+    """
+    Read-only, Graph-compatible view of a binary (.fhkg) graph file.
+
+    The file is memory-mapped and its columns are read in place, so processes
+    opening the same file share one copy through the page cache. Strings,
+    Node and Edge objects are only materialized when a caller touches them
+    (e.g. when a report renders a path step) and are then kept for reuse.
+    `freeze()` returns a CompiledGraph whose CSR columns are views of the
+    mapping, so path search runs directly on the mapped arrays.
+
+    `close()` (or leaving a `with` block) releases the mapping; the graph and
+    snapshots taken from it cannot be read afterwards.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < PREAMBLE_SIZE:
+                raise ValueError(f"Not a FHRCC_mechanismKG binary graph: {path} is {size} bytes, shorter than the header")
+            self._mm: Optional[mmap.mmap] = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        try:
+            self._header, self._cols = read_sections(self._mm)
+        except ValueError:
+            self._mm.close()
+            raise
+        self._node_types: List[str] = self._header["node_types"]
+        self._predicates: List[str] = self._header["predicates"]
+        self._evidence_levels: List[str] = self._header["evidence_levels"]
+        self._strings: Dict[int, str] = {}
+        self._node_cache: Dict[int, Node] = {}
+        self._edge_cache: Dict[int, Edge] = {}
+        self._frozen: Optional[CompiledGraph] = None
+
+        self.node_ids = _LazyColumn(self.n_nodes, self._node_id)
+        self.index = _NodeIndex(self)
+        self.nodes = _NodesView(self)
+        # `edges` follows the original edge order; `csr_edges` is grouped by subject.
+        self.csr_edges = _LazyColumn(self.n_edges, self._edge)
+        self.edges = _LazyColumn(self.n_edges, lambda i: self._edge(self._cols["edge_csr_position"][i]))
+
+    @property
+    def n_nodes(self) -> int:
+        return self._header["n_nodes"]
+
+    @property
+    def n_edges(self) -> int:
+        return self._header["n_edges"]
+
+    @property
+    def node_type_names(self) -> List[str]:
+        """Node type of each code in the "node_type" column."""
+        return self._node_types
+
+    @property
+    def predicate_names(self) -> List[str]:
+        return self._predicates
+
+    @property
+    def evidence_level_names(self) -> List[str]:
+        return self._evidence_levels
+
+    def column(self, name: str) -> Any:
+        """A raw column of the file (e.g. "edge_weight"; see binary.py), read in place."""
+        return self._cols[name]
+
+    def string(self, i: int) -> Optional[str]:
+        """Entry `i` of the file's string table (None for -1, the null reference)."""
+        return self._string(i)
+
+    def get_node(self, node_id: str) -> Node:
+        try:
+            return self.nodes[node_id]
+        except KeyError as e:
+            raise KeyError(f"Node not found: {node_id}") from e
+
+    def outgoing(self, node_id: str) -> List[Edge]:
+        i = self.index.get(node_id)
+        if i is None:
+            return []
+        offsets = self._cols["edge_offsets"]
+        return [self._edge(pos) for pos in range(offsets[i], offsets[i + 1])]
+
+    def incoming(self, node_id: str) -> List[Edge]:
+        # Grouped by subject (reverse CSR order) rather than in insertion order.
+        i = self.index.get(node_id)
+        if i is None:
+            return []
+        in_offsets, _, in_positions = self.freeze().reverse()
+        return [self._edge(in_positions[j]) for j in range(in_offsets[i], in_offsets[i + 1])]
+
+    def find_edges(
+        self,
+        subject: Optional[str] = None,
+        predicate: Optional[str] = None,
+        object: Optional[str] = None,
+    ) -> List[Edge]:
+        if subject is not None:
+            hits = self.outgoing(subject)
+        elif object is not None:
+            hits = self.incoming(object)
+        else:
+            hits = list(self.edges)
+        if predicate is not None:
+            hits = [e for e in hits if e.predicate == predicate]
+        if object is not None:
+            hits = [e for e in hits if e.object == object]
+        return hits
+
+    def freeze(self) -> CompiledGraph:
+        if self._frozen is None:
+            c = self._cols
+            self._frozen = CompiledGraph(
+                node_ids = self.node_ids,
+                offsets = c["edge_offsets"],
+                targets = c["edge_target"],
+                edges = self.csr_edges,
+                predicate_names = self._predicates,
+                predicate_codes = c["edge_predicate"],
+                neg_log_weight = c["edge_neg_log_weight"],
+                nodes = self.nodes,
+                index = self.index,
+            )
+        return self._frozen
+
+    def close(self) -> None:
+        if self._mm is None:
+            return
+        # The mapping cannot close while views of it are alive.
+        for col in self._cols.values():
+            if isinstance(col, memoryview):
+                col.release()
+        self._cols = {}
+        self._frozen = None
+        self._mm.close()
+        self._mm = None
+
+    def __enter__(self) -> "MappedGraph":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def fingerprint(self) -> str:
+        # Stored by encode_graph; equal to the fingerprint of the loaded Graph.
+        return self._header["fingerprint"]
+
+    def _string(self, i: int) -> Optional[str]:
+        if i < 0:
+            return None
+        s = self._strings.get(i)
+        if s is None:
+            offsets = self._cols["str_offsets"]
+            s = self._strings[i] = bytes(self._cols["str_blob"][offsets[i]:offsets[i + 1] - 1]).decode("utf-8")
+        return s
+
+    def _node_id(self, i: int) -> str:
+        return self._string(self._cols["node_id"][i])  # type: ignore[return-value]
+
+    def _node(self, i: int) -> Node:
+        node = self._node_cache.get(i)
+        if node is None:
+            c, S = self._cols, self._string
+            syn_off, xref_off, tag_off = c["node_synonym_offsets"], c["node_xref_offsets"], c["node_tag_offsets"]
+            node = self._node_cache[i] = Node.unchecked(
+                id = self._node_id(i),
+                type = self._node_types[c["node_type"][i]],
+                name = S(c["node_name"][i]),
+                synonyms = [S(x) for x in c["node_synonyms"][syn_off[i]:syn_off[i + 1]]],
+                description = S(c["node_description"][i]),
+                xrefs = {
+                    S(k): S(v)
+                    for k, v in zip(c["node_xref_keys"][xref_off[i]:xref_off[i + 1]], c["node_xref_values"][xref_off[i]:xref_off[i + 1]])
+                },
+                tags = [S(x) for x in c["node_tags"][tag_off[i]:tag_off[i + 1]]],
+            )
+        return node
+
+    def _edge(self, pos: int) -> Edge:
+        edge = self._edge_cache.get(pos)
+        if edge is None:
+            c, S = self._cols, self._string
+            ctx_off, cit_off = c["edge_context_offsets"], c["edge_citation_offsets"]
+            polarity = c["edge_polarity"][pos]
+            edge = self._edge_cache[pos] = Edge.unchecked(
+                subject = self._node_id(bisect_right(c["edge_offsets"], pos) - 1),
+                predicate = self._predicates[c["edge_predicate"][pos]],
+                object = self._node_id(c["edge_target"][pos]),
+                weight = c["edge_weight"][pos],
+                evidence_level = self._evidence_levels[c["edge_evidence"][pos]],
+                polarity = POLARITIES[polarity] if polarity >= 0 else None,
+                mechanism = S(c["edge_mechanism"][pos]),
+                context = {
+                    S(k): S(v)
+                    for k, v in zip(c["edge_context_keys"][ctx_off[pos]:ctx_off[pos + 1]], c["edge_context_values"][ctx_off[pos]:ctx_off[pos + 1]])
+                },
+                citations = [S(x) for x in c["edge_citations"][cit_off[pos]:cit_off[pos + 1]]],
+                notes = S(c["edge_notes"][pos]),
+            )
+        return edge
+
+
+class _LazyColumn(Sequence[Any]):
+    def __init__(self, length: int, get: Any) -> None:
+        self._length = length
+        self._get = get
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, i: int) -> Any: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[Any]: ...
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [self._get(j) for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        return self._get(i)
+
+
+class _NodeIndex(Mapping[str, int]):
+    """Node id -> dense index via binary search over the file's sorted-id column."""
+
+    def __init__(self, store: MappedGraph) -> None:
+        self._store = store
+        self._sorted = store._cols["node_sorted"]
+
+    def __getitem__(self, node_id: str) -> int:
+        sorted_ids = self._sorted
+        at = bisect_left(sorted_ids, node_id, key = self._store._node_id)
+        if at < len(sorted_ids) and self._store._node_id(sorted_ids[at]) == node_id:
+            return sorted_ids[at]
+        raise KeyError(node_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.node_ids)
+
+    def __len__(self) -> int:
+        return self._store.n_nodes
+
+
+class _NodesView(Mapping[str, Node]):
+    def __init__(self, store: MappedGraph) -> None:
+        self._store = store
+
+    def __getitem__(self, node_id: str) -> Node:
+        return self._store._node(self._store.index[node_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.node_ids)
+
+    def __len__(self) -> int:
+        return self._store.n_nodes
+
+    def __contains__(self, node_id: object) -> bool:
+        return isinstance(node_id, str) and node_id in self._store.index
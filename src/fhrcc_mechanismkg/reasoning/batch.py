@@ -0,0 +1,124 @@
+from __future__ import annotations
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from ..io import load_graph
+from ..mapped import MappedGraph
+from .path_search import GraphLike, PathResult, as_compiled, k_shortest_paths_explainable
+
+
+Pair = Tuple[str, str]
+
+# Graph held by each pool worker, installed once by _init_worker.
+_WORKER_GRAPH: Optional[GraphLike] = None
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    index: int  # position of the pair in the input
+    source: str
+    target: str
+    paths: List[PathResult]
+    error: Optional[str] = None  # e.g. unknown node; the query raised ValueError
+
+
+def batch_explain(
+    graph: Union[GraphLike, MappedGraph, str],
+    pairs: Iterable[Pair],
+    k: int = 5,
+    max_hops: int = 6,
+    predicate_penalty: Optional[Dict[str, float]] = None,
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+) -> Iterator[BatchResult]:
+    """
+    Top-k explainable paths for many (source, target) pairs, spread across a
+    process pool. Results are yielded as they complete (use `index` to restore
+    input order).
+
+    The graph reaches each worker once, through the pool initializer: a
+    MappedGraph (or a path to a graph file) is reopened by path, so `.fhkg`
+    files are shared through the page cache; an in-memory graph is sent once
+    per worker rather than with every task. Pairs are sent in chunks of
+    `chunksize`, with a bounded number of chunks in flight.
+
+    `workers=None` uses every core; `workers <= 1` runs in this process.
+    """
+    chunks = _chunks(enumerate(pairs), chunksize)
+
+    if workers is not None and workers <= 1:
+        g = load_graph(graph, mmap = True) if isinstance(graph, str) else graph
+        for chunk in chunks:
+            yield from _explain_chunk(g, chunk, k, max_hops, predicate_penalty)
+        return
+
+    shipped = graph.path if isinstance(graph, MappedGraph) else graph
+    n_workers = workers or os.cpu_count() or 1
+    max_pending = 4 * n_workers
+
+    pool = ProcessPoolExecutor(max_workers = n_workers, initializer = _init_worker, initargs = (shipped,))
+    pending: Set[Future] = set()
+    try:
+        for chunk in chunks:
+            pending.add(pool.submit(_run_chunk, chunk, k, max_hops, predicate_penalty))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when = FIRST_COMPLETED)
+                for f in done:
+                    yield from f.result()
+        while pending:
+            done, pending = wait(pending, return_when = FIRST_COMPLETED)
+            for f in done:
+                yield from f.result()
+    finally:
+        # Also reached when the caller stops iterating early.
+        pool.shutdown(wait = True, cancel_futures = True)
+
+
+def _init_worker(graph: Union[GraphLike, str]) -> None:
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = load_graph(graph, mmap = True) if isinstance(graph, str) else graph
+    as_compiled(_WORKER_GRAPH)  # build the CSR snapshot once, before the first task
+
+
+def _run_chunk(
+    chunk: List[Tuple[int, Pair]],
+    k: int,
+    max_hops: int,
+    predicate_penalty: Optional[Dict[str, float]],
+) -> List[BatchResult]:
+    assert _WORKER_GRAPH is not None, "worker graph not initialized"
+    return list(_explain_chunk(_WORKER_GRAPH, chunk, k, max_hops, predicate_penalty))
+
+
+def _explain_chunk(
+    graph: GraphLike,
+    chunk: List[Tuple[int, Pair]],
+    k: int,
+    max_hops: int,
+    predicate_penalty: Optional[Dict[str, float]],
+) -> Iterator[BatchResult]:
+    for index, (source, target) in chunk:
+        try:
+            paths = k_shortest_paths_explainable(
+                graph,
+                source = source,
+                target = target,
+                k = k,
+                max_hops = max_hops,
+                predicate_penalty = predicate_penalty,
+            )
+        except ValueError as e:
+            yield BatchResult(index, source, target, [], str(e))
+        else:
+            yield BatchResult(index, source, target, paths)
+
+
+def _chunks(items: Iterable[Tuple[int, Pair]], size: int) -> Iterator[List[Tuple[int, Pair]]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
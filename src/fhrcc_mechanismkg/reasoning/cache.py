@@ -0,0 +1,246 @@
+from __future__ import annotations
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from ..compiled import penalty_key
+from .path_search import (
+    DEFAULT_PREDICATE_PENALTY,
+    GraphLike,
+    PathResult,
+    k_shortest_paths_explainable,
+    shortest_path_explainable,
+)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PathQueryCache:
+    """
+    LRU/TTL cache for path queries.
+
+    Keys combine the graph's content fingerprint with the query parameters
+    (source, target, k, max_hops, penalty table, strategy), so results computed
+    on an earlier version of a graph are never returned after it changes.
+    Fingerprints are cheap to read (a Graph keeps its own current across
+    edits, a MappedGraph reads it from the file header), so a hit never
+    scans or materializes the graph.
+
+    - `maxsize`: entries kept in memory (least recently used are evicted)
+    - `ttl`: seconds an entry stays valid (None = no expiry)
+    - `path`: optional sqlite file backing the memory tier, so results survive
+      across processes. Entries are pickled; only point this at files you trust.
+    - `disk_maxsize`: entries kept on disk (oldest are pruned; expired rows are
+      deleted when read and whenever a new entry is stored)
+
+    "No path" outcomes are cached too and re-raised as ValueError. Results are
+    returned as copies, so callers may change them freely.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+        disk_maxsize: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_maxsize = disk_maxsize
+        self.stats = CacheStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_count = 0
+        if path is not None:
+            Path(path).parent.mkdir(parents = True, exist_ok = True)
+            self._db = sqlite3.connect(path, check_same_thread = False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS path_cache (key TEXT PRIMARY KEY, created REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS path_cache_created ON path_cache (created)")
+            self._db.commit()
+            # Rows on disk, kept up to date by _store so it need not count them.
+            (self._disk_count,) = self._db.execute("SELECT COUNT(*) FROM path_cache").fetchone()
+
+    def shortest_path(
+        self,
+        graph: GraphLike,
+        source: str,
+        target: str,
+        max_hops: int = 6,
+        predicate_penalty: Optional[Dict[str, float]] = None,
+        strategy: str = "dijkstra",
+    ) -> PathResult:
+        key = self._key(graph, "shortest", source, target, 1, max_hops, predicate_penalty, strategy)
+        return self._get_or_compute(key, lambda: shortest_path_explainable(
+            graph,
+            source = source,
+            target = target,
+            max_hops = max_hops,
+            predicate_penalty = predicate_penalty,
+            strategy = strategy,
+        ))
+
+    def k_shortest_paths(
+        self,
+        graph: GraphLike,
+        source: str,
+        target: str,
+        k: int = 5,
+        max_hops: int = 6,
+        predicate_penalty: Optional[Dict[str, float]] = None,
+    ) -> List[PathResult]:
+        key = self._key(graph, "k_shortest", source, target, k, max_hops, predicate_penalty, None)
+        return self._get_or_compute(key, lambda: k_shortest_paths_explainable(
+            graph,
+            source = source,
+            target = target,
+            k = k,
+            max_hops = max_hops,
+            predicate_penalty = predicate_penalty,
+        ))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM path_cache")
+                self._db.commit()
+                self._disk_count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> "PathQueryCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _key(
+        graph: GraphLike,
+        kind: str,
+        source: str,
+        target: str,
+        k: int,
+        max_hops: int,
+        predicate_penalty: Optional[Dict[str, float]],
+        strategy: Optional[str],
+    ) -> Tuple[Any, ...]:
+        table = penalty_key(predicate_penalty or DEFAULT_PREDICATE_PENALTY)
+        return (graph.fingerprint(), kind, source, target, k, max_hops, table, strategy)
+
+    def _get_or_compute(self, key: Tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+        found, entry = self._lookup(key)
+        if not found:
+            try:
+                entry = ("ok", compute())
+            except ValueError as e:
+                # Unknown endpoints are cheap to re-detect; only cache "no path" outcomes.
+                if not str(e).startswith("No path found"):
+                    raise
+                entry = ("error", str(e))
+            self._store(key, entry)
+
+        status, value = entry
+        if status == "error":
+            raise ValueError(value)
+        # Hand out copies, so callers that edit a result do not edit the cache.
+        if isinstance(value, list):
+            return [_copy_path(p) for p in value]
+        return _copy_path(value)
+
+    def _lookup(self, key: Tuple[Any, ...]) -> Tuple[bool, Any]:
+        now = self._clock()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                created, entry = item
+                if self._fresh(created, now):
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return True, entry
+                del self._entries[key]
+                self.stats.expirations += 1
+
+            if self._db is not None:
+                row = self._db.execute("SELECT created, value FROM path_cache WHERE key = ?", (repr(key),)).fetchone()
+                if row is not None:
+                    if self._fresh(row[0], now):
+                        entry = pickle.loads(row[1])
+                        self._remember(key, row[0], entry)
+                        self.stats.hits += 1
+                        self.stats.disk_hits += 1
+                        return True, entry
+                    self._disk_count -= self._db.execute("DELETE FROM path_cache WHERE key = ?", (repr(key),)).rowcount
+                    self._db.commit()
+                    self.stats.expirations += 1
+
+            self.stats.misses += 1
+            return False, None
+
+    def _store(self, key: Tuple[Any, ...], entry: Any) -> None:
+        now = self._clock()
+        with self._lock:
+            self._remember(key, now, entry)
+            if self._db is not None:
+                row = (repr(key), now, pickle.dumps(entry, protocol = pickle.HIGHEST_PROTOCOL))
+                added = self._db.execute("INSERT OR IGNORE INTO path_cache (key, created, value) VALUES (?, ?, ?)", row).rowcount
+                if added:
+                    self._disk_count += added
+                else:
+                    self._db.execute("UPDATE path_cache SET created = ?, value = ? WHERE key = ?", row[1:] + row[:1])
+                if self.ttl is not None:
+                    expired = self._db.execute("DELETE FROM path_cache WHERE created < ?", (now - self.ttl,)).rowcount
+                    self._disk_count -= expired
+                    self.stats.expirations += expired
+                if self._disk_count > self.disk_maxsize:
+                    self._disk_count -= self._db.execute(
+                        "DELETE FROM path_cache WHERE key IN "
+                        "(SELECT key FROM path_cache ORDER BY created ASC LIMIT ?)",
+                        (self._disk_count - self.disk_maxsize,),
+                    ).rowcount
+                self._db.commit()
+
+    def _remember(self, key: Tuple[Any, ...], created: float, entry: Any) -> None:
+        self._entries[key] = (created, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last = False)
+            self.stats.evictions += 1
+
+    def _fresh(self, created: float, now: float) -> bool:
+        return self.ttl is None or now - created <= self.ttl
+
+
+def _copy_path(path: PathResult) -> PathResult:
+    # Steps are frozen; only the list holding them can change.
+    return PathResult(total_cost = path.total_cost, steps = list(path.steps))
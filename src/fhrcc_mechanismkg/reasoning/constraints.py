@@ -0,0 +1,142 @@
+from __future__ import annotations
+import math
+from dataclasses import dataclass
+from typing import AbstractSet, Iterable, Mapping, Optional, Sequence, Tuple, get_args
+from ..compiled import CompiledGraph
+from ..schema import EvidenceLevel, NodeType, Predicate
+
+# Evidence levels from strongest to weakest (the schema's order); a
+# `min_evidence` admits that level and every stronger one.
+EVIDENCE_ORDER: Tuple[str, ...] = get_args(EvidenceLevel)
+
+
+@dataclass(frozen=True)
+class PathConstraints:
+    """
+    Restrictions on the paths a search may return, applied while edges are
+    relaxed (a disallowed edge is never entered), so searches return the
+    best paths that satisfy them rather than the best paths overall.
+
+    - node_types / forbid_node_types: allowed / forbidden types of the nodes a
+      path passes through (source, target and waypoints are exempt);
+    - predicates / forbid_predicates: allowed / forbidden edge predicates;
+    - min_evidence: weakest admitted evidence level (see EVIDENCE_ORDER);
+    - context: required edge context values; an edge whose context gives
+      another value for a key is excluded, one without the key is kept
+      unless `strict_context` is set;
+    - waypoints: nodes the path must visit, in this order.
+
+    None / empty means no restriction. Iterables are stored as frozensets
+    and `context` as sorted (key, value) pairs, so constraints are hashable.
+    """
+
+    node_types: Optional[AbstractSet[str]] = None
+    forbid_node_types: AbstractSet[str] = frozenset()
+    predicates: Optional[AbstractSet[str]] = None
+    forbid_predicates: AbstractSet[str] = frozenset()
+    min_evidence: Optional[str] = None
+    context: Tuple[Tuple[str, str], ...] = ()
+    strict_context: bool = False
+    waypoints: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        def names(values: Optional[Iterable[str]], allowed: Tuple[str, ...], what: str) -> Optional[AbstractSet[str]]:
+            if values is None:
+                return None
+            out = frozenset(values)
+            unknown = sorted(out - set(allowed))
+            if unknown:
+                raise ValueError(f"Unknown {what}: {', '.join(unknown)}")
+            return out
+
+        node_types, predicates = get_args(NodeType), get_args(Predicate)
+        object.__setattr__(self, "node_types", names(self.node_types, node_types, "node type"))
+        object.__setattr__(self, "forbid_node_types", names(self.forbid_node_types, node_types, "node type"))
+        object.__setattr__(self, "predicates", names(self.predicates, predicates, "predicate"))
+        object.__setattr__(self, "forbid_predicates", names(self.forbid_predicates, predicates, "predicate"))
+        if self.min_evidence is not None and self.min_evidence not in EVIDENCE_ORDER:
+            raise ValueError(f"Unknown evidence level: {self.min_evidence} (expected one of {', '.join(EVIDENCE_ORDER)})")
+        context = self.context.items() if isinstance(self.context, Mapping) else self.context
+        object.__setattr__(self, "context", tuple(sorted((str(k), str(v)) for k, v in context)))
+        object.__setattr__(self, "waypoints", tuple(self.waypoints))
+
+    @property
+    def filters_edges(self) -> bool:
+        return bool(
+            self.node_types is not None or self.forbid_node_types or self.predicates is not None
+            or self.forbid_predicates or self.min_evidence is not None or self.context
+        )
+
+    def is_empty(self) -> bool:
+        return not self.filters_edges and not self.waypoints
+
+    def costs(self, cg: CompiledGraph, costs: Sequence[float], exempt: Iterable[int] = ()) -> Sequence[float]:
+        """
+        `costs` with every disallowed edge position at inf, which is how the
+        search kernels skip it. Edges are checked lazily, the first time a
+        search reaches them; `exempt` nodes (endpoints, waypoints) are never
+        rejected for their type.
+        """
+        if not self.filters_edges:
+            return costs
+        return ConstrainedCosts(cg, costs, self, frozenset(exempt))
+
+    def waypoint_indices(self, cg: CompiledGraph) -> Tuple[int, ...]:
+        out = []
+        for w in self.waypoints:
+            idx = cg.index.get(w)
+            if idx is None:
+                raise ValueError(f"Waypoint node not found: {w}")
+            out.append(idx)
+        return tuple(out)
+
+
+class ConstrainedCosts(Sequence[float]):
+    """Edge cost vector of a search under PathConstraints (see PathConstraints.costs)."""
+
+    def __init__(self, cg: CompiledGraph, costs: Sequence[float], constraints: PathConstraints, exempt: AbstractSet[int]) -> None:
+        self._cg = cg
+        self._costs = costs
+        self._exempt = exempt
+        # Per edge position: 0 = not checked yet, 1 = allowed, 2 = rejected.
+        self._verdict = bytearray(len(costs))
+        c = constraints
+        names = cg.predicate_names
+        allowed_codes = {i for i, p in enumerate(names) if (c.predicates is None or p in c.predicates) and p not in c.forbid_predicates}
+        self._all_codes = len(allowed_codes) == len(names)
+        self._codes = allowed_codes
+        self._evidence = frozenset(EVIDENCE_ORDER[:EVIDENCE_ORDER.index(c.min_evidence) + 1]) if c.min_evidence else None
+        self._node_types = c.node_types
+        self._forbid_types = c.forbid_node_types
+        self._context = c.context
+        self._strict = c.strict_context
+
+    def __len__(self) -> int:
+        return len(self._costs)
+
+    def __getitem__(self, pos):  # type: ignore[no-untyped-def, override]
+        verdict = self._verdict[pos]
+        if verdict == 0:
+            verdict = self._verdict[pos] = 1 if self._allowed(pos) else 2
+        return self._costs[pos] if verdict == 1 else math.inf
+
+    def _allowed(self, pos: int) -> bool:
+        cg = self._cg
+        if not self._all_codes and cg.predicate_codes[pos] not in self._codes:
+            return False
+        if self._node_types is not None or self._forbid_types:
+            v = cg.targets[pos]
+            if v not in self._exempt:
+                node_type = cg.nodes[cg.node_ids[v]].type
+                if (self._node_types is not None and node_type not in self._node_types) or node_type in self._forbid_types:
+                    return False
+        if self._evidence is None and not self._context:
+            return True
+        edge = cg.edges[pos]
+        if self._evidence is not None and edge.evidence_level not in self._evidence:
+            return False
+        for key, value in self._context:
+            have = edge.context.get(key)
+            if (have is None and self._strict) or (have is not None and have != value):
+                return False
+        return True
@@ -0,0 +1,399 @@
+from __future__ import annotations
+import hashlib
+import heapq
+import math
+import os
+import pickle
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from ..compiled import CompiledGraph, penalty_key
+from ..search import _file_stamp
+from .path_search import DEFAULT_PREDICATE_PENALTY, GraphLike, as_compiled
+
+DISTANCE_INDEX_SUFFIX = ".dist"
+DISTANCE_INDEX_FORMAT_VERSION = 2
+
+# Graphs with at most this many nodes get exact hop-bounded all-pairs tables;
+# larger ones get pruned landmark labels (see DistanceIndex).
+ALL_PAIRS_MAX_NODES = 2000
+
+METHODS = ("auto", "all_pairs", "labels")
+
+# Label entries: hub node -> (cost, hops) for cost labels, hub node -> hops for
+# hop labels.
+CostLabels = Dict[int, Tuple[float, int]]
+HopLabels = Dict[int, int]
+
+
+@dataclass(frozen = True)
+class Reach:
+    """
+    Answer to "can source reach target within max_hops, at what best cost?".
+
+    `reachable` is always exact. When reachable, `cost` is the best cost
+    within max_hops if `exact`, otherwise a lower bound on it (the best cost
+    with any number of hops, reached by a path longer than max_hops).
+    """
+
+    reachable: bool
+    cost: Optional[float] = None
+    exact: bool = True
+
+
+class DistanceIndex:
+    """
+    Offline reachability and distance index over a graph snapshot, for one
+    predicate penalty table.
+
+    - "all_pairs" (small graphs): for every (source, target) pair, the best
+      cost within each hop budget, kept as the hop counts at which it
+      improves (a layered Bellman-Ford from every source). Every query is
+      exact.
+    - "labels" (large graphs): pruned landmark labeling (2-hop labels).
+      Each node keeps the hubs it reaches and the hubs reaching it, with the
+      distances of both, once for edge costs and once for hop counts. A query
+      meets the two label sets: hop labels give exact reachability within
+      max_hops, and cost labels the best cost with any number of hops. That
+      cost is the answer when its path fits max_hops and a lower bound
+      otherwise.
+
+    Queries (`query`) take microseconds. shortest_path_explainable takes the
+    index as `distances`: unreachable pairs are rejected without a search,
+    and exact answers are traced edge by edge from the index. Build with
+    `DistanceIndex.build(graph)`; `for_graph_file()` keeps a copy next to the
+    graph file (`<graph>.dist`) and rebuilds it when the graph file changes.
+    Index files are pickled; only load files you trust.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        node_ids: Sequence[str],
+        n_edges: int,
+        penalty: Tuple[Tuple[str, float], ...],
+        stamp: str,
+        tables: Optional[List[Dict[int, Tuple[Tuple[int, ...], Tuple[float, ...]]]]] = None,
+        cost_out: Optional[List[CostLabels]] = None,
+        cost_in: Optional[List[CostLabels]] = None,
+        hop_out: Optional[List[HopLabels]] = None,
+        hop_in: Optional[List[HopLabels]] = None,
+    ) -> None:
+        self.method = method
+        self.node_ids = list(node_ids)
+        self.index = {nid: i for i, nid in enumerate(self.node_ids)}
+        self.n_edges = n_edges
+        self.penalty = penalty
+        # layout_stamp of the snapshot the index was built from.
+        self.stamp = stamp
+        # all_pairs: source -> {target: (hop counts, best cost within that many hops)}
+        self.tables = tables
+        self.cost_out, self.cost_in = cost_out, cost_in
+        self.hop_out, self.hop_in = hop_out, hop_in
+
+    @classmethod
+    def build(
+        cls,
+        graph: GraphLike,
+        predicate_penalty: Optional[Dict[str, float]] = None,
+        method: str = "auto",
+    ) -> "DistanceIndex":
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method} (expected one of {', '.join(METHODS)})")
+        cg = as_compiled(graph)
+        table = predicate_penalty or DEFAULT_PREDICATE_PENALTY
+        costs = cg.costs(table)
+        if method == "auto":
+            method = "all_pairs" if cg.n_nodes <= ALL_PAIRS_MAX_NODES else "labels"
+        index = cls(method, cg.node_ids, cg.n_edges, penalty_key(table), layout_stamp(cg))
+        if method == "all_pairs":
+            index.tables = [_hop_frontiers(cg, costs, s) for s in range(cg.n_nodes)]
+        else:
+            index.cost_out, index.cost_in = _landmark_labels(cg, costs)
+            index.hop_out, index.hop_in = _landmark_labels(cg, None)  # type: ignore[assignment]
+        return index
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def query(self, source: str, target: str, max_hops: int) -> Reach:
+        src = self.index.get(source)
+        if src is None:
+            raise ValueError(f"Source node not found: {source}")
+        dst = self.index.get(target)
+        if dst is None:
+            raise ValueError(f"Target node not found: {target}")
+        return self.query_index(src, dst, max_hops)
+
+    def query_index(self, src: int, dst: int, max_hops: int) -> Reach:
+        """`query` by node index (the snapshot's CSR numbering)."""
+        if src == dst:
+            return Reach(True, 0.0)
+        if max_hops <= 0:
+            return Reach(False)
+        if self.tables is not None:
+            entry = self.tables[src].get(dst)
+            if entry is None:
+                return Reach(False)
+            hops, costs = entry
+            i = bisect_right(hops, max_hops)
+            return Reach(True, costs[i - 1]) if i else Reach(False)
+
+        if _meet_hops(self.hop_out[src], self.hop_in[dst]) > max_hops:  # type: ignore[index]
+            return Reach(False)
+        cost, hops = _meet_costs(self.cost_out[src], self.cost_in[dst])  # type: ignore[index]
+        return Reach(True, cost, exact = hops <= max_hops)
+
+    def covers(self, cg: CompiledGraph, predicate_penalty: Dict[str, float]) -> bool:
+        """
+        Whether the index's costs apply to `predicate_penalty`. Reachability
+        holds for any table; an index built for another graph, or for an
+        earlier version of this one, raises ValueError.
+        """
+        if cg.n_nodes != self.n_nodes or cg.n_edges != self.n_edges:
+            raise ValueError(
+                f"Distance index was built for {self.n_nodes} nodes / {self.n_edges} edges, "
+                f"not this graph ({cg.n_nodes} / {cg.n_edges})"
+            )
+        if layout_stamp(cg) != self.stamp:
+            raise ValueError("Distance index was built for another graph, or before this one was edited")
+        return penalty_key(predicate_penalty) == self.penalty
+
+    def trace(self, cg: CompiledGraph, costs: Sequence[float], src: int, dst: int, max_hops: int) -> Optional[Tuple[int, ...]]:
+        """
+        Edge positions of a best path within max_hops, grown edge by edge
+        along exact index answers (from whichever end has fewer edges to
+        try, so hub endpoints stay cheap); None when the index cannot
+        answer exactly.
+        """
+        reach = self.query_index(src, dst, max_hops)
+        if not reach.reachable or not reach.exact:
+            return None
+        offsets, targets = cg.offsets, cg.targets
+        in_offsets, in_sources, in_positions = cg.reverse()
+        remaining: float = reach.cost  # type: ignore[assignment]
+        budget, u, v = max_hops, src, dst
+        head: List[int] = []
+        tail: List[int] = []
+        while u != v:
+            budget -= 1
+            if offsets[u + 1] - offsets[u] <= in_offsets[v + 1] - in_offsets[v]:
+                for pos in range(offsets[u], offsets[u + 1]):
+                    rest = self._rest(costs[pos], remaining, targets[pos], v, budget)
+                    if rest is not None:
+                        head.append(pos)
+                        remaining, u = rest, targets[pos]
+                        break
+                else:
+                    return None
+            else:
+                for i in range(in_offsets[v], in_offsets[v + 1]):
+                    pos = in_positions[i]
+                    rest = self._rest(costs[pos], remaining, u, in_sources[i], budget)
+                    if rest is not None:
+                        tail.append(pos)
+                        remaining, v = rest, in_sources[i]
+                        break
+                else:
+                    return None
+        tail.reverse()
+        return tuple(head + tail)
+
+    def _rest(self, step: float, remaining: float, u: int, v: int, budget: int) -> Optional[float]:
+        # Exact best cost u -> v within budget if `step` plus it is `remaining`.
+        if step > remaining * (1 + 1e-9):
+            return None
+        rest = self.query_index(u, v, budget)
+        if rest.reachable and rest.exact and math.isclose(step + rest.cost, remaining, rel_tol = 1e-9):  # type: ignore[operator]
+            return rest.cost
+        return None
+
+    def save(self, path: str, source: Optional[str] = None) -> None:
+        payload = {
+            "format_version": DISTANCE_INDEX_FORMAT_VERSION,
+            "source": _file_stamp(source) if source else None,
+            "method": self.method,
+            "node_ids": self.node_ids,
+            "n_edges": self.n_edges,
+            "penalty": self.penalty,
+            "stamp": self.stamp,
+            "tables": self.tables,
+            "cost_out": self.cost_out,
+            "cost_in": self.cost_in,
+            "hop_out": self.hop_out,
+            "hop_in": self.hop_in,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        source: Optional[str] = None,
+        predicate_penalty: Optional[Dict[str, float]] = None,
+    ) -> Optional["DistanceIndex"]:
+        """Load a saved index; None if it is missing, outdated, for another table, or `source` has changed since."""
+        try:
+            with open(path, "rb") as f:
+                payload: Dict[str, Any] = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if payload.get("format_version") != DISTANCE_INDEX_FORMAT_VERSION:
+            return None
+        if source is not None and payload.get("source") != _file_stamp(source):
+            return None
+        if payload["penalty"] != penalty_key(predicate_penalty or DEFAULT_PREDICATE_PENALTY):
+            return None
+        return cls(**{k: v for k, v in payload.items() if k not in ("format_version", "source")})
+
+    @classmethod
+    def for_graph_file(
+        cls,
+        g: GraphLike,
+        graph_path: str,
+        predicate_penalty: Optional[Dict[str, float]] = None,
+        method: str = "auto",
+    ) -> "DistanceIndex":
+        """The index saved next to `graph_path`, (re)built and saved if missing or stale."""
+        index_path = graph_path + DISTANCE_INDEX_SUFFIX
+        index = cls.load(index_path, source = graph_path, predicate_penalty = predicate_penalty)
+        if index is None or (method != "auto" and index.method != method):
+            index = cls.build(g, predicate_penalty = predicate_penalty, method = method)
+            try:
+                index.save(index_path, source = graph_path)
+            except OSError:
+                pass  # read-only location: keep the in-memory index
+        return index
+
+
+def layout_stamp(cg: CompiledGraph) -> str:
+    """
+    Hash of everything a DistanceIndex depends on: node order, CSR structure,
+    predicates and weights (cached on the snapshot). Unlike the content
+    fingerprint it reads only the columns, so mapped graphs stay unmaterialized.
+    """
+
+    def build() -> str:
+        h = hashlib.blake2b(digest_size = 16)
+        h.update("\0".join(cg.node_ids).encode("utf-8"))
+        h.update(b"\1" + "\0".join(cg.predicate_names).encode("utf-8"))
+        for column, typecode in ((cg.offsets, "q"), (cg.targets, "q"), (cg.predicate_codes, "q"), (cg.neg_log_weight, "d")):
+            h.update(b"\1" + array(typecode, column).tobytes())
+        return h.hexdigest()
+
+    return cg.memo("layout_stamp", build)
+
+
+def _hop_frontiers(cg: CompiledGraph, costs: Sequence[float], src: int) -> Dict[int, Tuple[Tuple[int, ...], Tuple[float, ...]]]:
+    # Layered Bellman-Ford: layer h holds the nodes whose best cost improved
+    # with h hops; costs are positive, so layers run out within n - 1 hops.
+    offsets, targets = cg.offsets, cg.targets
+    best: Dict[int, float] = {src: 0.0}
+    steps: Dict[int, Tuple[List[int], List[float]]] = {}
+    layer: Dict[int, float] = {src: 0.0}
+    hops = 0
+    while layer:
+        hops += 1
+        improved: Dict[int, float] = {}
+        for u, cost in layer.items():
+            for pos in range(offsets[u], offsets[u + 1]):
+                v = targets[pos]
+                ncost = cost + costs[pos]
+                if ncost < best.get(v, math.inf) and ncost < improved.get(v, math.inf):
+                    improved[v] = ncost
+        for v, ncost in improved.items():
+            best[v] = ncost
+            h, c = steps.setdefault(v, ([], []))
+            h.append(hops)
+            c.append(ncost)
+        layer = improved
+    steps.pop(src, None)
+    return {v: (tuple(h), tuple(c)) for v, (h, c) in steps.items()}
+
+
+def _landmark_labels(cg: CompiledGraph, costs: Optional[Sequence[float]]) -> Tuple[List[Dict[int, Any]], List[Dict[int, Any]]]:
+    """
+    Pruned landmark labeling: (out labels, in labels). Hubs are taken in
+    decreasing degree order; each runs a forward and a backward Dijkstra
+    that stops expanding wherever the labels so far already give a distance
+    no greater. With `costs` entries are (cost, hops), otherwise hop counts.
+    """
+    n = cg.n_nodes
+    offsets, targets = cg.offsets, cg.targets
+    in_offsets, in_sources, in_positions = cg.reverse()
+    degree = [offsets[i + 1] - offsets[i] + in_offsets[i + 1] - in_offsets[i] for i in range(n)]
+    order = sorted((i for i in range(n) if degree[i]), key = lambda i: -degree[i])
+    out_labels: List[Dict[int, Any]] = [{} for _ in range(n)]
+    in_labels: List[Dict[int, Any]] = [{} for _ in range(n)]
+    meet = _meet_costs if costs is not None else _meet_hops
+
+    for hub in order:
+        # Forward: hub reaches v, recorded in v's in labels.
+        _pruned_search(hub, offsets, targets, None, costs, out_labels[hub], in_labels, meet, forward = True)
+        # Backward: v reaches hub, recorded in v's out labels.
+        _pruned_search(hub, in_offsets, in_sources, in_positions, costs, in_labels[hub], out_labels, meet, forward = False)
+    return out_labels, in_labels
+
+
+def _pruned_search(
+    hub: int,
+    offsets: Sequence[int],
+    neighbors: Sequence[int],
+    positions: Optional[Sequence[int]],
+    costs: Optional[Sequence[float]],
+    hub_labels: Dict[int, Any],
+    labels: List[Dict[int, Any]],
+    meet: Any,
+    forward: bool,
+) -> None:
+    pq: List[Tuple[float, int, int]] = [(0.0, 0, hub)]
+    done = set()
+    while pq:
+        dist, hops, v = heapq.heappop(pq)
+        if v in done:
+            continue
+        done.add(v)
+        known = meet(hub_labels, labels[v]) if forward else meet(labels[v], hub_labels)
+        if (known[0] if costs is not None else known) <= dist:
+            continue
+        labels[v][hub] = (dist, hops) if costs is not None else hops
+        for i in range(offsets[v], offsets[v + 1]):
+            w = neighbors[i]
+            if w in done:
+                continue
+            if costs is None:
+                step = 1.0
+            else:
+                step = costs[positions[i] if positions is not None else i]
+            heapq.heappush(pq, (dist + step, hops + 1, w))
+
+
+def _meet_costs(out_labels: CostLabels, in_labels: CostLabels) -> Tuple[float, int]:
+    # Best (cost, hops) over hubs in both label sets; (inf, inf-ish) if none.
+    if len(out_labels) > len(in_labels):
+        pairs = ((in_labels[h], out_labels.get(h)) for h in in_labels)
+    else:
+        pairs = ((out_labels[h], in_labels.get(h)) for h in out_labels)
+    best, best_hops = math.inf, 1 << 30
+    for a, b in pairs:
+        if b is not None:
+            cost = a[0] + b[0]
+            if cost < best or (cost == best and a[1] + b[1] < best_hops):
+                best, best_hops = cost, a[1] + b[1]
+    return best, best_hops
+
+
+def _meet_hops(out_labels: HopLabels, in_labels: HopLabels) -> float:
+    if len(out_labels) > len(in_labels):
+        out_labels, in_labels = in_labels, out_labels
+    best: float = math.inf
+    for h, a in out_labels.items():
+        b = in_labels.get(h)
+        if b is not None and a + b < best:
+            best = a + b
+    return best
@@ -0,0 +1,241 @@
+from __future__ import annotations
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from ..graph import Change, Graph
+from ..schema import Edge
+from .path_search import DEFAULT_PREDICATE_PENALTY, PathResult, PathStep, edge_cost
+
+# Label of a (node, hops) state: (cost, edge used to reach it; None at the source).
+Label = Tuple[float, Optional[Edge]]
+
+
+@dataclass
+class RepairStats:
+    updates: int = 0  # graph/penalty changes seen
+    repairs: int = 0  # refresh() calls that had work to do
+    states_recomputed: int = 0
+    states_changed: int = 0
+
+
+class DynamicShortestPaths:
+    """
+    Hop-constrained shortest paths from one source, kept up to date as the
+    graph changes.
+
+    The search space of shortest_path_explainable is the DAG of (node, hops)
+    states with hops <= max_hops. This class stores the best label of every
+    reachable state, layer by layer, and repairs it in the style of
+    Ramalingam-Reps: a changed edge u -> v only marks the states (v, h + 1)
+    fed by a stored (u, h); marked states are recomputed from their incoming
+    edges in layer order, and only states whose cost changed mark their own
+    successors. Re-answering queries after a small edit therefore costs
+    roughly the size of the affected region instead of a full search.
+
+    Attached to a Graph (the default), edge insertions, deletions and updates
+    (e.g. weight changes) are picked up through Graph.subscribe; penalty
+    changes go through `set_predicate_penalty`. Repairs run lazily on the next
+    query (or `refresh()`), so a batch of edits is repaired once.
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        source: str,
+        max_hops: int = 6,
+        predicate_penalty: Optional[Dict[str, float]] = None,
+        attach: bool = True,
+    ) -> None:
+        if source not in graph.nodes:
+            raise ValueError(f"Source node not found: {source}")
+        self.graph = graph
+        self.source = source
+        self.max_hops = max_hops
+        self.predicate_penalty = dict(predicate_penalty or DEFAULT_PREDICATE_PENALTY)
+        self.stats = RepairStats()
+        # layers[h][node] = best label over walks of exactly h edges
+        self.layers: List[Dict[str, Label]] = []
+        self._dirty: Dict[int, Set[str]] = defaultdict(set)
+        self._unsubscribe: Optional[Callable[[], None]] = graph.subscribe(self.on_change) if attach else None
+        self._build()
+
+    def close(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def path_to(self, target: str) -> PathResult:
+        """Same result cost as shortest_path_explainable(graph, source, target, max_hops, penalty)."""
+        self._check_source()
+        if target not in self.graph.nodes:
+            raise ValueError(f"Target node not found: {target}")
+        self.refresh()
+        found = self._best(target)
+        if found is None:
+            raise ValueError(f"No path found from {self.source} to {target} within max_hops = {self.max_hops}")
+        return self._path(target, found)
+
+    def paths_to(self, targets: Optional[Iterable[str]] = None) -> Dict[str, PathResult]:
+        """Best path to each reachable target (every reachable node if None), like shortest_paths_from."""
+        self._check_source()
+        self.refresh()
+        if targets is None:
+            targets = {v for layer in self.layers[1:] for v in layer} - {self.source}
+        results: Dict[str, PathResult] = {}
+        for t in targets:
+            if t not in self.graph.nodes:
+                raise ValueError(f"Target node not found: {t}")
+            found = self._best(t)
+            if found is not None:
+                results[t] = self._path(t, found)
+        return results
+
+    def on_change(self, change: Change) -> None:
+        """Graph listener: mark the states fed by a changed edge."""
+        if change.kind != "edge":
+            return
+        self.stats.updates += 1
+        for edge in (change.before, change.after):
+            if edge is not None:
+                self._mark_edge(edge)  # type: ignore[arg-type]
+
+    def set_predicate_penalty(self, predicate_penalty: Dict[str, float]) -> None:
+        """
+        Switch penalty tables; only edges whose predicate penalty changed are
+        repaired. An empty table means the default one, as in edge_cost.
+        """
+        old, new = self.predicate_penalty, dict(predicate_penalty or DEFAULT_PREDICATE_PENALTY)
+        changed = {p for p in set(old) | set(new) if old.get(p, 1.0) != new.get(p, 1.0)}
+        self.predicate_penalty = new
+        if not changed:
+            return
+        self.stats.updates += 1
+        for p in changed:
+            for edge in self.graph.find_edges(predicate = p):
+                self._mark_edge(edge)
+
+    def refresh(self) -> None:
+        """Repair all marked states, layer by layer."""
+        if not self._dirty:
+            return
+        self.stats.repairs += 1
+        g = self.graph
+        for h in range(1, self.max_hops + 1):
+            dirty = self._dirty.pop(h, None)
+            if not dirty:
+                continue
+            prev, layer = self.layers[h - 1], self.layers[h]
+            for v in dirty:
+                self.stats.states_recomputed += 1
+                best: Optional[Label] = None
+                if v in g.nodes:
+                    for e in g.incoming(v):
+                        label = prev.get(e.subject)
+                        if label is None:
+                            continue
+                        cost = label[0] + self._cost(e)
+                        if best is None or cost < best[0]:
+                            best = (cost, e)
+                old = layer.get(v)
+                if best is None:
+                    if old is not None:
+                        del layer[v]
+                elif old is None or old[1] is not best[1] or old[0] != best[0]:
+                    layer[v] = best
+                if (old[0] if old else math.inf) == (best[0] if best else math.inf):
+                    continue
+                # The cost of (v, h) changed: its successors need a look.
+                self.stats.states_changed += 1
+                if h < self.max_hops and v in g.nodes:
+                    nxt = self._dirty[h + 1]
+                    for e in g.outgoing(v):
+                        nxt.add(e.object)
+        self._dirty.clear()
+
+    def _check_source(self) -> None:
+        if self.source not in self.graph.nodes:
+            raise ValueError(f"Source node not found: {self.source}")
+
+    def _build(self) -> None:
+        # Forward layered relaxation over the state DAG.
+        g = self.graph
+        self.layers = [{self.source: (0.0, None)}]
+        for _ in range(self.max_hops):
+            prev = self.layers[-1]
+            layer: Dict[str, Label] = {}
+            for u, (cost_u, _) in prev.items():
+                for e in g.outgoing(u):
+                    cost = cost_u + self._cost(e)
+                    old = layer.get(e.object)
+                    if old is None or cost < old[0]:
+                        layer[e.object] = (cost, e)
+            self.layers.append(layer)
+
+    def _mark_edge(self, edge: Edge) -> None:
+        for h in range(self.max_hops):
+            if edge.subject in self.layers[h]:
+                self._dirty[h + 1].add(edge.object)
+
+    def _cost(self, edge: Edge) -> float:
+        return edge_cost(edge, self.predicate_penalty)
+
+    def _best(self, target: str) -> Optional[Tuple[float, int]]:
+        if target == self.source:
+            return 0.0, 0
+        best: Optional[Tuple[float, int]] = None
+        for h in range(1, self.max_hops + 1):
+            label = self.layers[h].get(target)
+            if label is not None and (best is None or label[0] < best[0]):
+                best = (label[0], h)
+        return best
+
+    def _path(self, target: str, found: Tuple[float, int]) -> PathResult:
+        cost, h = found
+        steps: List[PathStep] = []
+        v = target
+        while h > 0:
+            edge = self.layers[h][v][1]
+            penalty = self.predicate_penalty.get(edge.predicate, 1.0)  # type: ignore[union-attr]
+            steps.append(PathStep(edge, cost = self._cost(edge), penalty = penalty))  # type: ignore[arg-type]
+            v, h = edge.subject, h - 1  # type: ignore[union-attr]
+        steps.reverse()
+        return PathResult(total_cost = cost, steps = steps)
+
+
+class DynamicQuerySet:
+    """
+    A saved set of (source, target) explanations kept current under graph
+    edits: one DynamicShortestPaths per distinct source.
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        pairs: Iterable[Tuple[str, str]],
+        max_hops: int = 6,
+        predicate_penalty: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.pairs = list(dict.fromkeys(pairs))
+        self.trees: Dict[str, DynamicShortestPaths] = {}
+        for source, _ in self.pairs:
+            if source not in self.trees:
+                self.trees[source] = DynamicShortestPaths(graph, source, max_hops, predicate_penalty)
+
+    def set_predicate_penalty(self, predicate_penalty: Dict[str, float]) -> None:
+        for tree in self.trees.values():
+            tree.set_predicate_penalty(predicate_penalty)
+
+    def results(self) -> Dict[Tuple[str, str], Optional[PathResult]]:
+        """Current best path per pair (None where no path exists within max_hops)."""
+        out: Dict[Tuple[str, str], Optional[PathResult]] = {}
+        for source, target in self.pairs:
+            try:
+                out[(source, target)] = self.trees[source].path_to(target)
+            except ValueError:
+                out[(source, target)] = None
+        return out
+
+    def close(self) -> None:
+        for tree in self.trees.values():
+            tree.close()
@@ -1,10 +1,31 @@
 from __future__ import annotations
 import heapq
 import math
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from ..compiled import CompiledGraph, penalty_key
 from ..graph import Graph
 from ..schema import Edge
+from .constraints import PathConstraints
+from .stats import SearchStats, instrumented, timed
+
+if TYPE_CHECKING:
+    from .distances import DistanceIndex
+
+
+# Search entry points accept a mutable Graph (frozen on demand) or a prebuilt snapshot.
+GraphLike = Union[Graph, CompiledGraph]
+
+# Search strategies for shortest_path_explainable (all return the same optimum):
+# - "dijkstra": forward (node, hops) state-space Dijkstra
+# - "bidirectional": Dijkstra from both endpoints, meeting in the middle
+# - "astar": A* with a hop-count lower bound (min edge cost * hops to target)
+# - "alt": A* with landmark (ALT) triangle-inequality bounds
+STRATEGIES = ("dijkstra", "bidirectional", "astar", "alt")
+
+# Heuristic signature: (node_index, hops_so_far) -> admissible cost-to-go (inf = prune)
+Heuristic = Callable[[int, int], float]
 
 
 DEFAULT_PREDICATE_PENALTY: Dict[str, float] = {
@@ -32,6 +53,10 @@ DEFAULT_PREDICATE_PENALTY: Dict[str, float] = {
 @dataclass(frozen=True)
 class PathStep:
     edge: Edge
+    # Cost and predicate penalty of the edge under the search's penalty table
+    # (None when the step was built without one).
+    cost: Optional[float] = None
+    penalty: Optional[float] = None
 
     def to_text(self) -> str:
         w = f"{self.edge.weight:.2f}"
@@ -65,110 +90,938 @@ def edge_cost(edge: Edge, predicate_penalty: Optional[Dict[str, float]] = None)
     return weight_component + penalty
 
 
+def as_compiled(graph: GraphLike) -> CompiledGraph:
+    """Return the CSR snapshot the search engine runs on."""
+    if isinstance(graph, CompiledGraph):
+        return graph
+    return graph.freeze()
+
+
+@instrumented("shortest_path")
 def shortest_path_explainable(
-    graph: Graph,
+    graph: GraphLike,
     source: str,
     target: str,
     max_hops: int = 6,
     predicate_penalty: Optional[Dict[str, float]] = None,
+    strategy: str = "dijkstra",
+    landmarks: Optional[Landmarks] = None,
+    constraints: Optional[PathConstraints] = None,
+    distances: Optional[DistanceIndex] = None,
+    stats: Optional[SearchStats] = None,
 ) -> PathResult:
     """
     Dijkstra-style search over directed edges with an interpretable cost function.
     Returns the single best path (lowest cost).
-    """
-    if source not in graph.nodes:
-        raise ValueError(f"Source node not found: {source}")
-    if target not in graph.nodes:
-        raise ValueError(f"Target node not found: {target}")
-    if source == target:
-        return PathResult(total_cost=0.0, steps=[])
-
-    # Priority queue items: (cost, hops, current_node)
-    pq: List[Tuple[float, int, str]] = [(0.0, 0, source)]
-    best_cost: Dict[Tuple[str, int], float] = {(source, 0): 0.0}
-    backptr: Dict[Tuple[str, int], Tuple[Tuple[str, int], Edge]] = {}
 
-    while pq:
-        cost, hops, node_id = heapq.heappop(pq)
-
-        if hops > max_hops:
-            continue
+    `strategy` selects the search variant (see STRATEGIES). "alt" uses
+    `landmarks` if given, otherwise builds default landmarks once per snapshot
+    and penalty table.
 
-        if node_id == target:
-            # Reconstruct using the best hops state that reached target (this one)
-            return _reconstruct_path(backptr, (node_id, hops), cost)
+    `constraints` (PathConstraints) restricts the node types, predicates,
+    evidence and context of the edges the search may relax; with waypoints
+    the search runs forward over (waypoints visited, hops, node) labels
+    whatever the strategy.
 
-        # Expand outgoing edges
-        for e in graph.outgoing(node_id):
-            nhops = hops + 1
-            if nhops > max_hops:
-                continue
+    `distances` (a DistanceIndex built for this graph) answers first: pairs
+    it shows unreachable within max_hops fail without a search, and when it
+    knows the exact best cost (for this penalty table, without constraints)
+    the path is traced from it instead of searched for.
 
-            ncost = cost + edge_cost(e, predicate_penalty=predicate_penalty)
-            state = (e.object, nhops)
+    Pass a SearchStats as `stats` to collect search counters and per-phase
+    timings (see stats.py; hooks installed with add_search_hook receive them too).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
 
-            if ncost < best_cost.get(state, float("inf")):
-                best_cost[state] = ncost
-                backptr[state] = ((node_id, hops), e)
-                heapq.heappush(pq, (ncost, nhops, e.object))
+    with timed(stats, "compile"):
+        cg = as_compiled(graph)
+    src, dst = _endpoints(cg, source, target)
+    if source == target:
+        return PathResult(total_cost=0.0, steps=[])
 
-    raise ValueError(f"No path found from {source} to {target} within max_hops = {max_hops}")
+    table = predicate_penalty or DEFAULT_PREDICATE_PENALTY
+    with timed(stats, "costs"):
+        base_costs = costs = cg.costs(table)
+        via: Tuple[int, ...] = ()
+        if constraints is not None:
+            via = constraints.waypoint_indices(cg)
+            costs = constraints.costs(cg, base_costs, exempt = (src, dst) + via)
+    if distances is not None:
+        with timed(stats, "distance_index"):
+            known = _index_lookup(distances, cg, costs, table, src, dst, max_hops, constraints)
+        if known is None:
+            raise ValueError(f"No path found from {source} to {target} within max_hops = {max_hops}")
+        if known:
+            with timed(stats, "paths"):
+                return _path_result(cg, known, _path_cost(costs, known), costs, table)
+    if via:
+        with timed(stats, "search"):
+            found = _waypoint_dijkstra(cg, costs, src, dst, via, max_hops, stats = stats)
+    elif strategy == "bidirectional":
+        with timed(stats, "search"):
+            found = _bidirectional_dijkstra(cg, costs, src, dst, max_hops, stats = stats)
+    else:
+        # Bounds from the unconstrained costs stay admissible (constraints only
+        # raise costs to inf).
+        heuristic = None
+        with timed(stats, "heuristic"):
+            if strategy == "astar":
+                heuristic = _hop_bound_heuristic(cg, base_costs, table, dst, max_hops)
+            elif strategy == "alt":
+                if landmarks is None:
+                    landmarks = cg.memo(("landmarks", penalty_key(table)), lambda: build_landmarks(cg, predicate_penalty = table))
+                heuristic = landmarks.heuristic(dst)
+        with timed(stats, "search"):
+            found = _hop_constrained_dijkstra(cg, costs, src, dst, max_hops, heuristic = heuristic, stats = stats)
+    if found is None:
+        raise ValueError(f"No path found from {source} to {target} within max_hops = {max_hops}")
+    cost, positions = found
+    with timed(stats, "paths"):
+        return _path_result(cg, positions, cost, costs, table)
 
 
+@instrumented("k_shortest")
 def k_shortest_paths_explainable(
-    graph: Graph,
+    graph: GraphLike,
     source: str,
     target: str,
     k: int = 5,
     max_hops: int = 6,
     predicate_penalty: Optional[Dict[str, float]] = None,
+    constraints: Optional[PathConstraints] = None,
+    distances: Optional[DistanceIndex] = None,
+    stats: Optional[SearchStats] = None,
 ) -> List[PathResult]:
     """
-    Enumerate up to k paths using a best-first search over partial paths.
+    Enumerate up to k loopless paths in increasing cost order (Yen's algorithm).
+
+    Each spur search is a bidirectional hop-constrained Dijkstra limited to the
+    hops left after the root path, so every candidate respects max_hops. Memory is bounded by the
+    k accepted paths plus at most one candidate per (path, spur node) pair.
+    `stats` collects counters summed over all searches (see shortest_path_explainable).
+
+    With `constraints` every search (the first and each spur) only relaxes
+    allowed edges, so the k paths returned are the k best that satisfy them;
+    waypoint spur searches resume from the waypoints their root path visited.
+    `distances` answers the first search as in shortest_path_explainable.
     """
     if k <= 0:
         return []
 
-    if source not in graph.nodes:
+    with timed(stats, "compile"):
+        cg = as_compiled(graph)
+    src, dst = _endpoints(cg, source, target)
+    if source == target:
+        return [PathResult(total_cost = 0.0, steps = [])]
+
+    table = predicate_penalty or DEFAULT_PREDICATE_PENALTY
+    with timed(stats, "costs"):
+        costs = cg.costs(table)
+        via: Tuple[int, ...] = ()
+        if constraints is not None:
+            via = constraints.waypoint_indices(cg)
+            costs = constraints.costs(cg, costs, exempt = (src, dst) + via)
+    targets = cg.targets
+
+    known: Optional[Tuple[int, ...]] = ()
+    if distances is not None:
+        with timed(stats, "distance_index"):
+            known = _index_lookup(distances, cg, costs, table, src, dst, max_hops, constraints)
+        if known is None:
+            return []
+    with timed(stats, "search"):
+        if known:
+            first = (_path_cost(costs, known), known)
+        elif via:
+            first = _waypoint_dijkstra(cg, costs, src, dst, via, max_hops, stats = stats)
+        else:
+            first = _bidirectional_dijkstra(cg, costs, src, dst, max_hops, stats = stats)
+    if first is None:
+        return []
+
+    # Accepted paths as (cost, edge positions, deviation index). Following Lawler,
+    # spur nodes before a path's deviation index were already explored by its parent.
+    accepted: List[Tuple[float, Tuple[int, ...], int]] = [(first[0], first[1], 0)]
+    candidates: List[Tuple[float, Tuple[int, ...], int]] = []
+    seen = {first[1]}
+
+    with timed(stats, "spur_searches"):
+        while len(accepted) < k:
+            _, prev, dev = accepted[-1]
+            prev_nodes = [src] + [targets[pos] for pos in prev]
+
+            root_cost = 0.0
+            for i in range(dev):
+                root_cost += costs[prev[i]]
+
+            for i in range(dev, len(prev)):
+                root = prev[:i]
+                banned_edges = {p[i] for _, p, _ in accepted if len(p) > i and p[:i] == root}
+                banned_nodes = set(prev_nodes[:i])
+
+                if via:
+                    spur = _waypoint_dijkstra(
+                        cg, costs, prev_nodes[i], dst, via, max_hops - i,
+                        stage = _waypoints_visited(via, prev_nodes[:i]),
+                        banned_nodes = banned_nodes,
+                        banned_edges = banned_edges,
+                        stats = stats,
+                    )
+                else:
+                    spur = _bidirectional_dijkstra(
+                        cg, costs, prev_nodes[i], dst, max_hops - i,
+                        banned_nodes = banned_nodes,
+                        banned_edges = banned_edges,
+                        stats = stats,
+                    )
+                if spur is not None:
+                    path = root + spur[1]
+                    if path not in seen:
+                        seen.add(path)
+                        heapq.heappush(candidates, (root_cost + spur[0], path, i))
+
+                root_cost += costs[prev[i]]
+
+            if not candidates:
+                break
+            accepted.append(heapq.heappop(candidates))
+
+    with timed(stats, "paths"):
+        return [_path_result(cg, path, cost, costs, table) for cost, path, _ in accepted]
+
+
+@instrumented("shortest_paths_from")
+def shortest_paths_from(
+    graph: GraphLike,
+    source: str,
+    targets: Optional[Iterable[str]] = None,
+    max_hops: int = 6,
+    predicate_penalty: Optional[Dict[str, float]] = None,
+    constraints: Optional[PathConstraints] = None,
+    stats: Optional[SearchStats] = None,
+) -> Dict[str, PathResult]:
+    """
+    Best path from `source` to each target, from a single hop-constrained search.
+
+    With `targets=None` every node reachable within max_hops (other than the
+    source) is reported. Unreachable targets are left out of the result; unknown
+    target ids raise ValueError. `constraints` filter edges as in
+    shortest_path_explainable (listed targets are exempt from the node-type
+    filters); waypoints need a single target and raise ValueError here.
+    """
+    if constraints is not None and constraints.waypoints:
+        raise ValueError("Waypoints need a single target (use shortest_path_explainable or k_shortest_paths_explainable)")
+    with timed(stats, "compile"):
+        cg = as_compiled(graph)
+    src = cg.index.get(source)
+    if src is None:
         raise ValueError(f"Source node not found: {source}")
-    if target not in graph.nodes:
-        raise ValueError(f"Target node not found: {target}")
 
-    # Each queue item is: (total_cost, current_node, path_edges, visited_nodes)
-    pq: List[Tuple[float, str, List[Edge], Tuple[str, ...]]] = [(0.0, source, [], (source,))]
-    results: List[PathResult] = []
+    wanted: Optional[Set[int]] = None
+    if targets is not None:
+        wanted = set()
+        for t in targets:
+            idx = cg.index.get(t)
+            if idx is None:
+                raise ValueError(f"Target node not found: {t}")
+            wanted.add(idx)
+
+    table = predicate_penalty or DEFAULT_PREDICATE_PENALTY
+    with timed(stats, "costs"):
+        costs = cg.costs(table)
+        if constraints is not None:
+            costs = constraints.costs(cg, costs, exempt = {src} | (wanted or set()))
+    with timed(stats, "search"):
+        settled, best_cost, backptr = _hop_constrained_tree(cg, costs, src, max_hops, wanted, stats = stats)
+
+    results: Dict[str, PathResult] = {}
+    with timed(stats, "paths"):
+        for v, state in settled.items():
+            if (wanted is None and v != src) or (wanted is not None and v in wanted):
+                results[cg.node_ids[v]] = _path_result(cg, _backtrack(backptr, state), best_cost[state], costs, table)
+    return results
+
+
+def _hop_constrained_dijkstra(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    src: int,
+    dst: int,
+    max_hops: int,
+    banned_nodes: Optional[Set[int]] = None,
+    banned_edges: Optional[Set[int]] = None,
+    heuristic: Optional[Heuristic] = None,
+    stats: Optional[SearchStats] = None,
+) -> Optional[Tuple[float, Tuple[int, ...]]]:
+    """
+    Lowest-cost path from src to dst using at most max_hops edges, avoiding the
+    banned nodes/edge positions. Returns (cost, edge positions) or None.
+
+    With a consistent `heuristic` this is A*: states are ordered by cost plus
+    the heuristic, which leaves the per-node pop order (and thus the hop
+    dominance rule below) unchanged.
+    """
+    if max_hops < 0:
+        return None
+    offsets, targets = cg.offsets, cg.targets
+    n = cg.n_nodes
+    banned_nodes = banned_nodes or set()
+    banned_edges = banned_edges or set()
+
+    # States are (node, hops) encoded as hops * n + node.
+    # Priority queue items: (cost + heuristic, hops, node_index)
+    pq: List[Tuple[float, int, int]] = [(0.0, 0, src)]
+    best_cost: Dict[int, float] = {src: 0.0}
+    backptr: Dict[int, Tuple[int, int]] = {}
+    # Fewest hops with which each node has been settled. A later pop of the same
+    # node with at least as many hops costs no less, so it is dominated (this
+    # also discards stale queue entries).
+    settled_hops: Dict[int, int] = {}
+    # Counters for `stats` (cheap enough to keep unconditionally).
+    popped = stale = relaxed = peak = pruned = 0
+
+    try:
+        while pq:
+            if len(pq) > peak:
+                peak = len(pq)
+            _, hops, u = heapq.heappop(pq)
+            popped += 1
+            state = hops * n + u
+            cost = best_cost[state]
+
+            if u == dst:
+                return cost, _backtrack(backptr, state)
+
+            if settled_hops.get(u, max_hops + 1) <= hops:
+                stale += 1
+                continue
+            settled_hops[u] = hops
+
+            nhops = hops + 1
+            if nhops > max_hops:
+                pruned += 1
+                continue
+
+            # Expand outgoing edges
+            base = nhops * n
+            start, end = offsets[u], offsets[u + 1]
+            relaxed += end - start
+            for pos in range(start, end):
+                v = targets[pos]
+                if v in banned_nodes or pos in banned_edges:
+                    continue
+                ncost = cost + costs[pos]
+                nstate = base + v
+                if ncost < best_cost.get(nstate, math.inf):
+                    priority = ncost
+                    if heuristic is not None:
+                        priority += heuristic(v, nhops)
+                        if priority == math.inf:
+                            continue
+                    best_cost[nstate] = ncost
+                    backptr[nstate] = (state, pos)
+                    heapq.heappush(pq, (priority, nhops, v))
+
+        return None
+    finally:
+        if stats is not None:
+            stats.record(popped, stale, relaxed, peak, pruned)
+
+
+def _waypoint_dijkstra(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    src: int,
+    dst: int,
+    waypoints: Tuple[int, ...],
+    max_hops: int,
+    stage: int = 0,
+    banned_nodes: Optional[Set[int]] = None,
+    banned_edges: Optional[Set[int]] = None,
+    stats: Optional[SearchStats] = None,
+) -> Optional[Tuple[float, Tuple[int, ...]]]:
+    """
+    Lowest-cost simple path from src to dst within max_hops that visits
+    waypoints[stage:] in order (the first `stage` were visited before src).
+    Returns (cost, edge positions) or None.
+
+    Runs _waypoint_walks first: its best walk costs no more than any simple
+    path, so when it does not repeat a node it is the answer. Otherwise (the
+    walk goes out to a waypoint and back) the exact _waypoint_simple_paths
+    runs instead.
+    """
+    if max_hops < 0:
+        return None
+    banned_nodes = banned_nodes or set()
+    banned_edges = banned_edges or set()
+    if stage < len(waypoints) and src == waypoints[stage]:
+        stage += 1
+    found = _waypoint_walks(cg, costs, src, dst, waypoints, max_hops, stage, banned_nodes, banned_edges, stats = stats)
+    if found is None or _is_simple(cg, src, found[1]):
+        return found
+    return _waypoint_simple_paths(cg, costs, src, dst, waypoints, max_hops, stage, banned_nodes, banned_edges, stats = stats)
+
+
+def _waypoint_walks(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    src: int,
+    dst: int,
+    waypoints: Tuple[int, ...],
+    max_hops: int,
+    stage: int,
+    banned_nodes: Set[int],
+    banned_edges: Set[int],
+    stats: Optional[SearchStats] = None,
+) -> Optional[Tuple[float, Tuple[int, ...]]]:
+    """
+    Lowest-cost walk for _waypoint_dijkstra, which may repeat nodes.
+
+    Labels are (stage, hops, node), with the stage counting the waypoints
+    visited so far, and carry the hop dominance rule of
+    _hop_constrained_dijkstra per (stage, node). Waypoints are entered only
+    in their turn (a simple path cannot visit one out of turn) and dst only
+    once every waypoint is visited.
+    """
+    offsets, targets = cg.offsets, cg.targets
+    n = cg.n_nodes
+    m = len(waypoints)
+    order = {w: j for j, w in enumerate(waypoints)}
+    layer = (max_hops + 1) * n
+
+    # States are (stage, hops, node) encoded as stage * layer + hops * n + node.
+    pq: List[Tuple[float, int, int, int]] = [(0.0, 0, stage, src)]
+    best_cost: Dict[int, float] = {stage * layer + src: 0.0}
+    backptr: Dict[int, Tuple[int, int]] = {}
+    settled_hops: Dict[int, int] = {}  # keyed by stage * n + node
+    popped = stale = relaxed = peak = pruned = 0
+
+    try:
+        while pq:
+            if len(pq) > peak:
+                peak = len(pq)
+            cost, hops, st, u = heapq.heappop(pq)
+            popped += 1
+            state = st * layer + hops * n + u
+            if cost > best_cost[state]:
+                stale += 1
+                continue
+            if u == dst and st == m:
+                return cost, _backtrack(backptr, state)
+
+            key = st * n + u
+            if settled_hops.get(key, max_hops + 1) <= hops:
+                stale += 1
+                continue
+            settled_hops[key] = hops
+
+            nhops = hops + 1
+            if nhops > max_hops:
+                pruned += 1
+                continue
+
+            start, end = offsets[u], offsets[u + 1]
+            relaxed += end - start
+            for pos in range(start, end):
+                v = targets[pos]
+                if v in banned_nodes or pos in banned_edges:
+                    continue
+                nst = st
+                j = order.get(v)
+                if j is not None:
+                    if j != st:
+                        continue
+                    nst = st + 1
+                if v == dst and nst < m:
+                    continue
+                ncost = cost + costs[pos]
+                nstate = nst * layer + nhops * n + v
+                if ncost < best_cost.get(nstate, math.inf):
+                    best_cost[nstate] = ncost
+                    backptr[nstate] = (state, pos)
+                    heapq.heappush(pq, (ncost, nhops, nst, v))
+
+        return None
+    finally:
+        if stats is not None:
+            stats.record(popped, stale, relaxed, peak, pruned)
+
+
+def _waypoint_simple_paths(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    src: int,
+    dst: int,
+    waypoints: Tuple[int, ...],
+    max_hops: int,
+    stage: int,
+    banned_nodes: Set[int],
+    banned_edges: Set[int],
+    stats: Optional[SearchStats] = None,
+) -> Optional[Tuple[float, Tuple[int, ...]]]:
+    """
+    Exact simple-path search for _waypoint_dijkstra.
+
+    As in signed._signed_simple_paths, each label carries the nodes of its
+    path and is dropped only when an earlier, no costlier label at the same
+    (stage, node) used no more hops and a subset of its nodes, so a cheap
+    label never hides one that leaves the nodes a later leg needs free.
+    """
+    offsets, targets = cg.offsets, cg.targets
+    n = cg.n_nodes
+    m = len(waypoints)
+    order = {w: j for j, w in enumerate(waypoints)}
+    # Label i: (parent label, edge position) for backtracking.
+    parents: List[Tuple[int, int]] = [(-1, -1)]
+    # Items: (cost, hops, stage, node, label, path nodes)
+    pq: List[Tuple[float, int, int, int, int, FrozenSet[int]]] = [(0.0, 0, stage, src, 0, frozenset((src,)))]
+    settled: Dict[int, List[Tuple[int, FrozenSet[int]]]] = {}  # keyed by stage * n + node
+    popped = stale = relaxed = peak = pruned = 0
+
+    try:
+        while pq:
+            if len(pq) > peak:
+                peak = len(pq)
+            cost, hops, st, u, label, nodes = heapq.heappop(pq)
+            popped += 1
+            if u == dst and st == m:
+                positions = []
+                while label:
+                    label, pos = parents[label]
+                    positions.append(pos)
+                return cost, tuple(reversed(positions))
+
+            key = st * n + u
+            earlier = settled.setdefault(key, [])
+            if any(h <= hops and other <= nodes for h, other in earlier):
+                stale += 1
+                continue
+            earlier.append((hops, nodes))
+
+            nhops = hops + 1
+            if nhops > max_hops:
+                pruned += 1
+                continue
+
+            start, end = offsets[u], offsets[u + 1]
+            relaxed += end - start
+            for pos in range(start, end):
+                v = targets[pos]
+                if v in nodes or v in banned_nodes or pos in banned_edges:
+                    continue
+                nst = st
+                j = order.get(v)
+                if j is not None:
+                    if j != st:
+                        continue
+                    nst = st + 1
+                if v == dst and nst < m:
+                    continue
+                ncost = cost + costs[pos]
+                if ncost == math.inf:
+                    continue
+                parents.append((label, pos))
+                heapq.heappush(pq, (ncost, nhops, nst, v, len(parents) - 1, nodes | {v}))
+
+        return None
+    finally:
+        if stats is not None:
+            stats.record(popped, stale, relaxed, peak, pruned)
+
+
+def _is_simple(cg: CompiledGraph, src: int, positions: Tuple[int, ...]) -> bool:
+    targets = cg.targets
+    nodes = {src}
+    nodes.update(targets[pos] for pos in positions)
+    return len(nodes) == len(positions) + 1
+
+
+def _waypoints_visited(waypoints: Tuple[int, ...], nodes: Sequence[int]) -> int:
+    # Waypoints a root path has visited, in order.
+    stage = 0
+    for u in nodes:
+        if stage < len(waypoints) and u == waypoints[stage]:
+            stage += 1
+    return stage
 
-    while pq and len(results) < k:
-        cost, node_id, path_edges, visited = heapq.heappop(pq)
 
-        if len(path_edges) > max_hops:
+def _hop_constrained_tree(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    src: int,
+    max_hops: int,
+    targets: Optional[Set[int]] = None,
+    stats: Optional[SearchStats] = None,
+) -> Tuple[Dict[int, int], Dict[int, float], Dict[int, Tuple[int, int]]]:
+    """
+    Hop-constrained shortest-path tree from src. Returns (node -> state of its
+    best label, state costs, back pointers). Stops early once every node in
+    `targets` is settled.
+    """
+    offsets, targets_arr = cg.offsets, cg.targets
+    n = cg.n_nodes
+    remaining = set(targets) if targets is not None else None
+
+    pq: List[Tuple[float, int, int]] = [(0.0, 0, src)]
+    best_cost: Dict[int, float] = {src: 0.0}
+    backptr: Dict[int, Tuple[int, int]] = {}
+    # First settle of a node is its best label; later settles only need to be
+    # expanded when they use fewer hops (see _hop_constrained_dijkstra).
+    best_state: Dict[int, int] = {}
+    settled_hops: Dict[int, int] = {}
+    popped = stale = relaxed = peak = pruned = 0
+
+    while pq:
+        if len(pq) > peak:
+            peak = len(pq)
+        cost, hops, u = heapq.heappop(pq)
+        popped += 1
+        state = hops * n + u
+        if cost > best_cost[state] or settled_hops.get(u, max_hops + 1) <= hops:
+            stale += 1
             continue
+        settled_hops[u] = hops
+
+        if u not in best_state:
+            best_state[u] = state
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
 
-        if node_id == target:
-            results.append(PathResult(total_cost = cost, steps = [PathStep(e) for e in path_edges]))
+        nhops = hops + 1
+        if nhops > max_hops:
+            pruned += 1
             continue
+        base = nhops * n
+        start, end = offsets[u], offsets[u + 1]
+        relaxed += end - start
+        for pos in range(start, end):
+            v = targets_arr[pos]
+            ncost = cost + costs[pos]
+            nstate = base + v
+            if ncost < best_cost.get(nstate, math.inf):
+                best_cost[nstate] = ncost
+                backptr[nstate] = (state, pos)
+                heapq.heappush(pq, (ncost, nhops, v))
 
-        for e in graph.outgoing(node_id):
-            if e.object in visited:
-                continue  # prevent cycles
-            ncost = cost + edge_cost(e, predicate_penalty = predicate_penalty)
-            heapq.heappush(pq, (ncost, e.object, path_edges + [e], visited + (e.object,)))
+    if stats is not None:
+        stats.record(popped, stale, relaxed, peak, pruned)
+    return best_state, best_cost, backptr
 
-    return results
 
+def _bidirectional_dijkstra(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    src: int,
+    dst: int,
+    max_hops: int,
+    banned_nodes: Optional[Set[int]] = None,
+    banned_edges: Optional[Set[int]] = None,
+    stats: Optional[SearchStats] = None,
+) -> Optional[Tuple[float, Tuple[int, ...]]]:
+    """
+    Hop-constrained Dijkstra run from both endpoints, avoiding the banned
+    nodes/edge positions.
+
+    Forward states are (node, hops from src); backward states are (node, hops
+    to dst). A forward label (v, h) and a backward label (v, r) join into a path
+    when h + r <= max_hops. The search stops once the two queue minima together
+    cannot beat the best joined path.
+    """
+    if max_hops < 0:
+        return None
+    offsets, targets = cg.offsets, cg.targets
+    in_offsets, in_sources, in_positions = cg.reverse()
+    n = cg.n_nodes
+    banned_nodes = banned_nodes or set()
+    banned_edges = banned_edges or set()
+
+    fwd_cost: Dict[int, float] = {src: 0.0}
+    bwd_cost: Dict[int, float] = {dst: 0.0}
+    fwd_back: Dict[int, Tuple[int, int]] = {}
+    bwd_next: Dict[int, Tuple[int, int]] = {}
+    # Hop counts with a label, per node, for joining the two frontiers.
+    fwd_hops: Dict[int, Set[int]] = {src: {0}}
+    bwd_hops: Dict[int, Set[int]] = {dst: {0}}
+    fwd_settled: Dict[int, int] = {}
+    bwd_settled: Dict[int, int] = {}
+    fwd_pq: List[Tuple[float, int, int]] = [(0.0, 0, src)]
+    bwd_pq: List[Tuple[float, int, int]] = [(0.0, 0, dst)]
+
+    best = math.inf
+    meet: Optional[Tuple[int, int]] = None  # (forward state, backward state)
+
+    def join(v: int, h: int, g: float, other_hops: Dict[int, Set[int]], other_cost: Dict[int, float], forward: bool) -> None:
+        nonlocal best, meet
+        for r in other_hops.get(v, ()):
+            if h + r <= max_hops:
+                total = g + other_cost[r * n + v]
+                if total < best:
+                    best = total
+                    meet = (h * n + v, r * n + v) if forward else (r * n + v, h * n + v)
+
+    join(src, 0, 0.0, bwd_hops, bwd_cost, True)
+    popped = stale = relaxed = peak = pruned = 0
+
+    while fwd_pq and bwd_pq and fwd_pq[0][0] + bwd_pq[0][0] < best:
+        if len(fwd_pq) + len(bwd_pq) > peak:
+            peak = len(fwd_pq) + len(bwd_pq)
+        forward = fwd_pq[0][0] <= bwd_pq[0][0]
+        if forward:
+            pq, cost_of, settled, hops_of, link = fwd_pq, fwd_cost, fwd_settled, fwd_hops, fwd_back
+            other_hops, other_cost = bwd_hops, bwd_cost
+        else:
+            pq, cost_of, settled, hops_of, link = bwd_pq, bwd_cost, bwd_settled, bwd_hops, bwd_next
+            other_hops, other_cost = fwd_hops, fwd_cost
+
+        cost, hops, u = heapq.heappop(pq)
+        popped += 1
+        state = hops * n + u
+        if cost > cost_of[state] or settled.get(u, max_hops + 1) <= hops:
+            stale += 1
+            continue  # stale or dominated
+        settled[u] = hops
+
+        nhops = hops + 1
+        if nhops > max_hops:
+            pruned += 1
+            continue
+        base = nhops * n
+        if forward:
+            relaxed += offsets[u + 1] - offsets[u]
+            neighbours = ((targets[pos], pos) for pos in range(offsets[u], offsets[u + 1]))
+        else:
+            relaxed += in_offsets[u + 1] - in_offsets[u]
+            neighbours = ((in_sources[i], in_positions[i]) for i in range(in_offsets[u], in_offsets[u + 1]))
+
+        for v, pos in neighbours:
+            if v in banned_nodes or pos in banned_edges:
+                continue
+            ncost = cost + costs[pos]
+            nstate = base + v
+            if ncost < cost_of.get(nstate, math.inf):
+                cost_of[nstate] = ncost
+                link[nstate] = (state, pos)
+                hops_of.setdefault(v, set()).add(nhops)
+                heapq.heappush(pq, (ncost, nhops, v))
+                join(v, nhops, ncost, other_hops, other_cost, forward)
+
+    if stats is not None:
+        stats.record(popped, stale, relaxed, peak, pruned)
+    if meet is None:
+        return None
+    positions = list(_backtrack(fwd_back, meet[0]))
+    state = meet[1]
+    while state in bwd_next:
+        state, pos = bwd_next[state]
+        positions.append(pos)
+    return best, tuple(positions)
 
-def _reconstruct_path(
-    backptr: Dict[Tuple[str, int], Tuple[Tuple[str, int], Edge]],
-    end_state: Tuple[str, int],
+
+def _hop_bound_heuristic(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    table: Dict[str, float],
+    dst: int,
+    max_hops: int,
+) -> Heuristic:
+    """
+    Admissible A* bound: (cheapest edge cost) * (fewest hops from node to dst).
+    The hop distances (reverse BFS from dst, up to max_hops) also prune states
+    that cannot reach dst within the remaining hop budget.
+    """
+    min_cost = cg.memo(("min_cost", penalty_key(table)), lambda: min(costs, default = 0.0))
+    in_offsets, in_sources, _ = cg.reverse()
+
+    hops_to_dst: Dict[int, int] = {dst: 0}
+    queue = deque([dst])
+    while queue:
+        v = queue.popleft()
+        d = hops_to_dst[v] + 1
+        if d > max_hops:
+            continue
+        for i in range(in_offsets[v], in_offsets[v + 1]):
+            u = in_sources[i]
+            if u not in hops_to_dst:
+                hops_to_dst[u] = d
+                queue.append(u)
+
+    def heuristic(v: int, hops: int) -> float:
+        d = hops_to_dst.get(v)
+        if d is None or hops + d > max_hops:
+            return math.inf
+        return min_cost * d
+
+    return heuristic
+
+
+@dataclass(frozen=True)
+class Landmarks:
+    """
+    Precomputed landmark distances for ALT (A*, landmarks, triangle inequality).
+
+    `from_landmark[i][v]` is the unconstrained lowest cost from landmark i to v
+    and `to_landmark[i][v]` the cost from v to landmark i (inf if unreachable).
+    Ignoring max_hops only loosens the bound, so it stays admissible.
+    """
+    nodes: Tuple[int, ...]
+    from_landmark: Tuple[Sequence[float], ...]
+    to_landmark: Tuple[Sequence[float], ...]
+
+    def heuristic(self, dst: int) -> Heuristic:
+        bounds = [
+            (fwd[dst], fwd, bwd[dst], bwd)
+            for fwd, bwd in zip(self.from_landmark, self.to_landmark)
+        ]
+        memo: Dict[int, float] = {}
+
+        def heuristic(v: int, hops: int) -> float:
+            h = memo.get(v)
+            if h is None:
+                h = 0.0
+                for l_to_dst, fwd, dst_to_l, bwd in bounds:
+                    # d(v, dst) >= d(L, dst) - d(L, v)
+                    if fwd[v] != math.inf:
+                        h = max(h, l_to_dst - fwd[v])
+                    # d(v, dst) >= d(v, L) - d(dst, L)
+                    if dst_to_l != math.inf:
+                        h = max(h, bwd[v] - dst_to_l)
+                memo[v] = h
+            return h
+
+        return heuristic
+
+
+def build_landmarks(
+    graph: GraphLike,
+    n_landmarks: int = 4,
+    predicate_penalty: Optional[Dict[str, float]] = None,
+) -> Landmarks:
+    """
+    Pick landmarks by farthest-point selection (starting from the highest
+    out-degree node) and record forward/backward distances for each.
+    """
+    cg = as_compiled(graph)
+    costs = cg.costs(predicate_penalty or DEFAULT_PREDICATE_PENALTY)
+    offsets = cg.offsets
+    in_offsets, in_sources, in_positions = cg.reverse()
+    n = cg.n_nodes
+
+    nodes: List[int] = []
+    from_landmark: List[Sequence[float]] = []
+    to_landmark: List[Sequence[float]] = []
+    if n == 0:
+        return Landmarks(nodes = (), from_landmark = (), to_landmark = ())
+
+    nearest = [math.inf] * n
+    candidate = max(range(n), key = lambda i: offsets[i + 1] - offsets[i])
+    for _ in range(min(n_landmarks, n)):
+        nodes.append(candidate)
+        fwd = _single_source_costs(n, candidate, lambda u: (
+            (cg.targets[pos], costs[pos]) for pos in range(offsets[u], offsets[u + 1])
+        ))
+        bwd = _single_source_costs(n, candidate, lambda u: (
+            (in_sources[i], costs[in_positions[i]]) for i in range(in_offsets[u], in_offsets[u + 1])
+        ))
+        from_landmark.append(fwd)
+        to_landmark.append(bwd)
+
+        # Next landmark: the node farthest from all chosen ones (finite distances only).
+        best_score, candidate = -1.0, -1
+        for v in range(n):
+            d = min(fwd[v], bwd[v])
+            if d < nearest[v]:
+                nearest[v] = d
+            if nearest[v] != math.inf and nearest[v] > best_score and v not in nodes:
+                best_score, candidate = nearest[v], v
+        if candidate < 0:
+            break
+
+    return Landmarks(nodes = tuple(nodes), from_landmark = tuple(from_landmark), to_landmark = tuple(to_landmark))
+
+
+def _single_source_costs(
+    n: int,
+    src: int,
+    neighbours: Callable[[int], Iterable[Tuple[int, float]]],
+) -> List[float]:
+    dist = [math.inf] * n
+    dist[src] = 0.0
+    pq: List[Tuple[float, int]] = [(0.0, src)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for v, c in neighbours(u):
+            nd = d + c
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def _endpoints(cg: CompiledGraph, source: str, target: str) -> Tuple[int, int]:
+    src = cg.index.get(source)
+    if src is None:
+        raise ValueError(f"Source node not found: {source}")
+    dst = cg.index.get(target)
+    if dst is None:
+        raise ValueError(f"Target node not found: {target}")
+    return src, dst
+
+
+def _path_result(
+    cg: CompiledGraph,
+    positions: Tuple[int, ...],
     total_cost: float,
+    costs: Sequence[float],
+    predicate_penalty: Dict[str, float],
 ) -> PathResult:
-    steps: List[Edge] = []
+    edges, codes = cg.edges, cg.predicate_codes
+    pen = cg.penalties(predicate_penalty)
+    steps = [PathStep(edges[pos], cost = costs[pos], penalty = pen[codes[pos]]) for pos in positions]
+    return PathResult(total_cost = total_cost, steps = steps)
+
+
+def _index_lookup(
+    distances: DistanceIndex,
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    table: Dict[str, float],
+    src: int,
+    dst: int,
+    max_hops: int,
+    constraints: Optional[PathConstraints],
+) -> Optional[Tuple[int, ...]]:
+    # None: no path within max_hops. Otherwise the best path's edge positions
+    # when the index knows them, () when a search is needed. Constraints only
+    # remove paths, so the index still rejects for them but never answers.
+    covered = distances.covers(cg, table)
+    if not distances.query_index(src, dst, max_hops).reachable:
+        return None
+    if not covered or (constraints is not None and not constraints.is_empty()):
+        return ()
+    return distances.trace(cg, costs, src, dst, max_hops) or ()
+
+
+def _path_cost(costs: Sequence[float], positions: Tuple[int, ...]) -> float:
+    # Summed in path order, as the searches accumulate it.
+    cost = 0.0
+    for pos in positions:
+        cost += costs[pos]
+    return cost
+
+
+def _backtrack(backptr: Dict[int, Tuple[int, int]], end_state: int) -> Tuple[int, ...]:
+    positions: List[int] = []
     state = end_state
 
     while state in backptr:
-        prev_state, edge = backptr[state]
-        steps.append(edge)
+        prev_state, pos = backptr[state]
+        positions.append(pos)
         state = prev_state
 
-    steps.reverse()
-    return PathResult(total_cost = total_cost, steps = [PathStep(e) for e in steps])
+    positions.reverse()
+    return tuple(positions)
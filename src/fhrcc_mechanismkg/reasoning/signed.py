@@ -0,0 +1,323 @@
+from __future__ import annotations
+import heapq
+import math
+from typing import Dict, FrozenSet, List, Mapping, Optional, Sequence, Set, Tuple
+from ..compiled import CompiledGraph, penalty_key
+from ..schema import Edge
+from .constraints import PathConstraints
+from .path_search import (
+    DEFAULT_PREDICATE_PENALTY,
+    GraphLike,
+    Heuristic,
+    PathResult,
+    _backtrack,
+    _endpoints,
+    _hop_bound_heuristic,
+    _is_simple,
+    _path_result,
+    as_compiled,
+)
+from .stats import SearchStats, instrumented, timed
+
+
+# Sign of an edge's influence when it has no polarity: +1 when more subject
+# means more object, -1 when it means less. Predicates that do not state a
+# direction (modifies, binds, ...) are read as positive coupling; pass a
+# table with other values to `signed_shortest_paths` to change that.
+DEFAULT_PREDICATE_SIGN: Dict[str, int] = {
+    "causes": 1,
+    "enables": 1,
+    "increases": 1,
+    "activates": 1,
+    "stabilizes": 1,
+    "converts_to": 1,
+    "accumulates": 1,
+    "modifies": 1,
+    "binds": 1,
+    "translocates_to": 1,
+    "associates_with": 1,
+    "prevents": -1,
+    "decreases": -1,
+    "inhibits": -1,
+    "destabilizes": -1,
+    "inhibits_activity_of": -1,
+}
+
+# An explicit polarity overrides the predicate; "0" (no effect) edges carry
+# no signed influence and are not followed by signed searches.
+POLARITY_SIGN: Dict[str, int] = {"+": 1, "-": -1, "0": 0}
+
+SIGNS = ("+", "-")
+
+
+def edge_sign(edge: Edge, predicate_sign: Optional[Mapping[str, int]] = None) -> int:
+    """+1, -1 or 0 (no effect) for one edge (see DEFAULT_PREDICATE_SIGN)."""
+    if edge.polarity is not None:
+        return POLARITY_SIGN[edge.polarity]
+    return (predicate_sign or DEFAULT_PREDICATE_SIGN).get(edge.predicate, 1)
+
+
+def path_sign(path: PathResult, predicate_sign: Optional[Mapping[str, int]] = None) -> str:
+    """Net sign of a path: "+", "-", or "0" when an edge has no effect."""
+    sign = 1
+    for step in path.steps:
+        sign *= edge_sign(step.edge, predicate_sign)
+    return "+" if sign > 0 else "-" if sign < 0 else "0"
+
+
+class EdgeSigns(Sequence[int]):
+    """
+    Per-edge signs of a snapshot (CSR order), resolved the first time a search
+    reaches an edge and kept for later searches (see `edge_signs`), so mapped
+    graphs only materialize the edges that searches touch.
+    """
+
+    def __init__(self, cg: CompiledGraph, predicate_sign: Mapping[str, int]) -> None:
+        self._edges = cg.edges
+        self._codes = cg.predicate_codes
+        self._by_code = [int(predicate_sign.get(p, 1)) for p in cg.predicate_names]
+        # Per edge position: 0 = not resolved yet, otherwise sign + 2.
+        self._resolved = bytearray(cg.n_edges)
+
+    def __len__(self) -> int:
+        return len(self._resolved)
+
+    def __getitem__(self, pos):  # type: ignore[no-untyped-def, override]
+        s = self._resolved[pos]
+        if not s:
+            polarity = self._edges[pos].polarity
+            sign = POLARITY_SIGN[polarity] if polarity is not None else self._by_code[self._codes[pos]]
+            s = self._resolved[pos] = sign + 2
+        return s - 2
+
+
+def edge_signs(cg: CompiledGraph, predicate_sign: Optional[Mapping[str, int]] = None) -> EdgeSigns:
+    """The snapshot's EdgeSigns for a sign table (cached per table contents)."""
+    table = predicate_sign or DEFAULT_PREDICATE_SIGN
+    return cg.memo(("edge_signs", penalty_key(table)), lambda: EdgeSigns(cg, table))
+
+
+@instrumented("signed_paths")
+def signed_shortest_paths(
+    graph: GraphLike,
+    source: str,
+    target: str,
+    max_hops: int = 6,
+    predicate_penalty: Optional[Dict[str, float]] = None,
+    predicate_sign: Optional[Mapping[str, int]] = None,
+    constraints: Optional[PathConstraints] = None,
+    stats: Optional[SearchStats] = None,
+) -> Dict[str, PathResult]:
+    """
+    Best path from `source` to `target` for each net sign of influence:
+    {"+": path, "-": path}, leaving out a sign no path within max_hops has.
+    "+" means more source activity leads to more target activity along the
+    path, "-" to less (a loss-of-function source flips the reading).
+
+    A path's sign is the product of its edge signs (edge_sign). The search
+    runs over (sign, hops, node) labels, so it explores at most twice the
+    states of shortest_path_explainable, and stops once the target is
+    settled with both signs; the A* hop bound of the "astar" strategy
+    guides it. Its best route of a sign may be a walk that goes round a
+    sign-flipping feedback loop; for such a sign an exact simple-path search
+    (_signed_simple_paths) runs instead. `constraints` filter edges as in
+    shortest_path_explainable (no waypoints).
+    """
+    with timed(stats, "compile"):
+        cg = as_compiled(graph)
+    src, dst = _endpoints(cg, source, target)
+    if source == target:
+        return {"+": PathResult(total_cost = 0.0, steps = [])}
+    if constraints is not None and constraints.waypoints:
+        raise ValueError("Signed search does not take waypoints")
+
+    table = predicate_penalty or DEFAULT_PREDICATE_PENALTY
+    with timed(stats, "costs"):
+        base_costs = costs = cg.costs(table)
+        if constraints is not None:
+            costs = constraints.costs(cg, base_costs, exempt = (src, dst))
+        signs = edge_signs(cg, predicate_sign)
+    with timed(stats, "heuristic"):
+        heuristic = _hop_bound_heuristic(cg, base_costs, table, dst, max_hops)
+    with timed(stats, "search"):
+        found = _signed_dijkstra(cg, costs, signs, src, dst, max_hops, heuristic, stats = stats)
+    # A simple best walk is also the best simple path of its sign.
+    loops = {p for p, (_, positions) in found.items() if not _is_simple(cg, src, positions)}
+    if loops:
+        with timed(stats, "simple_path_search"):
+            simple = _signed_simple_paths(cg, costs, signs, src, dst, max_hops, loops, heuristic, stats = stats)
+        for p in loops:
+            if p in simple:
+                found[p] = simple[p]
+            else:
+                del found[p]
+    with timed(stats, "paths"):
+        return {SIGNS[p]: _path_result(cg, positions, cost, costs, table) for p, (cost, positions) in sorted(found.items())}
+
+
+def _signed_dijkstra(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    signs: Sequence[int],
+    src: int,
+    dst: int,
+    max_hops: int,
+    heuristic: Optional[Heuristic] = None,
+    stats: Optional[SearchStats] = None,
+) -> Dict[int, Tuple[float, Tuple[int, ...]]]:
+    """
+    Lowest-cost walks from src to dst within max_hops, per net sign
+    (0 = "+", 1 = "-"): {sign: (cost, edge positions)}.
+
+    Labels are (sign, hops, node) with the hop dominance rule of
+    _hop_constrained_dijkstra per (sign, node), ordered by cost plus the
+    (consistent) `heuristic` when given. The walks do not pass through dst,
+    but may repeat other nodes.
+    """
+    found: Dict[int, Tuple[float, Tuple[int, ...]]] = {}
+    if max_hops < 0:
+        return found
+    offsets, targets = cg.offsets, cg.targets
+    n = cg.n_nodes
+    layer = (max_hops + 1) * n
+
+    # States are (sign, hops, node) encoded as sign * layer + hops * n + node.
+    pq: List[Tuple[float, int, int, int]] = [(0.0, 0, 0, src)]
+    best_cost: Dict[int, float] = {src: 0.0}
+    backptr: Dict[int, Tuple[int, int]] = {}
+    settled_hops: Dict[int, int] = {}  # keyed by sign * n + node
+    popped = stale = relaxed = peak = pruned = 0
+
+    try:
+        while pq:
+            if len(pq) > peak:
+                peak = len(pq)
+            _, hops, p, u = heapq.heappop(pq)
+            popped += 1
+            state = p * layer + hops * n + u
+            cost = best_cost[state]
+            if u == dst:
+                if p not in found:
+                    found[p] = (cost, _backtrack(backptr, state))
+                    if len(found) == 2:
+                        break
+                continue
+
+            key = p * n + u
+            if settled_hops.get(key, max_hops + 1) <= hops:
+                stale += 1
+                continue
+            settled_hops[key] = hops
+
+            nhops = hops + 1
+            if nhops > max_hops:
+                pruned += 1
+                continue
+
+            start, end = offsets[u], offsets[u + 1]
+            relaxed += end - start
+            for pos in range(start, end):
+                v = targets[pos]
+                sign = signs[pos]
+                if not sign:
+                    continue
+                q = p ^ (sign < 0)
+                ncost = cost + costs[pos]
+                nstate = q * layer + nhops * n + v
+                if ncost < best_cost.get(nstate, math.inf):
+                    priority = ncost
+                    if heuristic is not None:
+                        priority += heuristic(v, nhops)
+                        if priority == math.inf:
+                            continue
+                    best_cost[nstate] = ncost
+                    backptr[nstate] = (state, pos)
+                    heapq.heappush(pq, (priority, nhops, q, v))
+
+        return found
+    finally:
+        if stats is not None:
+            stats.record(popped, stale, relaxed, peak, pruned)
+
+
+def _signed_simple_paths(
+    cg: CompiledGraph,
+    costs: Sequence[float],
+    signs: Sequence[int],
+    src: int,
+    dst: int,
+    max_hops: int,
+    wanted: Set[int],
+    heuristic: Optional[Heuristic] = None,
+    stats: Optional[SearchStats] = None,
+) -> Dict[int, Tuple[float, Tuple[int, ...]]]:
+    """
+    Lowest-cost simple paths from src to dst within max_hops for the signs in
+    `wanted` (as _signed_dijkstra).
+
+    Best simple paths of a given parity cannot be found by per-node
+    dominance (the problem is NP-hard in general), so each label carries the
+    nodes of its path and is dropped only when an earlier, no costlier label
+    at the same (sign, node) used no more hops and a subset of its nodes.
+    This is exact; the work grows with the number of distinct routes into
+    each node, which max_hops bounds. `heuristic` orders labels as in
+    _signed_dijkstra.
+    """
+    found: Dict[int, Tuple[float, Tuple[int, ...]]] = {}
+    offsets, targets = cg.offsets, cg.targets
+    n = cg.n_nodes
+    # Label i: (parent label, edge position) for backtracking.
+    parents: List[Tuple[int, int]] = [(-1, -1)]
+    # Items: (cost + heuristic, hops, sign, node, label, path nodes, cost)
+    pq: List[Tuple[float, int, int, int, int, FrozenSet[int], float]] = [(0.0, 0, 0, src, 0, frozenset((src,)), 0.0)]
+    settled: Dict[int, List[Tuple[int, FrozenSet[int]]]] = {}  # keyed by sign * n + node
+    popped = stale = relaxed = peak = pruned = 0
+
+    try:
+        while pq:
+            if len(pq) > peak:
+                peak = len(pq)
+            _, hops, p, u, label, nodes, cost = heapq.heappop(pq)
+            popped += 1
+            if u == dst:
+                if p in wanted and p not in found:
+                    positions = []
+                    while label:
+                        label, pos = parents[label]
+                        positions.append(pos)
+                    found[p] = (cost, tuple(reversed(positions)))
+                    if len(found) == len(wanted):
+                        break
+                continue
+
+            key = p * n + u
+            earlier = settled.setdefault(key, [])
+            if any(h <= hops and other <= nodes for h, other in earlier):
+                stale += 1
+                continue
+            earlier.append((hops, nodes))
+
+            nhops = hops + 1
+            if nhops > max_hops:
+                pruned += 1
+                continue
+
+            start, end = offsets[u], offsets[u + 1]
+            relaxed += end - start
+            for pos in range(start, end):
+                v = targets[pos]
+                sign = signs[pos]
+                if v in nodes or not sign:
+                    continue
+                ncost = priority = cost + costs[pos]
+                if heuristic is not None:
+                    priority += heuristic(v, nhops)
+                if priority == math.inf:
+                    continue
+                parents.append((label, pos))
+                heapq.heappush(pq, (priority, nhops, p ^ (sign < 0), v, len(parents) - 1, nodes | {v}, ncost))
+
+        return found
+    finally:
+        if stats is not None:
+            stats.record(popped, stale, relaxed, peak, pruned)
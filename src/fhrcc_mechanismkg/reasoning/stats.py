@@ -0,0 +1,109 @@
+from __future__ import annotations
+import contextlib
+import functools
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound = Callable[..., Any])
+
+
+@dataclass
+class SearchStats:
+    """
+    Work done by one path query (summed over every search it ran, e.g. the
+    spur searches of k-shortest paths).
+    """
+    searches: int = 0  # Dijkstra runs (bidirectional runs count once)
+    nodes_popped: int = 0  # (node, hops) labels taken off the queue
+    stale_pops: int = 0  # popped labels skipped as stale or hop-dominated
+    edges_relaxed: int = 0  # outgoing (or incoming, backward) edges scanned from expanded labels
+    peak_heap: int = 0  # largest queue size seen by any single search
+    pruned_by_max_hops: int = 0  # settled labels not expanded because the hop budget was used up
+    phases: Dict[str, float] = field(default_factory = dict)  # wall seconds per phase
+
+    def record(self, popped: int, stale: int, relaxed: int, peak: int, pruned: int) -> None:
+        """Add one search run's counters."""
+        self.searches += 1
+        self.nodes_popped += popped
+        self.stale_pops += stale
+        self.edges_relaxed += relaxed
+        self.peak_heap = max(self.peak_heap, peak)
+        self.pruned_by_max_hops += pruned
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_text(self) -> str:
+        lines = [
+            f"searches: {self.searches}",
+            f"nodes popped: {self.nodes_popped} ({self.stale_pops} stale/dominated)",
+            f"edges relaxed: {self.edges_relaxed}",
+            f"peak heap: {self.peak_heap}",
+            f"pruned by max_hops: {self.pruned_by_max_hops}",
+        ]
+        for name, seconds in self.phases.items():
+            lines.append(f"time {name}: {seconds * 1000:.3f} ms")
+        return "\n".join(lines)
+
+
+# Hook signature: (query kind, e.g. "shortest_path" / "k_shortest", stats) -> None
+SearchHook = Callable[[str, SearchStats], None]
+
+_HOOKS: List[SearchHook] = []
+
+
+def add_search_hook(hook: SearchHook) -> Callable[[], None]:
+    """
+    Call `hook` after every instrumented query (also when it raises, e.g. no
+    path found). Returns a function that removes the hook.
+
+    While a hook is installed, every query collects statistics; with no hooks
+    and no `stats` argument the searches skip the bookkeeping.
+    """
+    _HOOKS.append(hook)
+
+    def remove() -> None:
+        if hook in _HOOKS:
+            _HOOKS.remove(hook)
+
+    return remove
+
+
+def instrumented(kind: str) -> Callable[[F], F]:
+    """
+    Decorator for query functions taking a `stats: Optional[SearchStats]`
+    keyword: supplies a SearchStats when hooks are installed and reports it to
+    them once the query finishes.
+    """
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            stats = kwargs.get("stats")
+            if stats is None and _HOOKS:
+                stats = kwargs["stats"] = SearchStats()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if stats is not None:
+                    for hook in list(_HOOKS):
+                        hook(kind, stats)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+def timed(stats: Optional[SearchStats], name: str) -> ContextManager[None]:
+    """`stats.phase(name)`, or a no-op when not collecting."""
+    return stats.phase(name) if stats is not None else contextlib.nullcontext()
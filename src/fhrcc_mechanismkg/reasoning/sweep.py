@@ -0,0 +1,233 @@
+from __future__ import annotations
+import itertools
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from ..compiled import CompiledGraph
+from ..io import load_graph
+from ..mapped import MappedGraph
+from . import batch
+from .batch import Pair, _init_worker
+from .path_search import (
+    DEFAULT_PREDICATE_PENALTY,
+    GraphLike,
+    PathResult,
+    as_compiled,
+    k_shortest_paths_explainable,
+    shortest_paths_from,
+)
+
+PenaltyTable = Dict[str, float]
+
+# One search: (source, [(query index, target)], penalty table); answers are
+# (query index, paths, error) triples.
+Task = Tuple[str, List[Tuple[int, str]], PenaltyTable]
+Answer = Tuple[int, List[PathResult], Optional[str]]
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    index: int  # position of the query in the input
+    config: int  # position of the penalty table in the grid
+    source: str
+    target: str
+    paths: List[PathResult]
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SweepShift:
+    """How one query's answer under `config` differs from the baseline table."""
+
+    index: int
+    config: int
+    source: str
+    target: str
+    top_changed: bool  # best path differs from the baseline's
+    cost_delta: Optional[float]  # best cost minus baseline best cost (None if either has no path)
+    moved: int  # baseline paths at another rank (or gone) under this table
+
+
+@dataclass
+class SweepReport:
+    grid: List[PenaltyTable]
+    queries: List[Pair]
+    results: List[SweepResult]  # ordered by (query, config)
+    searches: int  # searches actually run (a naive sweep runs len(grid) * len(queries))
+
+    def result(self, index: int, config: int) -> SweepResult:
+        return self.results[index * len(self.grid) + config]
+
+    def shifts(self, baseline: int = 0) -> List[SweepShift]:
+        """Ranking and cost changes of every (query, config) against grid[baseline]."""
+        out: List[SweepShift] = []
+        n = len(self.grid)
+        for i in range(len(self.queries)):
+            base = self.results[i * n + baseline]
+            base_ids = [tuple(p.node_ids()) for p in base.paths]
+            for c in range(n):
+                r = self.results[i * n + c]
+                ids = [tuple(p.node_ids()) for p in r.paths]
+                cost_delta = None
+                if r.paths and base.paths:
+                    cost_delta = r.paths[0].total_cost - base.paths[0].total_cost
+                moved = sum(1 for rank, p in enumerate(base_ids) if rank >= len(ids) or ids[rank] != p)
+                top_changed = (ids[:1] != base_ids[:1])
+                out.append(SweepShift(i, c, r.source, r.target, top_changed, cost_delta, moved))
+        return out
+
+
+def expand_penalty_grid(
+    base: Optional[Mapping[str, float]] = None,
+    vary: Optional[Mapping[str, Sequence[float]]] = None,
+) -> List[PenaltyTable]:
+    """
+    Cartesian grid of penalty tables: every combination of the `vary` values,
+    applied on top of `base` (DEFAULT_PREDICATE_PENALTY if None).
+    """
+    base = dict(base if base is not None else DEFAULT_PREDICATE_PENALTY)
+    vary = vary or {}
+    predicates = list(vary)
+    grid: List[PenaltyTable] = []
+    for values in itertools.product(*(vary[p] for p in predicates)):
+        table = dict(base)
+        table.update({p: float(v) for p, v in zip(predicates, values)})
+        grid.append(table)
+    return grid
+
+
+def sensitivity_sweep(
+    graph: Union[GraphLike, MappedGraph, str],
+    queries: Iterable[Pair],
+    penalty_grid: Sequence[Mapping[str, float]],
+    k: int = 1,
+    max_hops: int = 6,
+    workers: Optional[int] = None,
+) -> SweepReport:
+    """
+    Top-k explainable paths for every (query, penalty table) combination.
+
+    Work is shared wherever the answer cannot change. A search from `source`
+    only ever touches edges that start within max_hops - 1 hops of it, so two
+    tables that agree on the predicates of those edges give identical
+    results; each source is searched once per distinct restriction of the grid
+    to its reachable predicates, and the answer is reused for every table in
+    that class. With k = 1 all targets of a source are answered by a single
+    shortest-path tree per class.
+
+    The remaining searches are spread across a process pool set up like
+    batch_explain (`workers=None` uses every core; `workers <= 1` runs in
+    this process). Results come back ordered by (query, config); use
+    `SweepReport.shifts` to compare each table against a baseline.
+    """
+    grid = [dict(t) for t in penalty_grid]
+    pairs = list(queries)
+    g = load_graph(graph, mmap = True) if isinstance(graph, str) else graph
+    cg = as_compiled(g)
+
+    by_source: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    for i, (source, target) in enumerate(pairs):
+        by_source[source].append((i, target))
+
+    answers: Dict[Tuple[int, int], Answer] = {}
+    tasks: List[Task] = []
+    members: List[List[int]] = []  # configs sharing each task's answer
+    for source, targets in by_source.items():
+        if source not in cg.index:
+            for i, _ in targets:
+                for c in range(len(grid)):
+                    answers[(i, c)] = (i, [], f"Source node not found: {source}")
+            continue
+        codes = _reachable_codes(cg, cg.index[source], max_hops)
+        classes: Dict[Tuple[float, ...], List[int]] = {}
+        for c, table in enumerate(grid):
+            pen = cg.penalties(table)
+            classes.setdefault(tuple(pen[code] for code in codes), []).append(c)
+        for configs in classes.values():
+            tasks.append((source, targets, grid[configs[0]]))
+            members.append(configs)
+
+    # Run tasks grouped by table so each worker reuses its cached cost vectors.
+    order = sorted(range(len(tasks)), key = lambda t: members[t][0])
+    for t, task_answers in zip(order, _run_tasks(g, [tasks[t] for t in order], k, max_hops, workers)):
+        for answer in task_answers:
+            for c in members[t]:
+                answers[(answer[0], c)] = answer
+
+    results: List[SweepResult] = []
+    for i, (source, target) in enumerate(pairs):
+        for c in range(len(grid)):
+            _, paths, error = answers[(i, c)]
+            results.append(SweepResult(i, c, source, target, paths, error))
+    return SweepReport(grid = grid, queries = pairs, results = results, searches = len(tasks))
+
+
+def _reachable_codes(cg: CompiledGraph, src: int, max_hops: int) -> List[int]:
+    # Predicate codes of every edge a search from src can relax within max_hops.
+    offsets, targets, codes = cg.offsets, cg.targets, cg.predicate_codes
+    seen = {src}
+    frontier = [src]
+    found = set()
+    for _ in range(max_hops):
+        nxt = []
+        for u in frontier:
+            for pos in range(offsets[u], offsets[u + 1]):
+                found.add(codes[pos])
+                v = targets[pos]
+                if v not in seen:
+                    seen.add(v)
+                    nxt.append(v)
+        if not nxt:
+            break
+        frontier = nxt
+    return sorted(found)
+
+
+def _run_tasks(
+    graph: Union[GraphLike, MappedGraph],
+    tasks: List[Task],
+    k: int,
+    max_hops: int,
+    workers: Optional[int],
+) -> List[List[Answer]]:
+    if (workers is not None and workers <= 1) or len(tasks) <= 1:
+        return [_search(graph, task, k, max_hops) for task in tasks]
+
+    shipped = graph.path if isinstance(graph, MappedGraph) else graph
+    n_workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (4 * n_workers))
+    with ProcessPoolExecutor(max_workers = n_workers, initializer = _init_worker, initargs = (shipped,)) as pool:
+        return list(pool.map(_run_task, tasks, itertools.repeat(k), itertools.repeat(max_hops), chunksize = chunksize))
+
+
+def _run_task(task: Task, k: int, max_hops: int) -> List[Answer]:
+    assert batch._WORKER_GRAPH is not None, "worker graph not initialized"
+    return _search(batch._WORKER_GRAPH, task, k, max_hops)
+
+
+def _search(graph: GraphLike, task: Task, k: int, max_hops: int) -> List[Answer]:
+    source, targets, table = task
+    cg = as_compiled(graph)
+    answers: List[Answer] = []
+    known = [(i, t) for i, t in targets if t in cg.index]
+    for i, t in targets:
+        if t not in cg.index:
+            answers.append((i, [], f"Target node not found: {t}"))
+
+    if k == 1:
+        tree = shortest_paths_from(cg, source, targets = {t for _, t in known}, max_hops = max_hops, predicate_penalty = table)
+        for i, t in known:
+            if t == source:
+                answers.append((i, [PathResult(total_cost = 0.0, steps = [])], None))
+            elif t in tree:
+                answers.append((i, [tree[t]], None))
+            else:
+                answers.append((i, [], None))
+        return answers
+
+    for i, t in known:
+        paths = k_shortest_paths_explainable(cg, source, t, k = k, max_hops = max_hops, predicate_penalty = table)
+        answers.append((i, paths, None))
+    return answers
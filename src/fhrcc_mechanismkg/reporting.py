@@ -1,9 +1,9 @@
 from __future__ import annotations
 from dataclasses import asdict
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from .graph import Graph
 from .schema import Edge
-from .reasoning.path_search import edge_cost, DEFAULT_PREDICATE_PENALTY, PathResult
+from .reasoning.path_search import edge_cost, DEFAULT_PREDICATE_PENALTY, PathResult, PathStep
 
 
 def fmt_node(g: Graph, node_id: str) -> str:
@@ -19,15 +19,22 @@ def fmt_edge_line(
     show_cost: bool = True,
     show_mechanism: bool = False,
     show_notes: bool = False,
+    cost: Optional[float] = None,
+    penalty: Optional[float] = None,
 ) -> str:
+    """
+    One path step as text. `cost` / `penalty` are the values the search used
+    (PathStep.cost / .penalty); they are only recomputed under the default
+    penalty table when not given.
+    """
     subj = fmt_node(g, edge.subject)
     obj = fmt_node(g, edge.object)
 
     parts = [f"{subj} --{edge.predicate}--> {obj}", f"w = {edge.weight:.2f}", f"ev = {edge.evidence_level}"]
 
     if show_cost:
-        total = edge_cost(edge, predicate_penalty=DEFAULT_PREDICATE_PENALTY)
-        pred_pen = DEFAULT_PREDICATE_PENALTY.get(edge.predicate, 1.0)
+        total = cost if cost is not None else edge_cost(edge, predicate_penalty=DEFAULT_PREDICATE_PENALTY)
+        pred_pen = penalty if penalty is not None else DEFAULT_PREDICATE_PENALTY.get(edge.predicate, 1.0)
         parts.append(f"cost = {total:.3f}")
         parts.append(f"pred_pen = {pred_pen:.2f}")
 
@@ -46,6 +53,20 @@ def fmt_edge_line(
     return out
 
 
+def fmt_step_line(
+    g: Graph,
+    step: PathStep,
+    show_cost: bool = True,
+    show_mechanism: bool = False,
+    show_notes: bool = False,
+) -> str:
+    return fmt_edge_line(
+        g, step.edge,
+        show_cost = show_cost, show_mechanism = show_mechanism, show_notes = show_notes,
+        cost = step.cost, penalty = step.penalty,
+    )
+
+
 def path_to_text(
     g: Graph,
     path: PathResult,
@@ -64,7 +85,7 @@ def path_to_text(
     lines.append("")
 
     for i, step in enumerate(path.steps, start=1):
-        lines.append(f"{i}. {fmt_edge_line(g, step.edge, show_cost = show_cost, show_mechanism = show_mechanism, show_notes = show_notes)}")
+        lines.append(f"{i}. {fmt_step_line(g, step, show_cost, show_mechanism, show_notes)}")
 
     return "\n".join(lines)
 
@@ -79,9 +100,60 @@ def paths_to_markdown(
 ) -> str:
     md: List[str] = [f"# {header}", ""]
     for i, p in enumerate(paths, start=1):
-        md.append(f"## Path {i} (cost = {p.total_cost:.3f}, hops = {len(p.steps)})")
-        md.append("")
-        for j, step in enumerate(p.steps, start = 1):
-            md.append(f"{j}. {fmt_edge_line(g, step.edge, show_cost = show_cost, show_mechanism = show_mechanism, show_notes = show_notes)}")
-            md.append("")
+        _path_section(md, g, f"Path {i}", p, show_cost, show_mechanism, show_notes)
+    return "\n".join(md).rstrip() + "\n"
+
+
+def paths_by_target_to_markdown(
+    g: Graph,
+    results: Dict[str, PathResult],
+    header: str,
+    show_cost: bool = True,
+    show_mechanism: bool = False,
+    show_notes: bool = False,
+) -> str:
+    md: List[str] = [f"# {header}", ""]
+    for target, p in results.items():
+        _path_section(md, g, fmt_node(g, target), p, show_cost, show_mechanism, show_notes)
     return "\n".join(md).rstrip() + "\n"
+
+
+def signed_paths_to_markdown(
+    g: Graph,
+    results: Dict[str, PathResult],
+    header: str,
+    show_cost: bool = True,
+    show_mechanism: bool = False,
+    show_notes: bool = False,
+) -> str:
+    # Best path per net sign ("+" / "-"), as returned by signed_shortest_paths.
+    md: List[str] = [f"# {header}", ""]
+    for sign, p in results.items():
+        _path_section(md, g, f"Net {sign}", p, show_cost, show_mechanism, show_notes)
+    return "\n".join(md).rstrip() + "\n"
+
+
+def _path_section(
+    md: List[str],
+    g: Graph,
+    title: str,
+    p: PathResult,
+    show_cost: bool,
+    show_mechanism: bool,
+    show_notes: bool,
+) -> None:
+    # One "## title (cost, hops)" section with a numbered line per step.
+    md.append(f"## {title} (cost = {p.total_cost:.3f}, hops = {len(p.steps)})")
+    md.append("")
+    for j, step in enumerate(p.steps, start = 1):
+        md.append(f"{j}. {fmt_step_line(g, step, show_cost, show_mechanism, show_notes)}")
+        md.append("")
+
+
+def path_to_dict(path: PathResult) -> Dict[str, Any]:
+    return {
+        "total_cost": path.total_cost,
+        "hops": len(path.steps),
+        "node_ids": path.node_ids(),
+        "steps": [asdict(step.edge) for step in path.steps],
+    }
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Literal
+from sys import intern
+from typing import Any, Dict, List, Literal, NoReturn, Optional, Tuple
 
 NodeType = Literal[
     'gene',
@@ -46,7 +47,53 @@ Predicate = Literal[
 ]
 
 
-@dataclass
+class FrozenList(list):
+    """A list that refuses in-place changes; EMPTY_LIST is shared by loaded records with no items."""
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError('Shared empty list is immutable; assign a new list instead')
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable  # type: ignore[assignment]
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable  # type: ignore[assignment]
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(tuple(self))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (FrozenList, (list(self),))
+
+
+class FrozenDict(dict):
+    """A dict that refuses in-place changes; EMPTY_DICT is shared by loaded records with no entries."""
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError('Shared empty dict is immutable; assign a new dict instead')
+
+    __setitem__ = __delitem__ = __ior__ = _immutable  # type: ignore[assignment]
+    update = setdefault = pop = popitem = clear = _immutable  # type: ignore[assignment]
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (FrozenDict, (dict(self),))
+
+
+EMPTY_LIST: List[str] = FrozenList()
+EMPTY_DICT: Dict[str, str] = FrozenDict()
+
+
+# Node and Edge are slotted (no per-instance __dict__). Ids, types,
+# predicates and evidence levels are interned, so the millions of copies a
+# large graph holds share one string object each. Records built by the
+# loaders (the `unchecked` constructors and the record decoders) share
+# EMPTY_LIST and EMPTY_DICT for empty synonyms / xrefs / tags / context /
+# citations; those cannot be changed in place, so assign a new list or dict
+# (or use dataclasses.replace) to add items. Records built directly keep the
+# containers they are given, or fresh ones.
+
+
+@dataclass(slots = True)
 class Node:
     id: str
     type: NodeType
@@ -62,9 +109,33 @@ class Node:
         prefix = self.id.split(':', 1)[0]
         if prefix != self.type:
             raise ValueError(f'Node id prefix {prefix} does not match type {self.type}')
+        self.id = intern(self.id)
+        self.type = intern(self.type)  # type: ignore[assignment]
 
+    @classmethod
+    def unchecked(
+        cls,
+        id: str,
+        type: NodeType,
+        name: str,
+        synonyms: List[str],
+        description: Optional[str],
+        xrefs: Dict[str, str],
+        tags: List[str],
+    ) -> 'Node':
+        """A Node built without __post_init__ checks, for records already known to be valid."""
+        node = cls.__new__(cls)
+        node.id = intern(id)
+        node.type = intern(type)  # type: ignore[assignment]
+        node.name = name
+        node.synonyms = synonyms or EMPTY_LIST
+        node.description = description
+        node.xrefs = xrefs or EMPTY_DICT
+        node.tags = tags or EMPTY_LIST
+        return node
 
-@dataclass
+
+@dataclass(slots = True)
 class Edge:
     subject: str
     predicate: Predicate
@@ -82,3 +153,35 @@ class Edge:
             raise ValueError(f'Edge weight must be between 0.01 and 0.99, got {self.weight}')
         if self.subject == self.object:
             raise ValueError('Self-loop edges are not allowed')
+        self.subject = intern(self.subject)
+        self.predicate = intern(self.predicate)  # type: ignore[assignment]
+        self.object = intern(self.object)
+        self.evidence_level = intern(self.evidence_level)  # type: ignore[assignment]
+
+    @classmethod
+    def unchecked(
+        cls,
+        subject: str,
+        predicate: Predicate,
+        object: str,
+        weight: float,
+        evidence_level: EvidenceLevel,
+        polarity: Optional[Literal['+', '-', '0']],
+        mechanism: Optional[str],
+        context: Dict[str, str],
+        citations: List[str],
+        notes: Optional[str],
+    ) -> 'Edge':
+        """An Edge built without __post_init__ checks, for records already known to be valid."""
+        edge = cls.__new__(cls)
+        edge.subject = intern(subject)
+        edge.predicate = intern(predicate)  # type: ignore[assignment]
+        edge.object = intern(object)
+        edge.weight = weight
+        edge.evidence_level = intern(evidence_level)  # type: ignore[assignment]
+        edge.polarity = polarity
+        edge.mechanism = mechanism
+        edge.context = context or EMPTY_DICT
+        edge.citations = citations or EMPTY_LIST
+        edge.notes = notes
+        return edge
@@ -0,0 +1,396 @@
+from __future__ import annotations
+import os
+import pickle
+import re
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .graph import Change, Graph
+from .schema import Node
+
+INDEX_SUFFIX = ".idx"
+INDEX_FORMAT_VERSION = 2
+
+# Relative weight of a token match by the field it came from.
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 3.0,
+    "id": 2.5,
+    "synonyms": 2.0,
+    "xrefs": 1.5,
+    "description": 1.0,
+}
+
+# Score multiplier by how a query token matched an indexed token.
+MATCH_QUALITY: Dict[str, float] = {
+    "exact": 1.0,
+    "prefix": 0.8,
+    "substring": 0.5,
+    "fuzzy": 0.4,  # divided by the edit distance
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def find_nodes(
+    g: Graph,
+    keyword: Optional[str] = None,
+    node_type: Optional[str] = None,
+    index: Optional[NodeIndex] = None,
+) -> List[Node]:
+    """
+    Nodes whose id, name, synonyms or description contain `keyword` (case-insensitive).
+    With a NodeIndex the candidates come from its n-gram postings instead of a scan.
+    """
+    keyword = keyword.lower() if keyword else None
+    node_type = node_type.lower() if node_type else None
+
+    if index is not None:
+        return [g.nodes[node_id] for node_id in index.substring_matches(keyword, node_type)]
+
+    hits = []
+    for n in g.nodes.values():
+        if node_type is not None and n.type != node_type:
+            continue
+
+        hay = _haystack(n)
+
+        if keyword is None or keyword in hay:
+            hits.append(n)
+
+    hits.sort(key = lambda x: (x.type, x.id))
+    return hits
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    node_id: str
+    node_type: str
+    name: str
+    score: float
+
+
+class NodeIndex:
+    """
+    Inverted index over node id, name, synonyms, description and xrefs.
+
+    - `search()`: ranked token search; each query token may match an indexed
+      token exactly, by prefix, as a substring, or within a small edit distance
+      (typo tolerance); all query tokens must match
+    - `substring_matches()`: the plain `find_nodes` semantics, answered from a
+      trigram index over each node's search text
+
+    Build once with `NodeIndex.build(graph)`; `for_graph_file()` keeps a copy
+    next to the graph file (`<graph>.idx`) and rebuilds it when the graph file
+    changes. `attach(graph)` keeps the index in step with later node changes.
+    Index files are pickled; only load files you trust.
+    """
+
+    def __init__(self) -> None:
+        self.node_ids: List[str] = []
+        self.node_types: List[str] = []
+        self.names: List[str] = []
+        self.haystacks: List[str] = []
+        # distinct tokens of each node (slot), so a node can be unindexed
+        self.node_tokens: List[Tuple[str, ...]] = []
+        # token -> {node slot: best field weight}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        # trigram of a node's haystack -> node slots (ascending)
+        self.hay_grams: Dict[str, array] = {}
+        # Derived from the lists above; rebuilt on build/load rather than persisted.
+        self._slots: Dict[str, int] = {}
+        self._sorted_tokens: List[str] = []
+        self._token_grams: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def build(cls, g: Any) -> "NodeIndex":
+        index = cls()
+        for n in g.nodes.values():
+            index._insert(n)
+        index._prepare()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def attach(self, g: Any) -> Callable[[], None]:
+        """Follow node changes of a Graph (see Graph.subscribe); returns an unsubscribe function."""
+        return g.subscribe(self.on_change)
+
+    def on_change(self, change: Change) -> None:
+        if change.kind != "node":
+            return
+        if change.before is not None:
+            self.remove_node(change.before.id)
+        if change.after is not None:
+            self.add_node(change.after)  # type: ignore[arg-type]
+
+    def add_node(self, n: Node) -> None:
+        if n.id in self._slots:
+            raise ValueError(f"Node already indexed: {n.id}")
+        for token in self._insert(n):
+            if len(self.postings[token]) == 1:  # new to the vocabulary
+                insort(self._sorted_tokens, token)
+                for gram in _padded_trigrams(token):
+                    self._token_grams.setdefault(gram, set()).add(token)
+
+    def remove_node(self, node_id: str) -> None:
+        # The slot stays allocated (slots are positions in the per-node lists) but is emptied.
+        slot = self._slots.pop(node_id)
+        for gram in _trigrams(self.haystacks[slot]):
+            slots = self.hay_grams[gram]
+            slots.remove(slot)
+            if not slots:
+                del self.hay_grams[gram]
+        for token in self.node_tokens[slot]:
+            posting = self.postings[token]
+            del posting[slot]
+            if not posting:
+                del self.postings[token]
+                del self._sorted_tokens[bisect_left(self._sorted_tokens, token)]
+                for gram in _padded_trigrams(token):
+                    grams = self._token_grams[gram]
+                    grams.discard(token)
+                    if not grams:
+                        del self._token_grams[gram]
+        self.node_ids[slot] = None  # type: ignore[call-overload]
+        self.haystacks[slot] = ""
+        self.node_tokens[slot] = ()
+
+    def substring_matches(self, keyword: Optional[str], node_type: Optional[str] = None) -> List[str]:
+        """Ids of nodes whose search text contains `keyword`, sorted by (type, id)."""
+        if not keyword:
+            slots: Iterable[int] = self._slots.values()
+        elif len(keyword) < 3:
+            slots = (i for i, hay in enumerate(self.haystacks) if keyword in hay)
+        else:
+            candidates = self._intersect([self.hay_grams.get(gram) for gram in _trigrams(keyword)])
+            slots = (i for i in candidates if keyword in self.haystacks[i])
+        hits = [i for i in slots if node_type is None or self.node_types[i] == node_type]
+        hits.sort(key = lambda i: (self.node_types[i], self.node_ids[i]))
+        return [self.node_ids[i] for i in hits]
+
+    def search(
+        self,
+        query: str,
+        node_type: Optional[str] = None,
+        limit: Optional[int] = 20,
+        fuzzy: bool = True,
+    ) -> List[SearchHit]:
+        """Ranked matches for `query`, best first (ties broken by type, then id)."""
+        node_type = node_type.lower() if node_type else None
+        scores: Optional[Dict[int, float]] = None
+        for token in dict.fromkeys(tokenize(query)):
+            matched = self._match_token(token, fuzzy)
+            if scores is None:
+                scores = matched
+            else:
+                scores = {i: s + matched[i] for i, s in scores.items() if i in matched}
+            if not scores:
+                return []
+        if not scores:
+            return []
+
+        ranked = sorted(
+            (i for i in scores if node_type is None or self.node_types[i] == node_type),
+            key = lambda i: (-scores[i], self.node_types[i], self.node_ids[i]),  # type: ignore[index]
+        )
+        return [
+            SearchHit(self.node_ids[i], self.node_types[i], self.names[i], round(scores[i], 6))
+            for i in ranked[:limit]
+        ]
+
+    def complete(self, prefix: str, node_type: Optional[str] = None, limit: int = 10) -> List[SearchHit]:
+        """Autocomplete: ranked matches without typo tolerance."""
+        return self.search(prefix, node_type = node_type, limit = limit, fuzzy = False)
+
+    def save(self, path: str, source: Optional[str] = None) -> None:
+        payload = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "source": _file_stamp(source) if source else None,
+            "node_ids": self.node_ids,
+            "node_types": self.node_types,
+            "names": self.names,
+            "haystacks": self.haystacks,
+            "node_tokens": self.node_tokens,
+            "postings": self.postings,
+            "hay_grams": self.hay_grams,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, source: Optional[str] = None) -> Optional["NodeIndex"]:
+        """Load a saved index; None if it is missing, outdated, or `source` has changed since."""
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if payload.get("format_version") != INDEX_FORMAT_VERSION:
+            return None
+        if source is not None and payload.get("source") != _file_stamp(source):
+            return None
+        index = cls()
+        for key in ("node_ids", "node_types", "names", "haystacks", "node_tokens", "postings", "hay_grams"):
+            setattr(index, key, payload[key])
+        index._prepare()
+        return index
+
+    @classmethod
+    def for_graph_file(cls, g: Any, graph_path: str) -> "NodeIndex":
+        """The index saved next to `graph_path`, (re)built and saved if missing or stale."""
+        index_path = graph_path + INDEX_SUFFIX
+        index = cls.load(index_path, source = graph_path)
+        if index is None:
+            index = cls.build(g)
+            try:
+                index.save(index_path, source = graph_path)
+            except OSError:
+                pass  # read-only location: keep the in-memory index
+        return index
+
+    def _match_token(self, token: str, fuzzy: bool) -> Dict[int, float]:
+        # Best score per node for one query token, over every indexed token it matches.
+        out: Dict[int, float] = {}
+
+        def add(indexed: str, quality: float) -> None:
+            for i, weight in self.postings[indexed].items():
+                s = weight * quality
+                if out.get(i, 0.0) < s:
+                    out[i] = s
+
+        if token in self.postings:
+            add(token, MATCH_QUALITY["exact"])
+        tokens = self._sorted_tokens
+        at = bisect_left(tokens, token)
+        while at < len(tokens) and tokens[at].startswith(token):
+            if tokens[at] != token:
+                add(tokens[at], MATCH_QUALITY["prefix"])
+            at += 1
+
+        if len(token) >= 3:
+            grams = self._token_grams
+            for indexed in self._intersect([grams.get(gram) for gram in _trigrams(token)]):
+                if token in indexed and not indexed.startswith(token):
+                    add(indexed, MATCH_QUALITY["substring"])
+
+        if fuzzy and len(token) >= 4:
+            max_edits = 1 if len(token) <= 7 else 2
+            for indexed, dist in self._fuzzy_tokens(token, max_edits):
+                add(indexed, MATCH_QUALITY["fuzzy"] / dist)
+        return out
+
+    def _fuzzy_tokens(self, token: str, max_edits: int) -> List[Tuple[str, int]]:
+        # q-gram filter: an edit destroys at most 3 padded trigrams, an adjacent
+        # transposition (one edit for _edit_distance) at most 4.
+        grams = self._token_grams
+        shared: Dict[str, int] = {}
+        for gram in _padded_trigrams(token):
+            for indexed in grams.get(gram, ()):
+                shared[indexed] = shared.get(indexed, 0) + 1
+        need = len(token) - 4 * max_edits
+        out = []
+        for indexed, count in shared.items():
+            if count < need or abs(len(indexed) - len(token)) > max_edits or indexed == token:
+                continue
+            dist = _edit_distance(token, indexed, max_edits)
+            if dist <= max_edits:
+                out.append((indexed, dist))
+        return out
+
+    def _insert(self, n: Node) -> Set[str]:
+        # Append a slot for `n`; returns its tokens.
+        slot = len(self.node_ids)
+        self._slots[n.id] = slot
+        self.node_ids.append(n.id)
+        self.node_types.append(n.type)
+        self.names.append(n.name)
+        hay = _haystack(n)
+        self.haystacks.append(hay)
+        for gram in _trigrams(hay):
+            self.hay_grams.setdefault(gram, array("i")).append(slot)
+        tokens: Set[str] = set()
+        for field, text in _fields(n):
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                tokens.add(token)
+                posting = self.postings.setdefault(token, {})
+                if posting.get(slot, 0.0) < weight:
+                    posting[slot] = weight
+        self.node_tokens.append(tuple(tokens))
+        return tokens
+
+    def _prepare(self) -> None:
+        self._slots = {node_id: slot for slot, node_id in enumerate(self.node_ids) if node_id is not None}
+        self._sorted_tokens = sorted(self.postings)
+        grams: Dict[str, Set[str]] = {}
+        for token in self.postings:
+            for gram in _padded_trigrams(token):
+                grams.setdefault(gram, set()).add(token)
+        self._token_grams = grams
+
+    @staticmethod
+    def _intersect(postings: List[Any]) -> List[Any]:
+        if not postings or any(p is None for p in postings):
+            return []
+        postings = sorted(postings, key = len)
+        out = set(postings[0])
+        for p in postings[1:]:
+            out.intersection_update(p)
+            if not out:
+                break
+        return sorted(out)
+
+
+def _haystack(n: Node) -> str:
+    return " ".join(
+        [n.id, n.name] + (n.synonyms or []) + ([n.description] if n.description else [])
+    ).lower()
+
+
+def _fields(n: Node) -> Iterable[Tuple[str, str]]:
+    yield "id", n.id
+    yield "name", n.name
+    for s in n.synonyms or []:
+        yield "synonyms", s
+    if n.description:
+        yield "description", n.description
+    for k, v in (n.xrefs or {}).items():
+        yield "xrefs", f"{k} {v}"
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _padded_trigrams(token: str) -> Set[str]:
+    return _trigrams(f"^{token}$")
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count once), capped at limit + 1."""
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _file_stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
@@ -0,0 +1,235 @@
+"""
+Long-lived query service over a resident graph.
+
+GraphService answers `find`, `search`, `complete`, `explain`, `reach`,
+`summarize`, `lint` and `info` requests (plain dicts in, JSON-ready dicts out)
+against a graph loaded once, with an in-memory PathQueryCache in front of path
+search and a DistanceIndex answering `reach`. `apply` requests edit the
+resident graph with a delta (see fhrcc_mechanismkg.delta); the search index
+follows the edits, cached paths are keyed by the new fingerprint and the
+distance index is rebuilt on the next `reach`. Requests are handled one at a time.
+serve_http and serve_unix expose it as a local JSON API:
+
+- HTTP: `POST /<op>` with a JSON body, or `GET /<op>?key=value&...`
+- Unix socket: one JSON request per line, e.g. `{"op": "find", "keyword": "fumar"}`,
+  answered by one JSON line
+"""
+from __future__ import annotations
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+from .delta import apply_delta
+from .analytics import analyze_graph, ranked_counts
+from .lint import lint_graph
+from .reasoning.cache import PathQueryCache
+from .reasoning.distances import DistanceIndex
+from .reasoning.path_search import shortest_paths_from
+from .reporting import path_to_dict
+from .search import NodeIndex, find_nodes
+
+# Request fields parsed as integers when they arrive as query-string text.
+_INT_FIELDS = ("k", "max_hops", "limit")
+
+
+class GraphService:
+    def __init__(
+        self,
+        graph: Any,
+        index: Optional[NodeIndex] = None,
+        cache_size: int = 4096,
+        distances: Optional[DistanceIndex] = None,
+    ) -> None:
+        self.graph = graph
+        self.index = index if index is not None else NodeIndex.build(graph)
+        # Built on the first `reach` unless given; dropped when `apply` edits the graph.
+        self.distances = distances
+        self.cache = PathQueryCache(maxsize = cache_size)
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Callable[..., Dict[str, Any]]] = {
+            "info": self.info,
+            "find": self.find,
+            "search": self.search,
+            "complete": self.complete,
+            "explain": self.explain,
+            "reach": self.reach,
+            "summarize": self.summarize,
+            "lint": self.lint,
+            "apply": self.apply,
+        }
+        if hasattr(graph, "subscribe"):
+            self.index.attach(graph)
+        # Build the lazy indexes and CSR snapshot up front, before serving requests.
+        graph.freeze()
+        graph.outgoing(next(iter(graph.nodes), ""))
+
+    def handle(self, request: Any) -> Dict[str, Any]:
+        """Dispatch one request; failures come back as {"error": ...}."""
+        if not isinstance(request, dict):
+            return {"error": f"Request must be a JSON object, not {type(request).__name__}"}
+        params = dict(request)
+        op = params.pop("op", None)
+        handler = self._ops.get(op) if isinstance(op, str) else None
+        if handler is None:
+            return {"error": f"Unknown op: {op!r} (expected one of {', '.join(self._ops)})"}
+        for key in _INT_FIELDS:
+            if isinstance(params.get(key), str):
+                try:
+                    params[key] = int(params[key])
+                except ValueError:
+                    return {"error": f"{key} must be an integer, got {params[key]!r}"}
+        try:
+            with self._lock:
+                return handler(**params)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"error": str(e).strip("'\"")}
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "n_nodes": len(self.graph.nodes),
+            "n_edges": len(self.graph.edges),
+            "fingerprint": self.graph.fingerprint(),
+            "cache": vars(self.cache.stats),
+        }
+
+    def find(self, keyword: Optional[str] = None, type: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        hits = find_nodes(self.graph, keyword = keyword, node_type = type, index = self.index)
+        return {
+            "n_matches": len(hits),
+            "matches": [{"id": n.id, "type": n.type, "name": n.name, "synonyms": n.synonyms} for n in hits[:limit]],
+        }
+
+    def search(self, query: str, type: Optional[str] = None, limit: Optional[int] = 20) -> Dict[str, Any]:
+        return {"matches": [vars(h) for h in self.index.search(query, node_type = type, limit = limit)]}
+
+    def complete(self, prefix: str, type: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+        return {"matches": [vars(h) for h in self.index.complete(prefix, node_type = type, limit = limit)]}
+
+    def explain(
+        self,
+        source: str,
+        target: Any,
+        k: int = 5,
+        max_hops: int = 12,
+    ) -> Dict[str, Any]:
+        # A list of targets gets the best path to each from one search.
+        if isinstance(target, list):
+            results = shortest_paths_from(self.graph, source = source, targets = target, max_hops = max_hops)
+            return {
+                "source": source,
+                "results": {t: path_to_dict(p) for t, p in results.items()},
+                "missing": [t for t in target if t not in results],
+            }
+        paths = self.cache.k_shortest_paths(self.graph, source = source, target = target, k = k, max_hops = max_hops)
+        return {"source": source, "target": target, "paths": [path_to_dict(p) for p in paths]}
+
+    def reach(
+        self,
+        source: Optional[str] = None,
+        target: Any = None,
+        pairs: Optional[List[List[str]]] = None,
+        max_hops: int = 12,
+    ) -> Dict[str, Any]:
+        # One source with one or several targets, or a list of [source, target] pairs.
+        if pairs is None:
+            if source is None or target is None:
+                raise ValueError("Give source and target, or pairs")
+            pairs = [[source, t] for t in (target if isinstance(target, list) else [target])]
+        if self.distances is None:
+            self.distances = DistanceIndex.build(self.graph)
+        results = []
+        for s, t in pairs:
+            r = self.distances.query(s, t, max_hops)
+            results.append({"source": s, "target": t, "reachable": r.reachable, "cost": r.cost, "exact": r.exact})
+        return {"max_hops": max_hops, "results": results}
+
+    def summarize(self) -> Dict[str, Any]:
+        a = analyze_graph(self.graph)
+        return {
+            "n_nodes": a.n_nodes,
+            "n_edges": a.n_edges,
+            "nodes_by_type": dict(ranked_counts(a.node_types)),
+            "edges_by_predicate": dict(ranked_counts(a.predicates)),
+            "edges_by_evidence_level": dict(ranked_counts(a.evidence_levels)),
+            "top_out_hubs": a.top_hubs("out", k = 10),
+            "top_in_hubs": a.top_hubs("in", k = 10),
+        }
+
+    def lint(self) -> Dict[str, List[str]]:
+        return {"warnings": lint_graph(self.graph)}
+
+    def apply(self, changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not hasattr(self.graph, "subscribe"):
+            raise ValueError("The served graph is read-only (memory-mapped)")
+        applied = apply_delta(self.graph, changes)
+        if applied:
+            self.distances = None
+        return {
+            "applied": len(applied),
+            "n_nodes": len(self.graph.nodes),
+            "n_edges": len(self.graph.edges),
+            "fingerprint": self.graph.fingerprint(),
+        }
+
+
+def serve_http(service: GraphService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Build (but do not start) an HTTP server; call `serve_forever()` on the result."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            request: Dict[str, Any] = dict(parse_qsl(url.query))
+            if "target" in request and "," in request["target"]:
+                request["target"] = request["target"].split(",")
+            self._answer(url.path, request)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError as e:
+                return self._send(400, {"error": f"Invalid JSON body: {e}"})
+            self._answer(urlsplit(self.path).path, request)
+
+        def _answer(self, path: str, request: Any) -> None:
+            if path.strip("/") and isinstance(request, dict):
+                request["op"] = path.strip("/")
+            response = service.handle(request)
+            self._send(400 if "error" in response else 200, response)
+
+        def _send(self, status: int, payload: Dict[str, Any]) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_unix(service: GraphService, path: str) -> socketserver.UnixStreamServer:
+    """Build (but do not start) a Unix-socket server speaking line-delimited JSON."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    response = service.handle(json.loads(line))
+                except json.JSONDecodeError as e:
+                    response = {"error": f"Invalid JSON request: {e}"}
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+    server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    server.daemon_threads = True  # don't wait on idle client connections at shutdown
+    return server
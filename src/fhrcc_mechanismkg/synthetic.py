@@ -0,0 +1,187 @@
+"""
+Synthetic scale-up graphs for benchmarking.
+
+`generate_graph` grows a graph with the type, predicate, evidence-level,
+weight and polarity mix of a reference graph (by default the curated
+data/fhrcc_pathway_v1.json) to any size. Endpoints are chosen by preferential
+attachment, so a few hub nodes collect most of the edges, as in curated
+mechanism graphs. Generation is deterministic for a given seed.
+
+Large graphs (10^6-10^7 edges) should be streamed to disk with
+`write_synthetic_graph(path.jsonl, ...)`, which never holds the graph in
+memory.
+"""
+from __future__ import annotations
+import bisect
+import itertools
+import json
+import random
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .graph import Graph
+from .io import SCHEMA_VERSION, graph_from_records, save_graph
+
+Record = Tuple[str, Dict[str, Any], int]
+
+
+@dataclass(frozen = True)
+class GraphProfile:
+    """Category frequencies and shape of a reference graph."""
+
+    node_types: Dict[str, float]
+    predicates: Dict[str, float]
+    evidence_levels: Dict[str, float]
+    polarities: Dict[Optional[str], float]
+    # evidence level -> (min, max) edge weight
+    weight_ranges: Dict[str, Tuple[float, float]] = field(default_factory = dict)
+    edges_per_node: float = 1.3
+    # Share of endpoints drawn uniformly instead of by preferential attachment
+    # (lower = more hub-heavy).
+    uniform_mix: float = 0.25
+
+    @classmethod
+    def from_graph(cls, g: Graph, uniform_mix: float = 0.25) -> "GraphProfile":
+        weights: Dict[str, List[float]] = defaultdict(list)
+        for e in g.edges:
+            weights[e.evidence_level].append(e.weight)
+        return cls(
+            node_types = dict(Counter(n.type for n in g.nodes.values())),
+            predicates = dict(Counter(e.predicate for e in g.edges)),
+            evidence_levels = dict(Counter(e.evidence_level for e in g.edges)),
+            polarities = dict(Counter(e.polarity for e in g.edges)),
+            weight_ranges = {ev: (min(ws), max(ws)) for ev, ws in weights.items()},
+            edges_per_node = len(g.edges) / max(1, len(g.nodes)),
+            uniform_mix = uniform_mix,
+        )
+
+
+# Measured on data/fhrcc_pathway_v1.json (33 nodes, 43 edges).
+FHRCC_PROFILE = GraphProfile(
+    node_types = {"process": 16, "pathway": 5, "phenotype": 4, "state": 3, "gene": 2, "protein": 2, "metabolite": 1},
+    predicates = {
+        "enables": 16, "causes": 14, "activates": 7, "inhibits": 3,
+        "modifies": 1, "inhibits_activity_of": 1, "decreases": 1,
+    },
+    evidence_levels = {"hypothesis": 23, "review_or_consensus": 16, "patient_omics": 2, "biochemical_direct": 1, "cell_model": 1},
+    polarities = {None: 34, "+": 5, "-": 4},
+    weight_ranges = {
+        "hypothesis": (0.2, 0.55),
+        "review_or_consensus": (0.5, 0.9),
+        "patient_omics": (0.7, 0.7),
+        "biochemical_direct": (0.85, 0.85),
+        "cell_model": (0.7, 0.7),
+    },
+    edges_per_node = 43 / 33,
+)
+
+# Words for synthetic node names, so keyword search has realistic overlap.
+NAME_WORDS = (
+    "fumarate", "succination", "KEAP1", "NRF2", "HIF", "PHD", "TET", "KDM", "TCA", "cycle",
+    "oxidative", "stress", "antioxidant", "response", "hypoxia", "pseudohypoxia", "methylation",
+    "mitochondrial", "damage", "cGAS", "STING", "interferon", "immune", "evasion", "angiogenesis",
+    "proliferation", "survival", "signaling", "kinase", "mTOR", "AKT", "PI3K", "Hippo", "NF2",
+    "antigen", "presentation", "inhibition", "stabilization", "program", "pathway",
+)
+
+
+def iter_synthetic_records(
+    n_edges: int,
+    seed: int = 0,
+    profile: Optional[GraphProfile] = None,
+) -> Iterator[Record]:
+    """
+    ("node" | "edge", record, 0) tuples of a synthetic graph with about
+    `n_edges` edges: all nodes first, then edges (the layout graph_from_records
+    and the JSONL writer expect).
+    """
+    profile = profile or FHRCC_PROFILE
+    rnd = random.Random(seed)
+    n_nodes = max(2, round(n_edges / profile.edges_per_node))
+
+    type_names, pick_type = _sampler(rnd, profile.node_types)
+    types = array("b", (pick_type() for _ in range(n_nodes)))
+    for i, code in enumerate(types):
+        node_type = type_names[code]
+        words = rnd.sample(NAME_WORDS, rnd.randint(1, 3))
+        name = " ".join(words) + f" {i}"
+        yield "node", {
+            "id": f"{node_type}:syn_{i}",
+            "type": node_type,
+            "name": name,
+            "synonyms": [],
+            "description": f"Synthetic {node_type} ({' / '.join(words)}).",
+            "xrefs": {},
+            "tags": ["synthetic"],
+        }, 0
+
+    predicates, pick_predicate = _sampler(rnd, profile.predicates)
+    evidence_levels, pick_evidence = _sampler(rnd, profile.evidence_levels)
+    polarities, pick_polarity = _sampler(rnd, profile.polarities)
+
+    # Preferential attachment: every edge endpoint is remembered, so drawing a
+    # random earlier endpoint picks nodes in proportion to their degree.
+    out_ends, in_ends = array("i"), array("i")
+    mix = profile.uniform_mix
+    for _ in range(n_edges):
+        while True:
+            u = _endpoint(rnd, out_ends, n_nodes, mix)
+            v = _endpoint(rnd, in_ends, n_nodes, mix)
+            if u != v:
+                break
+        out_ends.append(u)
+        in_ends.append(v)
+
+        predicate = predicates[pick_predicate()]
+        evidence = evidence_levels[pick_evidence()]
+        lo, hi = profile.weight_ranges.get(evidence, (0.3, 0.8))
+        yield "edge", {
+            "subject": f"{type_names[types[u]]}:syn_{u}",
+            "predicate": predicate,
+            "object": f"{type_names[types[v]]}:syn_{v}",
+            "weight": round(rnd.uniform(lo, hi), 2),
+            "evidence_level": evidence,
+            "polarity": polarities[pick_polarity()],
+            "mechanism": f"synthetic {predicate} link",
+            "context": {},
+            "citations": [],
+            "notes": None,
+        }, 0
+
+
+def generate_graph(n_edges: int, seed: int = 0, profile: Optional[GraphProfile] = None) -> Graph:
+    """An in-memory synthetic graph (see iter_synthetic_records)."""
+    return graph_from_records(iter_synthetic_records(n_edges, seed = seed, profile = profile))  # type: ignore[return-value]
+
+
+def write_synthetic_graph(path: str, n_edges: int, seed: int = 0, profile: Optional[GraphProfile] = None) -> None:
+    """
+    Write a synthetic graph to `path`. JSONL output is streamed record by
+    record; other formats build the graph in memory first.
+    """
+    out_path = Path(path)
+    if out_path.suffix != ".jsonl":
+        save_graph(generate_graph(n_edges, seed = seed, profile = profile), path)
+        return
+
+    out_path.parent.mkdir(parents = True, exist_ok = True)
+    with out_path.open("w", encoding = "utf-8") as f:
+        f.write(json.dumps({"kind": "header", "schema_version": SCHEMA_VERSION}) + "\n")
+        for kind, record, _ in iter_synthetic_records(n_edges, seed = seed, profile = profile):
+            f.write(json.dumps({"kind": kind, **record}) + "\n")
+
+
+def _sampler(rnd: random.Random, weights: Dict[Any, float]) -> Tuple[List[Any], Callable[[], int]]:
+    # Categories plus a function drawing a category index by weight.
+    names = list(weights)
+    cum = list(itertools.accumulate(weights.values()))
+    total = cum[-1]
+    return names, lambda: bisect.bisect_right(cum, rnd.random() * total)
+
+
+def _endpoint(rnd: random.Random, ends: array, n_nodes: int, mix: float) -> int:
+    if not ends or rnd.random() < mix:
+        return rnd.randrange(n_nodes)
+    return ends[rnd.randrange(len(ends))]
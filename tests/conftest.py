@@ -0,0 +1,16 @@
+from pathlib import Path
+import pytest
+from fhrcc_mechanismkg.io import graph_from_json
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'data'
+
+
+@pytest.fixture(scope = 'module')
+def pathway():
+    # Shared by the tests of a module; tests that edit the graph use fresh_pathway.
+    return graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+
+
+@pytest.fixture
+def fresh_pathway():
+    return graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
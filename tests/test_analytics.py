@@ -0,0 +1,58 @@
+from dataclasses import replace
+from fhrcc_mechanismkg.analytics import analyze_graph
+from fhrcc_mechanismkg.binary import graph_to_binary
+from fhrcc_mechanismkg.lint import lint_graph
+from fhrcc_mechanismkg.mapped import MappedGraph
+from fhrcc_mechanismkg.schema import Node
+from fhrcc_mechanismkg.synthetic import generate_graph
+
+
+def _linty_graph():
+    g = generate_graph(2000, seed = 3)
+    edges = g.edges[:40]
+    for e in edges[:10]:
+        g.update_edge(e, replace(e, weight = 0.9, evidence_level = 'hypothesis'))
+    for e in edges[10:20]:
+        g.update_edge(e, replace(e, weight = 0.8, mechanism = ' '))
+    for e in edges[20:30]:
+        other = 'inhibits' if e.predicate == 'activates' else 'activates'
+        g.add_edge(replace(e, predicate = other))
+    g.add_node(Node(id = 'gene:lonely', type = 'gene', name = 'lonely'))
+    return g
+
+
+def test_lint_reports_every_rule():
+    g = _linty_graph()
+    warnings = lint_graph(g)
+    assert sum(w.startswith('Hypothesis edge has high weight') for w in warnings) >= 10
+    assert sum(w.startswith('High-weight edge missing mechanism') for w in warnings) >= 10
+    assert sum(w.startswith('Potential contradiction') for w in warnings) >= 10
+    assert 'Isolated node (no edges): gene:lonely' in warnings
+
+    heavy = [e for e in g.edges if e.weight >= 0.70 and e.evidence_level == 'hypothesis']
+    expected = [f'Hypothesis edge has high weight (>=0.70): {e.subject} --{e.predicate}--> {e.object} (w = {e.weight:.2f}).' for e in heavy]
+    assert [w for w in warnings if w.startswith('Hypothesis edge')] == expected
+
+
+def test_mapped_analytics_match_loaded_graph(tmp_path):
+    g = _linty_graph()
+    path = str(tmp_path / 'linty.fhkg')
+    graph_to_binary(g, path)
+    a, b = analyze_graph(g), analyze_graph(MappedGraph(path))
+    assert (a.node_types, a.predicates, a.evidence_levels) == (b.node_types, b.predicates, b.evidence_levels)
+    assert list(a.node_ids) == list(b.node_ids)
+    assert list(a.out_degree) == list(b.out_degree) and list(a.in_degree) == list(b.in_degree)
+    assert a.contradictions == b.contradictions and a.isolated_nodes == b.isolated_nodes
+    assert a.top_hubs('out', 5) == b.top_hubs('out', 5)
+    assert lint_graph(g, a) == lint_graph(MappedGraph(path), b)
+
+
+def test_top_hubs_breaks_ties_by_id():
+    g = generate_graph(300, seed = 1)
+    a = analyze_graph(g)
+    hubs = a.top_hubs('in', 8)
+    degree = {e.object: 0 for e in g.edges}
+    for e in g.edges:
+        degree[e.object] += 1
+    assert hubs == sorted(degree.items(), key = lambda x: (-x[1], x[0]))[:8]
+    assert sum(a.degree_histogram('total').values()) == len(g.nodes)
@@ -0,0 +1,39 @@
+import pytest
+from fhrcc_mechanismkg.io import save_graph
+from fhrcc_mechanismkg.reasoning.batch import batch_explain
+from fhrcc_mechanismkg.reasoning.path_search import k_shortest_paths_explainable
+
+
+def _pairs(g):
+    ids = sorted(g.nodes)
+    return [(s, t) for s in ids[:4] for t in ids[-5:]] + [('gene:FH', 'state:missing')]
+
+
+def _serial(g, pairs):
+    out = {}
+    for i, (s, t) in enumerate(pairs):
+        try:
+            out[i] = [p.node_ids() for p in k_shortest_paths_explainable(g, s, t, k = 3, max_hops = 8)]
+        except ValueError:
+            out[i] = None
+    return out
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_matches_serial(pathway, workers):
+    pairs = _pairs(pathway)
+    results = list(batch_explain(pathway, pairs, k = 3, max_hops = 8, workers = workers, chunksize = 3))
+    assert sorted(r.index for r in results) == list(range(len(pairs)))
+    got = {r.index: (None if r.error else [p.node_ids() for p in r.paths]) for r in results}
+    assert got == _serial(pathway, pairs)
+    missing = next(r for r in results if r.target == 'state:missing')
+    assert missing.error == 'Target node not found: state:missing'
+
+
+def test_batch_reopens_graph_file_in_workers(tmp_path, pathway):
+    path = tmp_path / 'graph.fhkg'
+    save_graph(pathway, str(path))
+    pairs = _pairs(pathway)
+    results = list(batch_explain(str(path), pairs, k = 3, max_hops = 8, workers = 2))
+    got = {r.index: (None if r.error else [p.node_ids() for p in r.paths]) for r in results}
+    assert got == _serial(pathway, pairs)
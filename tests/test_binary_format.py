@@ -0,0 +1,42 @@
+import pytest
+from fhrcc_mechanismkg.binary import FORMAT_VERSION, decode_graph, encode_graph
+from fhrcc_mechanismkg.graph import Graph
+from fhrcc_mechanismkg.io import graph_from_json, graph_to_dict, load_graph, save_graph
+from fhrcc_mechanismkg.schema import Node, Edge
+from conftest import DATA_DIR
+
+
+@pytest.mark.parametrize('name', ['fhrcc_pathway_v1.json', 'minimal_fh_nrf2.json'])
+def test_binary_round_trip_matches_json(tmp_path, name):
+    g = graph_from_json(str(DATA_DIR / name))
+    out = tmp_path / 'graph.fhkg'
+    save_graph(g, str(out))
+    h = load_graph(str(out))
+    assert graph_to_dict(h) == graph_to_dict(g)
+    assert out.stat().st_size < (DATA_DIR / name).stat().st_size
+
+
+def test_round_trip_optional_fields_and_nul_strings():
+    g = Graph()
+    g.add_node(Node(id = 'gene:A', type = 'gene', name = 'A\0odd', xrefs = {'HGNC': 'A'}, tags = ['t'], synonyms = ['a1', 'a2']))
+    g.add_node(Node(id = 'state:b', type = 'state', name = 'B', description = 'é unicode'))
+    g.add_edge(Edge(
+        subject = 'gene:A', predicate = 'inhibits', object = 'state:b', weight = 0.42, evidence_level = 'cell_model',
+        polarity = '-', context = {'tissue': 'kidney'}, citations = ['PMID:1'], notes = 'n',
+    ))
+    g.add_edge(Edge(subject = 'state:b', predicate = 'causes', object = 'gene:A', weight = 0.9, evidence_level = 'hypothesis'))
+    assert graph_to_dict(decode_graph(encode_graph(g))) == graph_to_dict(g)
+    assert graph_to_dict(decode_graph(encode_graph(Graph()))) == graph_to_dict(Graph())
+
+
+def test_rejects_non_binary_input():
+    with pytest.raises(ValueError):
+        decode_graph(b'{"nodes": []}')
+
+
+def test_rejects_older_format_versions():
+    data = encode_graph(graph_from_json(str(DATA_DIR / 'minimal_fh_nrf2.json')))
+    old = data.replace(f'"format_version":{FORMAT_VERSION}'.encode(), f'"format_version":{FORMAT_VERSION - 1}'.encode(), 1)
+    assert old != data
+    with pytest.raises(ValueError, match = 'format version'):
+        decode_graph(old)
@@ -0,0 +1,112 @@
+import os
+import random
+from dataclasses import replace
+import pytest
+from fhrcc_mechanismkg.io import save_graph
+from fhrcc_mechanismkg.reasoning.distances import DISTANCE_INDEX_SUFFIX, DistanceIndex
+from fhrcc_mechanismkg.reasoning.path_search import (
+    DEFAULT_PREDICATE_PENALTY,
+    k_shortest_paths_explainable,
+    shortest_path_explainable,
+    shortest_paths_from,
+)
+from fhrcc_mechanismkg.reasoning.stats import SearchStats
+from fhrcc_mechanismkg.synthetic import generate_graph
+
+
+def _check_against_search(g, index, pairs, hop_budgets):
+    for source, target in pairs:
+        for max_hops in hop_budgets:
+            try:
+                expected = shortest_path_explainable(g, source, target, max_hops = max_hops).total_cost
+            except ValueError:
+                expected = None
+            r = index.query(source, target, max_hops)
+            assert r.reachable == (expected is not None), (source, target, max_hops)
+            if expected is None:
+                continue
+            if r.exact:
+                assert r.cost == pytest.approx(expected)
+            else:
+                assert r.cost <= expected + 1e-9
+
+
+@pytest.mark.parametrize('method', ['all_pairs', 'labels'])
+def test_index_matches_search_on_pathway(pathway, method):
+    index = DistanceIndex.build(pathway, method = method)
+    pairs = [(s, t) for s in pathway.nodes for t in pathway.nodes]
+    _check_against_search(pathway, index, pairs, (1, 3, 6, 14))
+    if method == 'all_pairs':
+        assert all(index.query(s, t, 14).exact for s, t in pairs)
+
+
+def test_labels_match_search_on_synthetic_graph():
+    g = generate_graph(5000, seed = 4)
+    cg = g.freeze()
+    index = DistanceIndex.build(cg, method = 'labels')
+    rng = random.Random(0)
+    ids = sorted(g.nodes)
+    hubs = sorted(ids, key = lambda n: -len(g.outgoing(n)))[:10]
+    pairs = []
+    for s in hubs + rng.sample(ids, 10):
+        reached = sorted(shortest_paths_from(cg, s, max_hops = 10))
+        pairs += [(s, t) for t in rng.sample(reached, min(8, len(reached)))]
+        pairs += [(s, rng.choice(ids)) for _ in range(4)]
+    _check_against_search(cg, index, pairs, (2, 4, 10))
+
+
+@pytest.mark.parametrize('method', ['all_pairs', 'labels'])
+def test_search_uses_index_for_reject_and_answer(pathway, method):
+    index = DistanceIndex.build(pathway, method = method)
+    stats = SearchStats()
+    fast = shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14, distances = index, stats = stats)
+    slow = shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14)
+    assert fast.total_cost == slow.total_cost and fast.node_ids() == slow.node_ids()
+    assert 'search' not in stats.phases and stats.searches == 0
+
+    stats = SearchStats()
+    with pytest.raises(ValueError, match = 'No path found'):
+        shortest_path_explainable(pathway, 'phenotype:cancer', 'gene:FH', max_hops = 14, distances = index, stats = stats)
+    assert stats.searches == 0
+    assert k_shortest_paths_explainable(pathway, 'phenotype:cancer', 'gene:FH', distances = index) == []
+
+    paths = k_shortest_paths_explainable(pathway, 'gene:FH', 'phenotype:cancer', k = 5, max_hops = 14, distances = index)
+    assert [p.total_cost for p in paths] == pytest.approx([p.total_cost for p in k_shortest_paths_explainable(pathway, 'gene:FH', 'phenotype:cancer', k = 5, max_hops = 14)])
+
+    # Another penalty table: the index only rejects, the search answers.
+    table = {**DEFAULT_PREDICATE_PENALTY, 'causes': 1.5}
+    assert shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14, predicate_penalty = table, distances = index).total_cost == pytest.approx(
+        shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14, predicate_penalty = table).total_cost
+    )
+
+    with pytest.raises(ValueError, match = 'built for'):
+        shortest_path_explainable(generate_graph(200, seed = 1), 'gene:syn_101', 'gene:syn_116', distances = index)
+
+
+def test_index_rejects_edited_graph_with_same_counts(fresh_pathway):
+    g = fresh_pathway
+    index = DistanceIndex.build(g)
+    e = g.outgoing('gene:FH')[0]
+    g.update_edge(e, replace(e, weight = 0.02))
+    with pytest.raises(ValueError, match = 'edited'):
+        shortest_path_explainable(g, 'gene:FH', 'phenotype:cancer', max_hops = 14, distances = index)
+    assert DistanceIndex.build(g).query('gene:FH', 'phenotype:cancer', 14) != index.query('gene:FH', 'phenotype:cancer', 14)
+
+
+def test_index_file_next_to_graph(pathway, tmp_path):
+    path = str(tmp_path / 'pathway.json')
+    save_graph(pathway, path)
+    index = DistanceIndex.for_graph_file(pathway, path)
+    assert os.path.exists(path + DISTANCE_INDEX_SUFFIX)
+    loaded = DistanceIndex.load(path + DISTANCE_INDEX_SUFFIX, source = path)
+    assert loaded is not None and loaded.method == index.method == 'all_pairs'
+    assert loaded.query('gene:FH', 'phenotype:cancer', 14) == index.query('gene:FH', 'phenotype:cancer', 14)
+
+    assert DistanceIndex.load(path + DISTANCE_INDEX_SUFFIX, source = path, predicate_penalty = {'causes': 2.0}) is None
+    labels = DistanceIndex.for_graph_file(pathway, path, method = 'labels')
+    assert labels.method == 'labels'
+    assert DistanceIndex.load(path + DISTANCE_INDEX_SUFFIX, source = path).method == 'labels'
+
+    st = os.stat(path)
+    os.utime(path, ns = (st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert DistanceIndex.load(path + DISTANCE_INDEX_SUFFIX, source = path) is None
@@ -0,0 +1,103 @@
+import random
+from dataclasses import replace
+import pytest
+from fhrcc_mechanismkg.delta import apply_delta
+from fhrcc_mechanismkg.graph import Graph
+from fhrcc_mechanismkg.io import graph_from_json
+from fhrcc_mechanismkg.reasoning.dynamic import DynamicQuerySet, DynamicShortestPaths
+from fhrcc_mechanismkg.reasoning.path_search import DEFAULT_PREDICATE_PENALTY, shortest_path_explainable, shortest_paths_from
+from fhrcc_mechanismkg.schema import Node, Edge
+from conftest import DATA_DIR
+
+
+PREDICATES = sorted(DEFAULT_PREDICATE_PENALTY)
+
+
+def _costs(results):
+    return {k: round(p.total_cost, 9) for k, p in results.items()}
+
+
+def _random_edge(rng, g):
+    s, o = rng.sample(sorted(g.nodes), 2)
+    return Edge(subject = s, predicate = rng.choice(PREDICATES), object = o, weight = round(rng.uniform(0.05, 0.95), 2), evidence_level = 'hypothesis')
+
+
+@pytest.mark.parametrize('seed', range(12))
+def test_repairs_match_fresh_search(seed):
+    rng = random.Random(seed)
+    g = Graph()
+    for i in range(rng.randint(6, 25)):
+        g.add_node(Node(id = f'state:n{i}', type = 'state', name = f'N{i}'))
+    for _ in range(rng.randint(10, 60)):
+        g.add_edge(_random_edge(rng, g))
+    max_hops = rng.randint(1, 5)
+    dyn = DynamicShortestPaths(g, 'state:n0', max_hops = max_hops)
+
+    for _ in range(15):
+        r = rng.random()
+        if r < 0.25:
+            g.remove_edge(rng.choice(g.edges))
+        elif r < 0.5:
+            g.add_edge(_random_edge(rng, g))
+        elif r < 0.75:
+            e = rng.choice(g.edges)
+            g.update_edge(e, replace(e, weight = round(rng.uniform(0.05, 0.95), 2)))
+        elif r < 0.85:
+            g.remove_node(rng.choice(sorted(set(g.nodes) - {'state:n0'})), cascade = True)
+        else:
+            table = dict(dyn.predicate_penalty, **{rng.choice(PREDICATES): rng.uniform(0, 3)})
+            dyn.set_predicate_penalty(table)
+        expected = shortest_paths_from(g, 'state:n0', max_hops = max_hops, predicate_penalty = dyn.predicate_penalty)
+        got = dyn.paths_to()
+        assert _costs(got) == _costs(expected)
+        for target, path in got.items():
+            assert path.node_ids()[0] == 'state:n0' and path.node_ids()[-1] == target
+            assert len(path.steps) <= max_hops
+
+
+def test_repair_touches_only_affected_states():
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    dyn = DynamicShortestPaths(g, 'gene:FH', max_hops = 12)
+    best = dyn.path_to('phenotype:cancer')
+    assert best.total_cost == pytest.approx(shortest_path_explainable(g, 'gene:FH', 'phenotype:cancer', max_hops = 12).total_cost)
+
+    # An edge into the source's unreachable side changes nothing.
+    unreachable = sorted(set(g.nodes) - {v for layer in dyn.layers for v in layer})
+    if len(unreachable) >= 2:
+        g.add_edge(Edge(subject = unreachable[0], predicate = 'causes', object = unreachable[1], weight = 0.9, evidence_level = 'hypothesis'))
+        dyn.refresh()
+        assert dyn.stats.states_recomputed == 0
+
+    last = best.steps[-1].edge
+    apply_delta(g, [{'op': 'remove_edge', 'subject': last.subject, 'predicate': last.predicate, 'object': last.object}])
+    repaired = dyn.path_to('phenotype:cancer')
+    assert repaired.total_cost > best.total_cost
+    assert repaired.total_cost == pytest.approx(shortest_path_explainable(g, 'gene:FH', 'phenotype:cancer', max_hops = 12).total_cost)
+    assert 0 < dyn.stats.states_recomputed < sum(len(layer) for layer in dyn.layers)
+
+
+def test_empty_penalty_table_means_the_default():
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    dyn = DynamicShortestPaths(g, 'gene:FH', max_hops = 12, predicate_penalty = {'causes': 2.0})
+    assert _costs(dyn.paths_to()) == _costs(shortest_paths_from(g, 'gene:FH', max_hops = 12, predicate_penalty = {'causes': 2.0}))
+    dyn.set_predicate_penalty({})
+    assert dyn.predicate_penalty == DEFAULT_PREDICATE_PENALTY
+    assert _costs(dyn.paths_to()) == _costs(shortest_paths_from(g, 'gene:FH', max_hops = 12, predicate_penalty = {}))
+
+
+def test_query_set_and_errors():
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    pairs = [('gene:FH', 'phenotype:cancer'), ('gene:FH', 'gene:FH'), ('phenotype:cancer', 'gene:FH')]
+    saved = DynamicQuerySet(g, pairs, max_hops = 12)
+    results = saved.results()
+    assert results[('gene:FH', 'gene:FH')].steps == []
+    assert results[('phenotype:cancer', 'gene:FH')] is None
+    assert len(saved.trees) == 2
+
+    dyn = saved.trees['gene:FH']
+    with pytest.raises(ValueError, match = 'Target node not found'):
+        dyn.path_to('state:missing')
+    g.remove_node('gene:FH', cascade = True)
+    with pytest.raises(ValueError, match = 'Source node not found'):
+        dyn.path_to('phenotype:cancer')
+    saved.close()
@@ -0,0 +1,42 @@
+from fhrcc_mechanismkg.graph import Graph, build_minimal_example_graph
+from fhrcc_mechanismkg.io import graph_from_json, graph_to_dict, graph_from_dict
+from conftest import DATA_DIR
+
+
+def _scan(g, subject = None, predicate = None, object = None):
+    return [
+        e for e in g.edges
+        if (subject is None or e.subject == subject)
+        and (predicate is None or e.predicate == predicate)
+        and (object is None or e.object == object)
+    ]
+
+
+def test_indexes_match_linear_scan():
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    predicates = {e.predicate for e in g.edges}
+    for node_id in g.nodes:
+        assert g.outgoing(node_id) == _scan(g, subject = node_id)
+        assert g.incoming(node_id) == _scan(g, object = node_id)
+        for pred in predicates:
+            assert g.find_edges(subject = node_id, predicate = pred) == _scan(g, node_id, pred)
+            assert g.find_edges(predicate = pred, object = node_id) == _scan(g, None, pred, node_id)
+    for pred in predicates:
+        assert g.find_edges(predicate = pred) == _scan(g, predicate = pred)
+    assert g.find_edges() == g.edges
+
+
+def test_indexes_survive_round_trip_and_constructor():
+    g = build_minimal_example_graph()
+    g2 = graph_from_dict(graph_to_dict(g))
+    g3 = Graph(nodes = dict(g.nodes), edges = list(g.edges))
+    for other in (g2, g3):
+        for node_id in g.nodes:
+            assert other.outgoing(node_id) == g.outgoing(node_id)
+            assert other.incoming(node_id) == g.incoming(node_id)
+
+
+def test_returned_lists_are_copies():
+    g = build_minimal_example_graph()
+    g.outgoing('gene:FH').clear()
+    assert len(g.outgoing('gene:FH')) == 1
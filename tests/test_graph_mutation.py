@@ -0,0 +1,154 @@
+import random
+from dataclasses import replace
+import pytest
+from fhrcc_mechanismkg.delta import ChangeLog, apply_delta
+from fhrcc_mechanismkg.fingerprint import content_fingerprint
+from fhrcc_mechanismkg.graph import Graph
+from fhrcc_mechanismkg.compiled import CompiledGraph
+from fhrcc_mechanismkg.io import graph_from_json, graph_to_dict
+from fhrcc_mechanismkg.reasoning.path_search import DEFAULT_PREDICATE_PENALTY
+from fhrcc_mechanismkg.schema import Node, Edge
+from fhrcc_mechanismkg.search import NodeIndex, find_nodes
+from fhrcc_mechanismkg.synthetic import generate_graph
+from conftest import DATA_DIR
+
+
+def _same_edges(a, b):
+    return sorted(map(repr, a)) == sorted(map(repr, b))
+
+
+def _check_consistent(g):
+    # Indexes, fingerprint and snapshot must match a graph rebuilt from scratch
+    # (bucket order may differ after edges were moved or re-added).
+    fresh = Graph()
+    fresh.add_nodes(g.nodes.values())
+    fresh.add_edges(g.edges)
+    for node_id in g.nodes:
+        assert _same_edges(g.outgoing(node_id), fresh.outgoing(node_id))
+        assert _same_edges(g.incoming(node_id), fresh.incoming(node_id))
+    for e in g.edges:
+        assert _same_edges(g.find_edges(predicate = e.predicate), fresh.find_edges(predicate = e.predicate))
+        assert _same_edges(g.find_edges(e.subject, e.predicate), fresh.find_edges(e.subject, e.predicate))
+    assert g.fingerprint() == content_fingerprint(g.nodes.values(), g.edges)
+    assert g.freeze().n_edges == len(g.edges)
+
+
+def test_remove_update_upsert(fresh_pathway):
+    g = fresh_pathway
+    g.fingerprint()
+    with pytest.raises(ValueError, match = 'remove them first'):
+        g.remove_node('gene:FH')
+
+    e = g.outgoing('gene:FH')[0]
+    g.update_edge(e, replace(e, weight = 0.5))
+    assert g.outgoing('gene:FH')[0].weight == 0.5
+    g.upsert_edge(replace(e, weight = 0.6))
+    assert [x.weight for x in g.find_edges(e.subject, e.predicate, e.object)] == [0.6]
+
+    g.upsert_node(replace(g.nodes['gene:FH'], name = 'Fumarate hydratase'))
+    g.upsert_node(Node(id = 'gene:NEW', type = 'gene', name = 'NEW'))
+    g.add_edge(Edge(subject = 'gene:NEW', predicate = 'causes', object = 'gene:FH', weight = 0.4, evidence_level = 'hypothesis'))
+    n_edges = len(g.edges)
+    n_incident = len({id(x) for x in g.outgoing('gene:FH') + g.incoming('gene:FH')})
+    g.remove_node('gene:FH', cascade = True)
+    assert 'gene:FH' not in g.nodes and len(g.edges) == n_edges - n_incident
+    with pytest.raises(ValueError, match = 'Edge not found'):
+        g.remove_edge(e)
+    _check_consistent(g)
+
+
+def test_edge_slots_follow_removals_and_updates():
+    g = generate_graph(400, seed = 2)
+    rng = random.Random(0)
+    for _ in range(300):
+        e = rng.choice(g.edges)
+        if rng.random() < 0.5:
+            g.remove_edge(replace(e))  # an equal copy is found through the indexes
+        else:
+            g.update_edge(e, replace(e, weight = 0.5))
+    assert g._slots == {id(e): i for i, e in enumerate(g.edges)}
+    victim = rng.choice(list(g.nodes))
+    g.remove_node(victim, cascade = True)
+    assert g._slots == {id(e): i for i, e in enumerate(g.edges)}
+    assert all(victim not in (e.subject, e.object) for e in g.edges)
+    _check_consistent(g)
+
+
+def test_snapshot_is_patched_for_same_endpoint_updates():
+    g = generate_graph(2000, seed = 3)
+    rng = random.Random(1)
+    table = {**DEFAULT_PREDICATE_PENALTY, 'causes': 0.3}
+    before = g.freeze()
+    before.costs(table)
+    for _ in range(3):
+        for e in rng.sample(g.edges, 20):
+            # Some edges are updated twice; 'novel_predicate' is not in the snapshot yet.
+            g.update_edge(e, replace(e, weight = round(rng.uniform(0.05, 0.95), 2), predicate = rng.choice(['causes', 'novel_predicate', e.predicate])))
+            if rng.random() < 0.3:
+                g.update_edge(g.edges[0], replace(g.edges[0], notes = 'edited'))
+        cg = g.freeze()
+        assert cg.offsets is before.offsets and cg.targets is before.targets
+        fresh = CompiledGraph.from_graph(g)
+        assert list(cg.edges) == list(fresh.edges)
+        assert [cg.predicate_names[c] for c in cg.predicate_codes] == [fresh.predicate_names[c] for c in fresh.predicate_codes]
+        assert list(cg.neg_log_weight) == list(fresh.neg_log_weight)
+        assert cg._cost_cache and list(cg.costs(table)) == list(fresh.costs(table))
+        before = cg
+
+    # A snapshot already handed out keeps its contents; other mutations rebuild.
+    e = g.edges[0]
+    g.update_edge(e, replace(e, object = next(n for n in g.nodes if n != e.object)))
+    assert before.edges[before.offsets[before.index[e.subject]]:].count(e) == 1
+    assert g.freeze().offsets is not before.offsets
+    assert list(g.freeze().edges) == list(CompiledGraph.from_graph(g).edges)
+
+
+def test_change_log_round_trip_and_undo(fresh_pathway):
+    original = graph_to_dict(fresh_pathway)
+    original_fingerprint = fresh_pathway.fingerprint()
+    target = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+
+    with ChangeLog(fresh_pathway) as log:
+        fresh_pathway.remove_node('gene:NF2', cascade = True)
+        e = fresh_pathway.edges[3]
+        fresh_pathway.update_edge(e, replace(e, predicate = 'activates', notes = 'changed'))
+        fresh_pathway.add_node(Node(id = 'state:new', type = 'state', name = 'New state'))
+    fresh_pathway.add_node(Node(id = 'state:unlogged', type = 'state', name = 'Unlogged'))
+    assert [c.op for c in log.changes][-2:] == ['update', 'add']
+
+    # Replaying the delta on a fresh copy gives the same content.
+    apply_delta(target, log.to_delta())
+    fresh_pathway.remove_node('state:unlogged')
+    assert target.fingerprint() == fresh_pathway.fingerprint()
+
+    log.undo(fresh_pathway)
+    assert fresh_pathway.fingerprint() == original_fingerprint
+    assert _same_edges(graph_to_dict(fresh_pathway)['edges'], original['edges'])
+    _check_consistent(fresh_pathway)
+
+
+def test_apply_delta_is_all_or_nothing(fresh_pathway):
+    before = fresh_pathway.fingerprint()
+    delta = {'changes': [
+        {'op': 'add_node', 'node': {'id': 'gene:X', 'type': 'gene', 'name': 'X'}},
+        {'op': 'remove_edge', 'subject': 'gene:X', 'predicate': 'causes', 'object': 'gene:FH'},
+    ]}
+    with pytest.raises(ValueError, match = r"Delta operation 1 \('remove_edge'\) failed: Edge not found"):
+        apply_delta(fresh_pathway, delta)
+    assert 'gene:X' not in fresh_pathway.nodes
+    assert fresh_pathway.fingerprint() == before
+
+
+def test_node_index_follows_graph(fresh_pathway):
+    index = NodeIndex.build(fresh_pathway)
+    index.attach(fresh_pathway)
+    apply_delta(fresh_pathway, [
+        {'op': 'add_node', 'node': {'id': 'gene:ZEB1', 'type': 'gene', 'name': 'ZEB1', 'synonyms': ['zinc finger E-box']}},
+        {'op': 'update_node', 'node': {'id': 'metabolite:fumarate', 'type': 'metabolite', 'name': 'Fumaric acid'}},
+        {'op': 'remove_node', 'id': 'gene:NF2', 'cascade': True},
+    ])
+    rebuilt = NodeIndex.build(fresh_pathway)
+    for query in ['zeb', 'e-box', 'fumar', 'fumaric', 'nf2', 'hif']:
+        assert index.search(query) == rebuilt.search(query)
+        assert find_nodes(fresh_pathway, query, index = index) == find_nodes(fresh_pathway, query)
+    assert len(index) == len(fresh_pathway.nodes)
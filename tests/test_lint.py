@@ -0,0 +1,89 @@
+import pytest
+from fhrcc_mechanismkg.binary import graph_to_binary
+from fhrcc_mechanismkg.io import graph_from_json
+from fhrcc_mechanismkg.lint import LINT_RULES, LintRule, lint_graph, lint_rule, run_lint
+from fhrcc_mechanismkg.synthetic import generate_graph
+from conftest import DATA_DIR
+
+
+class UncitedEdge(LintRule):
+    id = 'test-uncited-edge'
+    description = 'Edges without citations.'
+    severity = 'note'
+
+    def visit_edge(self, state, edge):
+        if not edge.citations:
+            state.append(self.finding(f'Uncited: {edge.subject} --{edge.predicate}--> {edge.object}', edge = edge))
+
+
+class NodeTypeCount(LintRule):
+    # Non-list state: node counts per type, merged across shards.
+    id = 'test-node-types'
+
+    def start(self):
+        return {}
+
+    def visit_node(self, state, node):
+        state[node.type] = state.get(node.type, 0) + 1
+
+    def merge(self, state, other):
+        for t, c in other.items():
+            state[t] = state.get(t, 0) + c
+        return state
+
+    def finish(self, state, analytics):
+        if state != analytics.node_types:
+            yield self.finding(f'Visited {state}, expected {analytics.node_types}')
+
+
+@pytest.fixture
+def registered():
+    lint_rule(UncitedEdge)
+    try:
+        yield
+    finally:
+        LINT_RULES.pop(UncitedEdge.id)
+
+
+def test_registered_rules_run_in_one_report(registered):
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    report = run_lint(g)
+    uncited = [e for e in g.edges if not e.citations]
+    assert report.counts['test-uncited-edge'] == len(uncited)
+    assert [f.edge for f in report.findings if f.rule == 'test-uncited-edge'] == [(e.subject, e.predicate, e.object) for e in uncited]
+    # Built-in rules keep their messages, first in the report.
+    assert report.messages()[:report.counts['predicate-overuse']] == lint_graph(g)[:report.counts['predicate-overuse']]
+
+    with pytest.raises(ValueError):
+        run_lint(g, rules = ['no-such-rule'])
+
+
+def test_sharded_pass_matches_single_process(tmp_path):
+    g = generate_graph(3000, seed = 5)
+    path = str(tmp_path / 'g.fhkg')
+    graph_to_binary(g, path)
+    rules = ['contradiction', UncitedEdge(), NodeTypeCount()]
+    single = run_lint(g, rules = rules)
+    sharded = run_lint(path, rules = rules, workers = 3)
+    assert sharded.shards == 3
+    assert sharded.findings == single.findings
+    assert single.counts['test-node-types'] == 0
+    assert single.counts['test-uncited-edge'] == len(g.edges)
+    # Built-in rules only read the shared analytics, so there is nothing to shard.
+    assert run_lint(path, rules = ['contradiction', 'isolated-node'], workers = 3).shards == 1
+
+
+def test_report_serializes_to_json_and_sarif(registered):
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    report = run_lint(g, rules = ['predicate-overuse', 'test-uncited-edge'])
+    doc = report.to_dict()
+    assert [r['id'] for r in doc['rules']] == ['predicate-overuse', 'test-uncited-edge']
+    assert len(doc['findings']) == len(report.findings)
+
+    sarif = report.to_sarif(artifact = 'data/fhrcc_pathway_v1.json')
+    run = sarif['runs'][0]
+    assert sarif['version'] == '2.1.0'
+    assert len(run['results']) == len(report.findings)
+    first_uncited = next(r for r in run['results'] if r['ruleId'] == 'test-uncited-edge')
+    assert first_uncited['level'] == 'note' and first_uncited['ruleIndex'] == 1
+    assert first_uncited['locations'][0]['logicalLocations'][0]['kind'] == 'edge'
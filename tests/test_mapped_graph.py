@@ -0,0 +1,73 @@
+from pathlib import Path
+import pytest
+from fhrcc_mechanismkg.binary import graph_to_binary
+from fhrcc_mechanismkg.io import graph_from_json, graph_to_dict
+from fhrcc_mechanismkg.mapped import MappedGraph
+from fhrcc_mechanismkg.reasoning.path_search import k_shortest_paths_explainable, shortest_paths_from
+from fhrcc_mechanismkg.reporting import paths_to_markdown
+from conftest import DATA_DIR
+
+
+@pytest.fixture
+def graphs(tmp_path):
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    path = tmp_path / 'pathway.fhkg'
+    graph_to_binary(g, str(path))
+    return g, MappedGraph(str(path))
+
+
+def test_mapped_graph_materializes_lazily(graphs):
+    g, m = graphs
+    assert m.get_node('gene:FH') == g.get_node('gene:FH')
+    assert m._node_cache.keys() == {m.index['gene:FH']}
+    assert not m._edge_cache
+    assert 'gene:FH' in m.nodes and 'gene:NOPE' not in m.nodes
+    assert list(m.nodes) == list(g.nodes)
+    # The fingerprint comes from the file header, not from the records.
+    assert m.fingerprint() == g.fingerprint()
+    assert len(m._node_cache) == 1 and not m._edge_cache
+
+
+def test_mapped_graph_matches_loaded_graph(graphs):
+    g, m = graphs
+    assert list(m.edges) == g.edges
+
+    def key(e):
+        return (e.subject, e.predicate)
+
+    for node_id in g.nodes:
+        assert m.outgoing(node_id) == g.outgoing(node_id)
+        # Incoming edges come back grouped by subject rather than in insertion order.
+        assert sorted(m.incoming(node_id), key = key) == sorted(g.incoming(node_id), key = key)
+    assert m.find_edges(predicate = 'causes') == g.find_edges(predicate = 'causes')
+    assert m.fingerprint() == g.fingerprint()
+    assert graph_to_dict(m) == graph_to_dict(g)
+
+
+def test_path_search_and_reports_run_on_mapped_arrays(graphs):
+    g, m = graphs
+    expected = k_shortest_paths_explainable(g, 'gene:FH', 'phenotype:cancer', k = 5, max_hops = 14)
+    got = k_shortest_paths_explainable(m, 'gene:FH', 'phenotype:cancer', k = 5, max_hops = 14)
+    assert got == expected
+    assert paths_to_markdown(m, got, header = 'x') == paths_to_markdown(g, expected, header = 'x')
+    assert shortest_paths_from(m, 'gene:FH', max_hops = 6) == shortest_paths_from(g, 'gene:FH', max_hops = 6)
+
+
+def test_close_releases_the_mapping(graphs):
+    _, m = graphs
+    k_shortest_paths_explainable(m, 'gene:FH', 'phenotype:cancer', k = 2, max_hops = 14)
+    with m:
+        assert m.outgoing('gene:FH')
+    assert m._mm is None
+    m.close()  # closing twice is harmless
+    with MappedGraph(m.path) as again:
+        assert again.get_node('gene:FH').id == 'gene:FH'
+
+
+@pytest.mark.parametrize('size', [0, 5, 16, 200])
+def test_empty_or_truncated_file_is_rejected(graphs, tmp_path, size):
+    _, m = graphs
+    path = tmp_path / 'cut.fhkg'
+    path.write_bytes(Path(m.path).read_bytes()[:size])
+    with pytest.raises(ValueError, match = 'binary graph'):
+        MappedGraph(str(path))
@@ -0,0 +1,51 @@
+import os
+import shutil
+import pytest
+from fhrcc_mechanismkg.graph import Graph
+from fhrcc_mechanismkg.schema import Node
+from fhrcc_mechanismkg.search import NodeIndex, find_nodes
+from conftest import DATA_DIR
+
+
+@pytest.mark.parametrize('keyword', [None, 'f', 'hy', 'fumar', 'hif stab', 'PHD_inh', 'zzz'])
+@pytest.mark.parametrize('node_type', [None, 'state', 'process'])
+def test_indexed_find_matches_scan(pathway, keyword, node_type):
+    index = NodeIndex.build(pathway)
+    expected = find_nodes(pathway, keyword, node_type)
+    assert find_nodes(pathway, keyword, node_type, index = index) == expected
+
+
+def test_ranked_search_modes():
+    g = Graph()
+    g.add_node(Node(id = 'metabolite:fumarate', type = 'metabolite', name = 'Fumarate', xrefs = {'CHEBI': '18012'}))
+    g.add_node(Node(id = 'gene:FH', type = 'gene', name = 'FH', synonyms = ['fumarate hydratase']))
+    g.add_node(Node(id = 'state:pseudohypoxia', type = 'state', name = 'Pseudohypoxia'))
+    g.add_node(Node(id = 'protein:KEAP1', type = 'protein', name = 'KEAP1'))
+    index = NodeIndex.build(g)
+
+    # Name match outranks the same token in a synonym.
+    assert [h.node_id for h in index.search('fumarate')] == ['metabolite:fumarate', 'gene:FH']
+    assert [h.node_id for h in index.search('fumar', node_type = 'gene')] == ['gene:FH']
+    assert [h.node_id for h in index.search('hypoxia')] == ['state:pseudohypoxia']  # substring of a token
+    assert [h.node_id for h in index.search('psuedohypoxia')] == ['state:pseudohypoxia']  # transposition
+    assert [h.node_id for h in index.search('kaep1')] == ['protein:KEAP1']  # transposition in a short token
+    assert index.complete('psuedo') == []
+    assert [h.node_id for h in index.search('18012')] == ['metabolite:fumarate']  # xref
+    assert [h.node_id for h in index.search('fumarate hydratase')] == ['gene:FH']
+    assert index.search('zzzz') == []
+
+
+def test_index_persisted_next_to_graph_file(tmp_path, pathway):
+    path = str(tmp_path / 'graph.json')
+    shutil.copy(DATA_DIR / 'fhrcc_pathway_v1.json', path)
+
+    built = NodeIndex.for_graph_file(pathway, path)
+    assert os.path.exists(path + '.idx')
+    loaded = NodeIndex.load(path + '.idx', source = path)
+    assert loaded is not None
+    assert loaded.search('fumarate') == built.search('fumarate')
+
+    # Touching the graph file invalidates the saved index.
+    st = os.stat(path)
+    os.utime(path, ns = (st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert NodeIndex.load(path + '.idx', source = path) is None
@@ -0,0 +1,89 @@
+import pytest
+from fhrcc_mechanismkg.binary import graph_to_binary
+from fhrcc_mechanismkg.graph import build_minimal_example_graph
+from fhrcc_mechanismkg.mapped import MappedGraph
+from fhrcc_mechanismkg.schema import Edge
+from fhrcc_mechanismkg.reasoning.cache import PathQueryCache
+
+
+def test_hits_misses_and_invalidation_on_mutation():
+    g = build_minimal_example_graph()
+    cache = PathQueryCache(maxsize = 8)
+
+    first = cache.k_shortest_paths(g, 'gene:FH', 'pathway:NRF2_ARE', k = 3, max_hops = 8)
+    again = cache.k_shortest_paths(g, 'gene:FH', 'pathway:NRF2_ARE', k = 3, max_hops = 8)
+    assert again == first and again is not first
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    again[0].steps.clear()
+    again.pop()
+    assert cache.k_shortest_paths(g, 'gene:FH', 'pathway:NRF2_ARE', k = 3, max_hops = 8) == first
+
+    g.add_edge(Edge(subject = 'gene:FH', predicate = 'causes', object = 'pathway:NRF2_ARE', weight = 0.9, evidence_level = 'hypothesis'))
+    changed = cache.k_shortest_paths(g, 'gene:FH', 'pathway:NRF2_ARE', k = 3, max_hops = 8)
+    assert cache.stats.misses == 2
+    assert len(changed[0].steps) == 1
+
+
+def test_lru_eviction_ttl_and_negative_results():
+    now = [0.0]
+    g = build_minimal_example_graph()
+    cache = PathQueryCache(maxsize = 1, ttl = 10, clock = lambda: now[0])
+
+    cache.shortest_path(g, 'gene:FH', 'protein:KEAP1')
+    cache.shortest_path(g, 'gene:FH', 'protein:NRF2')
+    assert cache.stats.evictions == 1 and len(cache) == 1
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.shortest_path(g, 'pathway:NRF2_ARE', 'gene:FH')
+    assert cache.stats.hits == 1
+
+    now[0] = 100.0
+    with pytest.raises(ValueError):
+        cache.shortest_path(g, 'pathway:NRF2_ARE', 'gene:FH')
+    assert cache.stats.expirations == 1
+
+
+def test_disk_tier_survives_new_cache(tmp_path):
+    g = build_minimal_example_graph()
+    db = str(tmp_path / 'paths.sqlite')
+    with PathQueryCache(path = db) as cache:
+        expected = cache.shortest_path(g, 'gene:FH', 'protein:NRF2')
+
+    with PathQueryCache(path = db) as cache:
+        got = cache.shortest_path(build_minimal_example_graph(), 'gene:FH', 'protein:NRF2')
+        assert cache.stats.disk_hits == 1
+    assert got == expected
+
+
+def test_hits_on_mapped_graph_build_no_records(tmp_path):
+    path = str(tmp_path / 'g.fhkg')
+    graph_to_binary(build_minimal_example_graph(), path)
+    db = str(tmp_path / 'paths.sqlite')
+    with MappedGraph(path) as m, PathQueryCache(path = db) as cache:
+        expected = cache.k_shortest_paths(m, 'gene:FH', 'pathway:NRF2_ARE', k = 2)
+
+    with MappedGraph(path) as m, PathQueryCache(path = db) as cache:
+        assert cache.k_shortest_paths(m, 'gene:FH', 'pathway:NRF2_ARE', k = 2) == expected
+        assert cache.k_shortest_paths(m, 'gene:FH', 'pathway:NRF2_ARE', k = 2) == expected
+        assert (cache.stats.disk_hits, cache.stats.hits) == (1, 2)
+        assert not m._edge_cache and not m._node_cache and m._frozen is None
+
+
+def test_disk_tier_expires_and_prunes_rows(tmp_path):
+    now = [0.0]
+    g = build_minimal_example_graph()
+    db = str(tmp_path / 'paths.sqlite')
+    with PathQueryCache(path = db, ttl = 10, disk_maxsize = 2, clock = lambda: now[0]) as cache:
+        for target in ('protein:KEAP1', 'protein:NRF2', 'pathway:NRF2_ARE'):
+            cache.shortest_path(g, 'gene:FH', target)
+            now[0] += 1
+        assert cache._disk_count == 2
+
+    now[0] = 100.0
+    with PathQueryCache(path = db, ttl = 10, clock = lambda: now[0]) as cache:
+        assert cache._disk_count == 2
+        cache.shortest_path(g, 'gene:FH', 'pathway:NRF2_ARE')  # expired on disk
+        assert (cache.stats.disk_hits, cache.stats.expirations) == (0, 2)
+        assert cache._disk_count == 1
+        assert cache._db.execute('SELECT COUNT(*) FROM path_cache').fetchone() == (1,)
@@ -0,0 +1,277 @@
+import math
+from dataclasses import replace
+import pytest
+from fhrcc_mechanismkg.graph import Graph, build_minimal_example_graph
+from fhrcc_mechanismkg.io import graph_from_json
+from fhrcc_mechanismkg.schema import Edge, Node
+from fhrcc_mechanismkg.reasoning.constraints import EVIDENCE_ORDER, PathConstraints
+from fhrcc_mechanismkg.reasoning.path_search import (
+    DEFAULT_PREDICATE_PENALTY,
+    STRATEGIES,
+    edge_cost,
+    k_shortest_paths_explainable,
+    shortest_path_explainable,
+    shortest_paths_from,
+)
+from fhrcc_mechanismkg.reasoning.stats import SearchStats, add_search_hook
+from conftest import DATA_DIR
+
+
+def test_compiled_costs_match_edge_cost(pathway):
+    cg = pathway.freeze()
+    costs = cg.costs(DEFAULT_PREDICATE_PENALTY)
+    assert cg.n_edges == len(pathway.edges)
+    for pos, e in enumerate(cg.edges):
+        assert costs[pos] == edge_cost(e, DEFAULT_PREDICATE_PENALTY)
+        assert cg.node_ids[cg.targets[pos]] == e.object
+
+
+def test_cost_matrix_rows_match_costs(pathway):
+    cg = pathway.freeze()
+    tables = [DEFAULT_PREDICATE_PENALTY, {}, {**DEFAULT_PREDICATE_PENALTY, 'causes': 0.5}]
+    matrix = cg.cost_matrix(tables)
+    assert len(matrix) == len(tables)
+    for row, table in zip(matrix, tables):
+        assert list(row) == list(cg.costs(table))
+    assert cg.costs(dict(DEFAULT_PREDICATE_PENALTY)) is cg.costs(DEFAULT_PREDICATE_PENALTY)
+
+
+def test_path_steps_carry_search_costs(pathway):
+    table = {**DEFAULT_PREDICATE_PENALTY, 'activates': 0.05}
+    best = shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14, predicate_penalty = table)
+    for step in best.steps:
+        assert step.cost == edge_cost(step.edge, table)
+        assert step.penalty == table.get(step.edge.predicate, 1.0)
+    assert math.isclose(sum(step.cost for step in best.steps), best.total_cost)
+
+
+def test_freeze_is_cached_until_mutation():
+    g = build_minimal_example_graph()
+    cg = g.freeze()
+    assert g.freeze() is cg
+    g.add_edge(Edge(subject = 'gene:FH', predicate = 'causes', object = 'metabolite:fumarate', weight = 0.5, evidence_level = 'hypothesis'))
+    assert g.freeze() is not cg
+
+
+def test_search_accepts_graph_or_snapshot(pathway):
+    a = shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14)
+    b = shortest_path_explainable(pathway.freeze(), 'gene:FH', 'phenotype:cancer', max_hops = 14)
+    assert a == b
+    assert math.isclose(a.total_cost, sum(edge_cost(s.edge) for s in a.steps))
+    assert a.node_ids()[0] == 'gene:FH' and a.node_ids()[-1] == 'phenotype:cancer'
+
+    paths = k_shortest_paths_explainable(pathway.freeze(), 'gene:FH', 'phenotype:cancer', k = 5, max_hops = 14)
+    assert paths[0].total_cost == pytest.approx(a.total_cost)
+    assert [p.total_cost for p in paths] == sorted(p.total_cost for p in paths)
+
+
+def test_unknown_endpoints_raise(pathway):
+    with pytest.raises(ValueError):
+        shortest_path_explainable(pathway, 'gene:NOPE', 'phenotype:cancer')
+
+
+def _all_simple_path_costs(g, source, target, max_hops):
+    out = []
+
+    def walk(node, cost, visited, hops):
+        if node == target:
+            out.append(cost)
+            return
+        if hops == max_hops:
+            return
+        for e in g.outgoing(node):
+            if e.object not in visited:
+                walk(e.object, cost + edge_cost(e), visited | {e.object}, hops + 1)
+
+    walk(source, 0.0, {source}, 0)
+    return sorted(out)
+
+
+@pytest.mark.parametrize('max_hops', [3, 6, 9])
+def test_k_shortest_matches_exhaustive_enumeration(pathway, max_hops):
+    expected = _all_simple_path_costs(pathway, 'gene:FH', 'phenotype:cancer', max_hops)[:20]
+    paths = k_shortest_paths_explainable(pathway, 'gene:FH', 'phenotype:cancer', k = 20, max_hops = max_hops)
+    assert [p.total_cost for p in paths] == pytest.approx(expected)
+    for p in paths:
+        assert len(p.steps) <= max_hops
+        assert len(set(p.node_ids())) == len(p.node_ids())
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_strategies_agree_with_dijkstra(pathway, strategy):
+    pairs = [(s, t) for s in pathway.nodes for t in ('phenotype:cancer', 'state:pseudohypoxia') if s != t]
+    for source, target in pairs:
+        for max_hops in (2, 5, 14):
+            try:
+                expected = shortest_path_explainable(pathway, source, target, max_hops = max_hops).total_cost
+            except ValueError:
+                with pytest.raises(ValueError):
+                    shortest_path_explainable(pathway, source, target, max_hops = max_hops, strategy = strategy)
+                continue
+            got = shortest_path_explainable(pathway, source, target, max_hops = max_hops, strategy = strategy)
+            assert got.total_cost == pytest.approx(expected)
+            assert len(got.steps) <= max_hops
+            assert got.node_ids()[0] == source and got.node_ids()[-1] == target
+
+
+def test_unknown_strategy_raises(pathway):
+    with pytest.raises(ValueError):
+        shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', strategy = 'greedy')
+
+
+@pytest.mark.parametrize('max_hops', [2, 4, 14])
+def test_shortest_paths_from_matches_per_target_search(pathway, max_hops):
+    results = shortest_paths_from(pathway, 'gene:FH', max_hops = max_hops)
+    for target in pathway.nodes:
+        if target == 'gene:FH':
+            continue
+        try:
+            expected = shortest_path_explainable(pathway, 'gene:FH', target, max_hops = max_hops)
+        except ValueError:
+            assert target not in results
+            continue
+        assert results[target].total_cost == pytest.approx(expected.total_cost)
+        assert results[target].node_ids()[-1] == target
+
+    subset = shortest_paths_from(pathway, 'gene:FH', targets = ['phenotype:cancer'], max_hops = max_hops)
+    assert set(subset) <= {'phenotype:cancer'}
+
+
+def test_search_stats_and_hooks(pathway):
+    stats = SearchStats()
+    paths = k_shortest_paths_explainable(pathway, 'gene:FH', 'phenotype:cancer', k = 3, max_hops = 14, stats = stats)
+    assert len(paths) == 3
+    assert stats.searches > 1 and stats.nodes_popped > 0 and stats.edges_relaxed > 0 and stats.peak_heap > 0
+    assert {'search', 'spur_searches', 'paths'} <= set(stats.phases)
+
+    seen = []
+    remove = add_search_hook(lambda kind, s: seen.append((kind, s)))
+    try:
+        shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 2)
+    except ValueError:
+        pass
+    finally:
+        remove()
+    shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14)
+    assert [kind for kind, _ in seen] == ['shortest_path']
+    assert seen[0][1].pruned_by_max_hops > 0
+
+
+def _satisfies(g, edges, c, source, target):
+    exempt = {source, target, *c.waypoints}
+    for e in edges:
+        if c.predicates is not None and e.predicate not in c.predicates or e.predicate in c.forbid_predicates:
+            return False
+        node_type = g.nodes[e.object].type
+        if e.object not in exempt and (c.node_types is not None and node_type not in c.node_types or node_type in c.forbid_node_types):
+            return False
+        if c.min_evidence and EVIDENCE_ORDER.index(e.evidence_level) > EVIDENCE_ORDER.index(c.min_evidence):
+            return False
+    visited = [e.object for e in edges]
+    return [n for n in visited if n in c.waypoints] == list(c.waypoints)
+
+
+CONSTRAINTS = [
+    (PathConstraints(forbid_predicates = {'inhibits_activity_of'}), 'phenotype:cancer'),
+    (PathConstraints(forbid_node_types = {'protein', 'pathway'}), 'phenotype:cancer'),
+    (PathConstraints(forbid_node_types = {'metabolite'}), 'phenotype:cancer'),
+    (PathConstraints(node_types = {'process', 'state', 'metabolite'}, predicates = {'causes', 'enables', 'inhibits_activity_of'}), 'phenotype:cancer'),
+    (PathConstraints(min_evidence = 'review_or_consensus'), 'pathway:NRF2_ARE'),
+    (PathConstraints(waypoints = ('process:TET_KDM_inhibition',)), 'phenotype:cancer'),
+    (PathConstraints(waypoints = ('state:oxidative_stress', 'pathway:NRF2_ARE'), forbid_predicates = {'modifies'}), 'phenotype:cancer'),
+]
+
+
+@pytest.mark.parametrize('constraints, target', CONSTRAINTS)
+def test_constrained_search_matches_filtered_enumeration(pathway, constraints, target):
+    source, max_hops = 'gene:FH', 10
+    expected = []
+
+    def walk(node, cost, visited, edges):
+        if node == target:
+            if _satisfies(pathway, edges, constraints, source, target):
+                expected.append(cost)
+            return
+        if len(edges) == max_hops:
+            return
+        for e in pathway.outgoing(node):
+            if e.object not in visited:
+                walk(e.object, cost + edge_cost(e), visited | {e.object}, edges + [e])
+
+    walk(source, 0.0, {source}, [])
+    expected.sort()
+
+    paths = k_shortest_paths_explainable(pathway, source, target, k = 10, max_hops = max_hops, constraints = constraints)
+    assert [p.total_cost for p in paths] == pytest.approx(expected[:10])
+    for p in paths:
+        assert _satisfies(pathway, [step.edge for step in p.steps], constraints, source, target)
+        assert len(set(p.node_ids())) == len(p.node_ids())
+
+    for strategy in STRATEGIES:
+        if expected:
+            best = shortest_path_explainable(pathway, source, target, max_hops = max_hops, strategy = strategy, constraints = constraints)
+            assert best.total_cost == pytest.approx(expected[0])
+        else:
+            with pytest.raises(ValueError):
+                shortest_path_explainable(pathway, source, target, max_hops = max_hops, strategy = strategy, constraints = constraints)
+
+
+def test_waypoint_search_is_exact_when_cheap_label_blocks_the_waypoint():
+    # The cheapest way to the waypoint (s-a-w) leaves no way on to t without
+    # revisiting a; only the dearer s-b-w-a-t is a simple path.
+    g = Graph()
+    for name in 'sabwt':
+        g.add_node(Node(id = f'gene:{name}', type = 'gene', name = name))
+    for s, o, w in [('s', 'a', 0.9), ('a', 'w', 0.9), ('w', 'a', 0.9), ('a', 't', 0.9), ('s', 'b', 0.3), ('b', 'w', 0.3)]:
+        g.add_edge(Edge(subject = f'gene:{s}', predicate = 'causes', object = f'gene:{o}', weight = w, evidence_level = 'hypothesis'))
+    c = PathConstraints(waypoints = ('gene:w',))
+    best = shortest_path_explainable(g, 'gene:s', 'gene:t', max_hops = 6, constraints = c)
+    assert best.node_ids() == ['gene:s', 'gene:b', 'gene:w', 'gene:a', 'gene:t']
+    paths = k_shortest_paths_explainable(g, 'gene:s', 'gene:t', k = 3, max_hops = 6, constraints = c)
+    assert [p.node_ids() for p in paths] == [best.node_ids()]
+    with pytest.raises(ValueError):
+        shortest_path_explainable(g, 'gene:s', 'gene:t', max_hops = 3, constraints = c)
+
+
+def test_constraints_filter_shortest_paths_from(pathway):
+    c = PathConstraints(forbid_node_types = {'metabolite'}, forbid_predicates = {'enables'})
+    results = shortest_paths_from(pathway, 'gene:FH', max_hops = 14, constraints = c)
+    assert results
+    for target, p in results.items():
+        assert all(step.edge.predicate != 'enables' for step in p.steps)
+        assert all(pathway.nodes[n].type != 'metabolite' for n in p.node_ids()[1:-1])
+        assert p.total_cost == pytest.approx(shortest_path_explainable(pathway, 'gene:FH', target, max_hops = 14, constraints = c).total_cost)
+
+    with pytest.raises(ValueError):
+        shortest_paths_from(pathway, 'gene:FH', constraints = PathConstraints(waypoints = ('pathway:NRF2_ARE',)))
+
+
+def test_constraints_reject_unknown_names(pathway):
+    with pytest.raises(ValueError):
+        PathConstraints(predicates = {'causes', 'cures'})
+    with pytest.raises(ValueError):
+        PathConstraints(min_evidence = 'anecdote')
+    with pytest.raises(ValueError):
+        shortest_path_explainable(pathway, 'gene:FH', 'phenotype:cancer', constraints = PathConstraints(waypoints = ('gene:nope',)))
+    assert PathConstraints(context = {'tissue': 'kidney'}).context == (('tissue', 'kidney'),)
+
+
+def test_context_constraints():
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    best = shortest_path_explainable(g, 'gene:FH', 'phenotype:cancer', max_hops = 14)
+    first = best.steps[0].edge
+    g.update_edge(first, replace(first, context = {'tissue': 'liver'}))
+    for step in best.steps[1:]:
+        g.update_edge(step.edge, replace(step.edge, context = {'tissue': 'kidney'}))
+
+    kidney = {'tissue': 'kidney'}
+    with pytest.raises(ValueError):
+        # FH has one out-edge, now only found in liver.
+        shortest_path_explainable(g, 'gene:FH', 'phenotype:cancer', max_hops = 14, constraints = PathConstraints(context = kidney))
+
+    g.update_edge(g.outgoing('gene:FH')[0], replace(first, context = kidney))
+    # Edges without a tissue are kept unless the context is strict.
+    lenient = k_shortest_paths_explainable(g, 'gene:FH', 'phenotype:cancer', k = 3, max_hops = 14, constraints = PathConstraints(context = kidney))
+    assert len(lenient) == 3
+    strict = k_shortest_paths_explainable(g, 'gene:FH', 'phenotype:cancer', k = 3, max_hops = 14, constraints = PathConstraints(context = kidney, strict_context = True))
+    assert [p.node_ids() for p in strict] == [best.node_ids()]
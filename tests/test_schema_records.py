@@ -0,0 +1,50 @@
+import json
+import pickle
+from dataclasses import asdict, replace
+import pytest
+from fhrcc_mechanismkg.graph import build_minimal_example_graph
+from fhrcc_mechanismkg.io import graph_from_json, graph_to_dict
+from fhrcc_mechanismkg.schema import EMPTY_DICT, EMPTY_LIST, Edge, Node
+
+
+def test_loaded_records_are_slotted_interned_and_share_empties(tmp_path):
+    g = build_minimal_example_graph()
+    path = tmp_path / 'g.json'
+    path.write_text(json.dumps(graph_to_dict(g)), encoding = 'utf-8')
+    loads = {mode: graph_from_json(str(path), validate = mode) for mode in ('full', 'trusted', 'deferred')}
+    first = loads['full']
+    for h in loads.values():
+        assert h == g
+        assert not hasattr(h.edges[0], '__dict__')
+        for e in h.edges:
+            assert e.subject is h.nodes[e.subject].id
+        # Separate loads (and separate edges) share one string object per value.
+        for e, other in zip(h.edges, first.edges):
+            assert e.predicate is other.predicate and e.evidence_level is other.evidence_level
+            assert e.object is other.object
+        assert all(x.citations is EMPTY_LIST and x.context is EMPTY_DICT for x in h.edges if not x.citations and not x.context)
+        assert all(n.synonyms is EMPTY_LIST for n in h.nodes.values() if not n.synonyms)
+
+    loaded = first.edges[0]
+    with pytest.raises(TypeError):
+        loaded.citations.append('PMID:1')
+    loaded.citations = ['PMID:1']  # assigning a new list is the way to add items
+    assert replace(loaded, citations = EMPTY_LIST).citations is EMPTY_LIST
+    assert json.dumps(asdict(replace(loaded, citations = EMPTY_LIST)))
+    assert pickle.loads(pickle.dumps(first)) == first
+
+
+def test_directly_built_records_keep_their_containers():
+    e = Edge('gene:FH', 'causes', 'metabolite:fumarate', 0.9, 'biochemical_direct')
+    e.citations.append('PMID:1')
+    e.context['tissue'] = 'kidney'
+    assert asdict(e)['citations'] == ['PMID:1'] and e.context == {'tissue': 'kidney'}
+    assert Edge('gene:FH', 'causes', 'metabolite:fumarate', 0.9, 'biochemical_direct').citations == []
+
+    synonyms = []
+    n = Node(id = 'gene:FH', type = 'gene', name = 'FH', synonyms = synonyms)
+    assert n.synonyms is synonyms
+    n.synonyms.append('fumarate hydratase')
+    n.xrefs['HGNC'] = 'FH'
+    n.tags.append('tumor_suppressor')
+    assert n.synonyms == ['fumarate hydratase'] and n.xrefs == {'HGNC': 'FH'} and n.tags == ['tumor_suppressor']
@@ -0,0 +1,121 @@
+import json
+import socket
+import threading
+import urllib.request
+import pytest
+from fhrcc_mechanismkg.io import graph_from_json
+from fhrcc_mechanismkg.lint import lint_graph
+from fhrcc_mechanismkg.reasoning.path_search import k_shortest_paths_explainable
+from fhrcc_mechanismkg.service import GraphService, serve_http, serve_unix
+from conftest import DATA_DIR
+
+
+@pytest.fixture(scope = 'module')
+def service():
+    return GraphService(graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json')))
+
+
+def test_handle_dispatches_ops(service):
+    g = service.graph
+    found = service.handle({'op': 'find', 'keyword': 'hypox', 'type': 'state'})
+    assert [m['id'] for m in found['matches']] == ['state:pseudohypoxia']
+    assert service.handle({'op': 'search', 'query': 'fumarte', 'limit': '1'})['matches'][0]['node_id'] == 'metabolite:fumarate'
+
+    out = service.handle({'op': 'explain', 'source': 'gene:FH', 'target': 'phenotype:cancer', 'k': '3'})
+    expected = k_shortest_paths_explainable(g, 'gene:FH', 'phenotype:cancer', k = 3, max_hops = 12)
+    assert [p['node_ids'] for p in out['paths']] == [p.node_ids() for p in expected]
+    service.handle({'op': 'explain', 'source': 'gene:FH', 'target': 'phenotype:cancer', 'k': 3})
+    assert service.cache.stats.hits >= 1
+
+    many = service.handle({'op': 'explain', 'source': 'gene:FH', 'target': ['phenotype:cancer', 'gene:FH']})
+    assert set(many['results']) == {'phenotype:cancer', 'gene:FH'}
+
+    assert service.handle({'op': 'lint'}) == {'warnings': lint_graph(g)}
+    assert service.handle({'op': 'summarize'})['n_edges'] == len(g.edges)
+    assert service.handle({'op': 'info'})['fingerprint'] == g.fingerprint()
+
+
+def test_handle_reports_errors(service):
+    assert 'Unknown op' in service.handle({'op': 'nope'})['error']
+    assert service.handle({'op': 'explain', 'source': 'gene:FH', 'target': 'state:missing'}) == {
+        'error': 'Target node not found: state:missing',
+    }
+    assert service.handle({'op': 'explain', 'source': 'gene:FH', 'target': 'phenotype:cancer', 'k': 'abc'}) == {
+        'error': "k must be an integer, got 'abc'",
+    }
+    assert 'JSON object' in service.handle(['x'])['error']
+    assert 'JSON object' in service.handle('find')['error']
+    assert 'Unknown op' in service.handle({'op': ['find']})['error']
+
+
+def test_apply_updates_resident_graph():
+    service = GraphService(graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json')))
+    before = service.handle({'op': 'info'})['fingerprint']
+    out = service.handle({'op': 'apply', 'changes': [
+        {'op': 'add_node', 'node': {'id': 'gene:ZEB1', 'type': 'gene', 'name': 'ZEB1'}},
+    ]})
+    assert out['applied'] == 1 and out['fingerprint'] != before
+    assert [m['node_id'] for m in service.handle({'op': 'search', 'query': 'zeb1'})['matches']] == ['gene:ZEB1']
+    assert 'error' in service.handle({'op': 'apply', 'changes': [{'op': 'remove_node', 'id': 'gene:nope'}]})
+
+
+def test_reach_follows_applied_edits():
+    service = GraphService(graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json')))
+    out = service.handle({'op': 'reach', 'source': 'gene:FH', 'target': ['phenotype:cancer', 'gene:NF2'], 'max_hops': '14'})
+    cancer, nf2 = out['results']
+    assert cancer['reachable'] and cancer['exact']
+    assert cancer['cost'] == pytest.approx(k_shortest_paths_explainable(service.graph, 'gene:FH', 'phenotype:cancer', k = 1, max_hops = 14)[0].total_cost)
+    assert not nf2['reachable']
+
+    service.handle({'op': 'apply', 'changes': [
+        {'op': 'add_edge', 'edge': {'subject': 'phenotype:cancer', 'predicate': 'causes', 'object': 'gene:NF2', 'weight': 0.5, 'evidence_level': 'hypothesis'}},
+    ]})
+    assert service.distances is None
+    pairs = service.handle({'op': 'reach', 'pairs': [['gene:FH', 'gene:NF2']], 'max_hops': 14})['results']
+    assert pairs[0]['reachable']
+
+
+def test_http_api(service):
+    server = serve_http(service, port = 0)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        with urllib.request.urlopen(f'{base}/find?keyword=fumar') as r:
+            assert json.load(r)['n_matches'] >= 1
+        body = json.dumps({'source': 'gene:FH', 'target': 'phenotype:cancer', 'k': 1}).encode()
+        with urllib.request.urlopen(urllib.request.Request(f'{base}/explain', data = body)) as r:
+            assert len(json.load(r)['paths']) == 1
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(f'{base}/explain?source=gene:FH&target=state:missing')
+        assert e.value.code == 400
+        for bad in (f'{base}/explain?source=gene:FH&target=phenotype:cancer&k=abc', urllib.request.Request(f'{base}/find', data = b'["x"]')):
+            with pytest.raises(urllib.error.HTTPError) as e:
+                urllib.request.urlopen(bad, timeout = 10)
+            assert e.value.code == 400 and 'error' in json.load(e.value)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unix_socket_api(service, tmp_path):
+    path = str(tmp_path / 'kg.sock')
+    server = serve_unix(service, path)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    try:
+        with socket.socket(socket.AF_UNIX) as s:
+            s.connect(path)
+            with s.makefile('rwb') as f:
+                for request in ({'op': 'info'}, {'op': 'lint'}):
+                    f.write(json.dumps(request).encode() + b'\n')
+                    f.flush()
+                    assert 'error' not in json.loads(f.readline())
+                for request in (['x'], {'op': 'explain', 'source': 'gene:FH', 'target': 'phenotype:cancer', 'max_hops': 'x'}):
+                    f.write(json.dumps(request).encode() + b'\n')
+                    f.flush()
+                    assert 'error' in json.loads(f.readline())
+                f.write(b'{"op": "info"}\n')
+                f.flush()
+                assert 'error' not in json.loads(f.readline())
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,112 @@
+import random
+import pytest
+from fhrcc_mechanismkg.binary import graph_to_binary
+from fhrcc_mechanismkg.graph import Graph
+from fhrcc_mechanismkg.mapped import MappedGraph
+from fhrcc_mechanismkg.schema import Edge, Node
+from fhrcc_mechanismkg.reasoning.constraints import PathConstraints
+from fhrcc_mechanismkg.reasoning.path_search import edge_cost
+from fhrcc_mechanismkg.reasoning.signed import edge_sign, path_sign, signed_shortest_paths
+from fhrcc_mechanismkg.reasoning.stats import SearchStats
+
+
+def _best_by_sign(g, source, target, max_hops, predicate_sign = None):
+    best = {}
+
+    def walk(node, cost, visited, sign, hops):
+        if node == target:
+            if sign:
+                key = '+' if sign > 0 else '-'
+                best[key] = min(best.get(key, cost), cost)
+            return
+        if hops == max_hops:
+            return
+        for e in g.outgoing(node):
+            if e.object not in visited:
+                walk(e.object, cost + edge_cost(e), visited | {e.object}, sign * edge_sign(e, predicate_sign), hops + 1)
+
+    walk(source, 0.0, {source}, 1, 0)
+    return best
+
+
+@pytest.mark.parametrize('source', ['gene:FH', 'metabolite:fumarate', 'process:protein_succination'])
+@pytest.mark.parametrize('max_hops', [3, 12])
+def test_signed_search_matches_exhaustive_enumeration(pathway, source, max_hops):
+    for target in pathway.nodes:
+        if target == source:
+            continue
+        expected = _best_by_sign(pathway, source, target, max_hops)
+        got = signed_shortest_paths(pathway, source, target, max_hops = max_hops)
+        assert set(got) == set(expected), target
+        for sign, p in got.items():
+            assert p.total_cost == pytest.approx(expected[sign])
+            assert path_sign(p) == sign
+            assert len(p.steps) <= max_hops
+            assert len(set(p.node_ids())) == len(p.node_ids())
+
+
+def test_feedback_loop_sign_needs_simple_path_search(pathway):
+    # The best net "-" walk to mitochondrial damage goes round the oxidative
+    # stress / NRF2 loop; the exact fallback finds the simple path through KEAP1.
+    stats = SearchStats()
+    got = signed_shortest_paths(pathway, 'gene:FH', 'process:mitochondrial_damage', max_hops = 12, stats = stats)
+    assert set(got) == {'+', '-'}
+    assert 'protein:KEAP1' in got['-'].node_ids()
+    assert 'simple_path_search' in stats.phases
+
+    stats = SearchStats()
+    got = signed_shortest_paths(pathway, 'gene:FH', 'state:HIF_stabilization', max_hops = 12, stats = stats)
+    assert list(got) == ['-']  # fumarate inhibits the alpha-KG dioxygenases
+    assert 'simple_path_search' not in stats.phases
+
+
+def test_polarity_overrides_predicate_and_zero_blocks():
+    g = Graph()
+    for i in range(4):
+        g.add_node(Node(id = f'state:n{i}', type = 'state', name = f'N{i}'))
+    g.add_edge(Edge(subject = 'state:n0', predicate = 'inhibits', object = 'state:n1', weight = 0.9, evidence_level = 'hypothesis', polarity = '+'))
+    g.add_edge(Edge(subject = 'state:n1', predicate = 'causes', object = 'state:n3', weight = 0.9, evidence_level = 'hypothesis'))
+    g.add_edge(Edge(subject = 'state:n0', predicate = 'causes', object = 'state:n2', weight = 0.9, evidence_level = 'hypothesis', polarity = '0'))
+    g.add_edge(Edge(subject = 'state:n2', predicate = 'decreases', object = 'state:n3', weight = 0.9, evidence_level = 'hypothesis'))
+
+    got = signed_shortest_paths(g, 'state:n0', 'state:n3')
+    assert list(got) == ['+']
+    assert path_sign(got['+']) == '+'
+    assert signed_shortest_paths(g, 'state:n0', 'state:n2') == {}
+
+    flipped = signed_shortest_paths(g, 'state:n0', 'state:n3', predicate_sign = {'causes': -1})
+    assert list(flipped) == ['-']
+
+
+def test_random_graphs_match_enumeration():
+    predicates = ['causes', 'inhibits', 'activates', 'decreases']
+    for seed in range(20):
+        rng = random.Random(seed)
+        g = Graph()
+        n = rng.randint(5, 12)
+        for i in range(n):
+            g.add_node(Node(id = f'state:n{i}', type = 'state', name = f'N{i}'))
+        for _ in range(rng.randint(n, 4 * n)):
+            s, o = rng.sample(sorted(g.nodes), 2)
+            g.add_edge(Edge(subject = s, predicate = rng.choice(predicates), object = o, weight = round(rng.uniform(0.05, 0.95), 2), evidence_level = 'hypothesis'))
+        for target in g.nodes:
+            if target == 'state:n0':
+                continue
+            expected = _best_by_sign(g, 'state:n0', target, 5)
+            got = signed_shortest_paths(g, 'state:n0', target, max_hops = 5)
+            assert {s: p.total_cost for s, p in got.items()} == pytest.approx(expected), (seed, target)
+
+
+def test_mapped_graph_and_constraints(pathway, tmp_path):
+    path = tmp_path / 'pathway.fhkg'
+    graph_to_binary(pathway, str(path))
+    m = MappedGraph(str(path))
+    a = signed_shortest_paths(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14)
+    b = signed_shortest_paths(m, 'gene:FH', 'phenotype:cancer', max_hops = 14)
+    assert {s: p.node_ids() for s, p in a.items()} == {s: p.node_ids() for s, p in b.items()}
+
+    c = PathConstraints(forbid_predicates = {'inhibits'})
+    for sign, p in signed_shortest_paths(pathway, 'gene:FH', 'phenotype:cancer', max_hops = 14, constraints = c).items():
+        assert all(step.edge.predicate != 'inhibits' for step in p.steps)
+    with pytest.raises(ValueError):
+        signed_shortest_paths(pathway, 'gene:FH', 'phenotype:cancer', constraints = PathConstraints(waypoints = ('pathway:NRF2_ARE',)))
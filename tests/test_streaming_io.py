@@ -0,0 +1,122 @@
+import json
+import pytest
+from fhrcc_mechanismkg import io as kg_io
+from fhrcc_mechanismkg.graph import Graph
+from fhrcc_mechanismkg.io import (
+    graph_from_json,
+    graph_from_jsonl,
+    graph_to_dict,
+    graph_to_json,
+    load_graph,
+    save_graph,
+)
+from conftest import DATA_DIR
+
+
+@pytest.mark.parametrize('name', ['fhrcc_pathway_v1.json', 'minimal_fh_nrf2.json'])
+def test_streaming_writer_matches_json_dumps(tmp_path, name):
+    g = graph_from_json(str(DATA_DIR / name))
+    out = tmp_path / 'graph.json'
+    graph_to_json(g, str(out))
+    assert out.read_text(encoding = 'utf-8') == json.dumps(graph_to_dict(g), indent = 2)
+
+
+def test_streaming_writer_empty_graph(tmp_path):
+    out = tmp_path / 'empty.json'
+    graph_to_json(Graph(), str(out))
+    assert out.read_text(encoding = 'utf-8') == json.dumps(graph_to_dict(Graph()), indent = 2)
+    assert graph_to_dict(graph_from_json(str(out), stream = True)) == graph_to_dict(Graph())
+
+
+@pytest.mark.parametrize('name', ['fhrcc_pathway_v1.json', 'minimal_fh_nrf2.json'])
+def test_streaming_reader_matches_full_parse(monkeypatch, name):
+    # A tiny read window forces records and scalars to straddle chunk boundaries.
+    monkeypatch.setattr(kg_io, '_READ_CHUNK', 7)
+    g = graph_from_json(str(DATA_DIR / name))
+    h = graph_from_json(str(DATA_DIR / name), stream = True)
+    assert graph_to_dict(h) == graph_to_dict(g)
+
+
+@pytest.mark.parametrize('mode', ['full', 'trusted', 'deferred'])
+def test_streaming_reader_accepts_edges_before_nodes(tmp_path, mode):
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    payload = graph_to_dict(g)
+    out = tmp_path / 'edges_first.json'
+    out.write_text(json.dumps({'edges': payload['edges'], 'schema_version': payload['schema_version'], 'nodes': payload['nodes']}), encoding = 'utf-8')
+    expected = graph_from_json(str(out), validate = mode)
+    assert graph_to_dict(graph_from_json(str(out), stream = True, validate = mode)) == graph_to_dict(expected) == payload
+
+    if mode == 'trusted':
+        return  # no checks at all
+    payload['edges'][5]['object'] = 'gene:nope'
+    out.write_text(json.dumps({'edges': payload['edges'], 'nodes': payload['nodes']}), encoding = 'utf-8')
+    with pytest.raises(ValueError, match = 'Edge object node not found: gene:nope'):
+        graph_from_json(str(out), stream = True, validate = mode)
+
+
+def test_jsonl_round_trip_and_progress(tmp_path):
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    out = tmp_path / 'graph.jsonl'
+    save_graph(g, str(out))
+    lines = out.read_text(encoding = 'utf-8').splitlines()
+    assert len(lines) == 1 + len(g.nodes) + len(g.edges)
+
+    seen = []
+    h = graph_from_jsonl(str(out), progress = lambda n, e, b: seen.append((n, e, b)))
+    assert graph_to_dict(h) == graph_to_dict(g)
+    assert seen[-1] == (len(g.nodes), len(g.edges), out.stat().st_size)
+    assert graph_to_dict(load_graph(str(out))) == graph_to_dict(g)
+
+
+def test_jsonl_rejects_unknown_record_kind(tmp_path):
+    out = tmp_path / 'bad.jsonl'
+    out.write_text('{"kind": "node", "id": "gene:A", "type": "gene", "name": "A"}\n{"kind": "oops"}\n', encoding = 'utf-8')
+    with pytest.raises(ValueError, match = 'bad.jsonl:2'):
+        graph_from_jsonl(str(out))
+
+
+def test_streaming_reader_rejects_malformed_json(tmp_path):
+    out = tmp_path / 'bad.json'
+    out.write_text('{"nodes": [{"id": "gene:A", "type": "gene", "name": "A"} {"id": "b"}]}', encoding = 'utf-8')
+    with pytest.raises(ValueError, match = 'Malformed JSON'):
+        graph_from_json(str(out), stream = True)
+
+
+@pytest.mark.parametrize('mode', ['trusted', 'deferred'])
+def test_validation_modes_build_the_same_graph(tmp_path, mode):
+    g = graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'))
+    jsonl = tmp_path / 'graph.jsonl'
+    save_graph(g, str(jsonl))
+    assert graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'), validate = mode) == g
+    assert graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json'), stream = True, validate = mode) == g
+    assert graph_from_jsonl(str(jsonl), validate = mode) == g
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda p: p['nodes'][1].update(id = 'no_prefix'),
+    lambda p: p['nodes'][1].update(type = 'therapy'),
+    lambda p: p['nodes'].append(dict(p['nodes'][0])),
+    lambda p: p['edges'][3].update(weight = 1.5),
+    lambda p: p['edges'][3].update(object = p['edges'][3]['subject']),
+    lambda p: p['edges'][5].update(object = 'gene:nowhere'),
+])
+def test_deferred_validation_raises_full_mode_errors(corrupt):
+    payload = json.loads((DATA_DIR / 'fhrcc_pathway_v1.json').read_text(encoding = 'utf-8'))
+    corrupt(payload)
+    with pytest.raises(ValueError) as full:
+        kg_io.graph_from_dict(payload)
+    with pytest.raises(ValueError) as deferred:
+        kg_io.graph_from_dict(payload, validate = 'deferred')
+    assert str(deferred.value) == str(full.value)
+    kg_io.graph_from_dict(payload, validate = 'trusted')  # no checks
+
+    with pytest.raises(ValueError):
+        kg_io.graph_from_dict(payload, validate = 'lenient')
+
+
+def test_deferred_validation_normalizes_nulls():
+    payload = json.loads((DATA_DIR / 'minimal_fh_nrf2.json').read_text(encoding = 'utf-8'))
+    payload['nodes'][0]['synonyms'] = None
+    payload['edges'][0]['citations'] = None
+    payload['edges'][0]['weight'] = '0.5'
+    assert kg_io.graph_from_dict(payload, validate = 'deferred') == kg_io.graph_from_dict(payload)
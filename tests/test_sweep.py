@@ -0,0 +1,45 @@
+import pytest
+from fhrcc_mechanismkg.reasoning.path_search import DEFAULT_PREDICATE_PENALTY, k_shortest_paths_explainable
+from fhrcc_mechanismkg.reasoning.sweep import expand_penalty_grid, sensitivity_sweep
+
+
+def _queries(g):
+    ids = sorted(g.nodes)
+    return [(s, t) for s in ids[:3] + ['gene:FH'] for t in ids[-4:] + ['phenotype:cancer']] + [('gene:FH', 'state:missing')]
+
+
+def _grid():
+    # 'unused_predicate' never occurs in the graph, so its two values must share searches.
+    return expand_penalty_grid(vary = {'causes': [0.0, 1.5], 'activates': [0.4, 3.0], 'unused_predicate': [0.0, 9.0]})
+
+
+def test_expand_penalty_grid():
+    grid = expand_penalty_grid({'a': 1.0}, {'b': [0, 1], 'c': [2]})
+    assert grid == [{'a': 1.0, 'b': 0.0, 'c': 2.0}, {'a': 1.0, 'b': 1.0, 'c': 2.0}]
+    assert expand_penalty_grid() == [DEFAULT_PREDICATE_PENALTY]
+
+
+@pytest.mark.parametrize('k, workers', [(1, 1), (3, 1), (3, 2)])
+def test_sweep_matches_per_table_search(pathway, k, workers):
+    queries, grid = _queries(pathway), _grid()
+    report = sensitivity_sweep(pathway, queries, grid, k = k, max_hops = 10, workers = workers)
+    assert len(report.results) == len(queries) * len(grid)
+    assert report.searches <= len(set(s for s, _ in queries)) * len(grid) // 2
+
+    for r in report.results:
+        assert report.result(r.index, r.config) is r
+        try:
+            want = k_shortest_paths_explainable(pathway, r.source, r.target, k = k, max_hops = 10, predicate_penalty = grid[r.config])
+        except ValueError as e:
+            assert r.error == str(e)
+            continue
+        assert r.error is None
+        assert [p.total_cost for p in r.paths] == pytest.approx([p.total_cost for p in want])
+
+
+def test_sweep_shifts_against_baseline(pathway):
+    grid = [DEFAULT_PREDICATE_PENALTY, {**DEFAULT_PREDICATE_PENALTY, 'causes': 5.0}]
+    report = sensitivity_sweep(pathway, [('gene:FH', 'phenotype:cancer')], grid, k = 3, max_hops = 14, workers = 1)
+    base, other = report.shifts(baseline = 0)
+    assert not base.top_changed and base.cost_delta == 0.0 and base.moved == 0
+    assert other.cost_delta > 0
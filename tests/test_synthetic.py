@@ -0,0 +1,49 @@
+from collections import Counter
+from fhrcc_mechanismkg.bench import compare_results, run_benchmarks
+from fhrcc_mechanismkg.io import graph_from_json, graph_from_jsonl
+from fhrcc_mechanismkg.synthetic import FHRCC_PROFILE, GraphProfile, generate_graph, write_synthetic_graph
+from conftest import DATA_DIR
+
+
+def test_generated_graph_is_deterministic_and_valid(tmp_path):
+    g = generate_graph(2000, seed = 7)
+    assert len(g.edges) == 2000
+    assert abs(len(g.nodes) - 2000 / FHRCC_PROFILE.edges_per_node) <= 1
+    assert [e.subject for e in g.edges] == [e.subject for e in generate_graph(2000, seed = 7).edges]
+
+    path = tmp_path / 'synthetic.jsonl'
+    write_synthetic_graph(str(path), 2000, seed = 7)
+    loaded = graph_from_jsonl(str(path))
+    assert loaded.fingerprint() == g.fingerprint()
+
+
+def test_generated_graph_follows_profile_and_has_hubs():
+    g = generate_graph(20000, seed = 1)
+    predicates = Counter(e.predicate for e in g.edges)
+    assert set(predicates) <= set(FHRCC_PROFILE.predicates)
+    assert predicates.most_common(2)[0][0] in ('enables', 'causes')
+    for e in g.edges:
+        lo, hi = FHRCC_PROFILE.weight_ranges[e.evidence_level]
+        assert lo - 0.005 <= e.weight <= hi + 0.005
+
+    degree = Counter(e.subject for e in g.edges) + Counter(e.object for e in g.edges)
+    mean = 2 * len(g.edges) / len(g.nodes)
+    assert degree.most_common(1)[0][1] > 50 * mean
+
+
+def test_profile_from_graph():
+    profile = GraphProfile.from_graph(graph_from_json(str(DATA_DIR / 'fhrcc_pathway_v1.json')))
+    assert profile.predicates == FHRCC_PROFILE.predicates
+    assert profile.node_types == FHRCC_PROFILE.node_types
+    assert profile.weight_ranges == FHRCC_PROFILE.weight_ranges
+
+
+def test_benchmark_suite_runs_and_compares():
+    results = run_benchmarks(500, repeat = 1, names = ['load_json', 'shortest_path', 'report_markdown'])
+    assert set(results['results']) == {'load_json', 'shortest_path', 'report_markdown'}
+    assert results['meta']['n_edges'] == 500
+
+    slower = {'results': {name: {**r, 'min': r['min'] / 10} for name, r in results['results'].items()}}
+    comparisons = compare_results(results, slower, tolerance = 1.5)
+    assert all(c.regressed for c in comparisons)
+    assert not any(c.regressed for c in compare_results(results, results))